@@ -249,6 +249,7 @@ class PlayerAgentSDK:
   - 攻击目标（如果有）的 UID 必须来自 opponent_active_pokemon 或 opponent_bench_pokemon
   - **绝对禁止**：不能使用 my_hand_cards 中的宝可梦 UID 进行攻击
   - **绝对禁止**：不能使用 my_bench_pokemon 中的宝可梦 UID 进行攻击（除非先切换到战斗区）
+- **observation 中的 legal_actions 列出了当前所有合法操作（action 与 payload），请优先从中选择一项原样提交；不在列表中的操作通常会被裁判拒绝。**
 - **如果观察信息中包含 last_action_error 字段，说明上一次操作失败了。请仔细阅读错误消息，并根据错误提示修正你的操作。**
 - 常见错误：
   * 如果错误提到"Invalid parameter name 'trainer_card'"，说明你使用了错误的参数名，应该使用"card_id"
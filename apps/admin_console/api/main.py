@@ -1,14 +1,29 @@
 """Admin Console API backend."""
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 from typing import List, Optional
 
-from src.ptcg_ai.database import DatabaseClient, build_postgres_dsn
+from src.ptcg_ai.async_database import AsyncDatabaseClient
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one shared connection pool for the lifetime of the service."""
+    db = AsyncDatabaseClient.from_env()
+    await db.open()
+    app.state.db = db
+    try:
+        yield
+    finally:
+        await db.close()
+
 
-app = FastAPI(title="PTCG Admin Console API", version="0.1.0")
+app = FastAPI(title="PTCG Admin Console API", version="0.1.0", lifespan=lifespan)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -31,16 +46,15 @@ class CaseResponse(BaseModel):
     created_at: str
 
 
-def get_db() -> DatabaseClient:
-    """Get database client."""
-    dsn = build_postgres_dsn()
-    return DatabaseClient(dsn=dsn)
+def get_db(request: Request) -> AsyncDatabaseClient:
+    """Get the shared, pooled database client."""
+    return request.app.state.db
 
 
 @app.post("/confirmations")
 async def submit_confirmation(
     request: ManualConfirmationRequest,
-    db: DatabaseClient = Depends(get_db),
+    db: AsyncDatabaseClient = Depends(get_db),
     # token: str = Depends(verify_token),
 ):
     """Submit manual confirmation for a referee decision."""
@@ -50,7 +64,7 @@ async def submit_confirmation(
 
 @app.get("/cases", response_model=List[CaseResponse])
 async def get_cases(
-    db: DatabaseClient = Depends(get_db),
+    db: AsyncDatabaseClient = Depends(get_db),
     # token: str = Depends(verify_token),
 ):
     """Get case library."""
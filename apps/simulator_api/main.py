@@ -1,22 +1,43 @@
 """FastAPI service for match management, state queries, and replay."""
 from __future__ import annotations
 
+import asyncio
+import itertools
+import json
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 
-from src.ptcg_ai.database import DatabaseClient, build_postgres_dsn
+from src.ptcg_ai.async_database import AsyncDatabaseClient
+from src.ptcg_ai.database import DatabaseClient
 from src.ptcg_ai.models import GameState, GameLogEntry
 from src.ptcg_ai.referee import RefereeAgent
-from src.ptcg_ai.simulation import build_deck
-from src.ptcg_ai.rulebook import RuleKnowledgeBase
+from src.ptcg_ai.replay import ReplayEngine, ReplayError
+from src.ptcg_ai.simulation import build_deck, load_rulebook_text
+from src.ptcg_ai.state_delta import capture_checkpoint
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="PTCG Simulator API", version="0.1.0")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one shared connection pool for the lifetime of the service."""
+    db = AsyncDatabaseClient.from_env()
+    await db.open()
+    app.state.db = db
+    try:
+        yield
+    finally:
+        await db.close()
+
+
+app = FastAPI(title="PTCG Simulator API", version="0.1.0", lifespan=lifespan)
 
 # OAuth2 setup (simplified for now)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -48,6 +69,13 @@ class LogEntryResponse(BaseModel):
     payload: Dict
     random_seed: Optional[str]
     timestamp: Optional[str]
+    id: Optional[int] = None
+
+
+class LogPageResponse(BaseModel):
+    """One keyset-paginated page of log entries."""
+    entries: List[LogEntryResponse]
+    next_cursor: Optional[int]
 
 
 class ReplayRequest(BaseModel):
@@ -55,17 +83,18 @@ class ReplayRequest(BaseModel):
     match_id: str
     from_turn: Optional[int] = None
     to_turn: Optional[int] = None
+    per_action: bool = False
 
 
 # Global state (in production, use proper state management)
 _state_store: Dict[str, GameState] = {}
 _referees: Dict[str, RefereeAgent] = {}
+_match_ids = itertools.count(1)
 
 
-def get_db() -> DatabaseClient:
-    """Get database client."""
-    dsn = build_postgres_dsn()
-    return DatabaseClient(dsn=dsn)
+def get_db(request: Request) -> AsyncDatabaseClient:
+    """Get the shared, pooled database client."""
+    return request.app.state.db
 
 
 def verify_token(token: str = Depends(oauth2_scheme)) -> str:
@@ -77,7 +106,7 @@ def verify_token(token: str = Depends(oauth2_scheme)) -> str:
 @app.post("/matches", response_model=MatchResponse)
 async def create_match(
     request: CreateMatchRequest,
-    db: DatabaseClient = Depends(get_db),
+    db: AsyncDatabaseClient = Depends(get_db),
     # token: str = Depends(verify_token),  # Enable when auth is ready
 ):
     """Create a new match."""
@@ -88,24 +117,33 @@ async def create_match(
         if not rulebook_path.exists():
             raise HTTPException(status_code=500, detail="Rulebook not found")
         
-        rulebook = RuleKnowledgeBase.from_text(rulebook_path.read_text())
-        
-        # Build decks
-        deck_a = build_deck(request.player_a_id, request.player_a_deck_file)
-        deck_b = build_deck(request.player_b_id, request.player_b_deck_file)
-        
-        # Create referee and match
-        referee = RefereeAgent.create(
-            match_id=f"match-{len(_state_store) + 1}",
-            player_decks={
-                request.player_a_id: deck_a,
-                request.player_b_id: deck_b,
-            },
-            knowledge_base=rulebook,
-            database=db,
-        )
-        
-        match_id = referee.state.match_id
+        # The referee calls its database inline, so set the match up in a
+        # worker thread against an in-memory client and write the result
+        # through the shared pool afterwards.
+        local_db = DatabaseClient()
+        match_id = f"match-{next(_match_ids)}"
+
+        def setup() -> RefereeAgent:
+            rulebook = load_rulebook_text(rulebook_path)
+
+            # Build decks
+            deck_a = build_deck(request.player_a_id, request.player_a_deck_file)
+            deck_b = build_deck(request.player_b_id, request.player_b_deck_file)
+
+            # Create referee and match
+            return RefereeAgent.create(
+                match_id=match_id,
+                player_decks={
+                    request.player_a_id: deck_a,
+                    request.player_b_id: deck_b,
+                },
+                knowledge_base=rulebook,
+                database=local_db,
+            )
+
+        referee = await asyncio.to_thread(setup)
+        await db.persist_local(local_db, match_id)
+
         _state_store[match_id] = referee.state
         _referees[match_id] = referee
         
@@ -143,55 +181,176 @@ async def get_match(
 @app.get("/matches/{match_id}/logs", response_model=List[LogEntryResponse])
 async def get_match_logs(
     match_id: str,
-    db: DatabaseClient = Depends(get_db),
+    db: AsyncDatabaseClient = Depends(get_db),
     # token: str = Depends(verify_token),
 ):
     """Get match logs."""
     try:
-        logs = db.get_logs(match_id)
-        return [
-            LogEntryResponse(
-                match_id=log.match_id,
-                actor=log.actor,
-                action=log.action,
-                payload=log.payload,
-                random_seed=log.random_seed.hex() if log.random_seed else None,
-                timestamp=None,  # TODO: Add timestamp to GameLogEntry
-            )
-            for log in logs
-        ]
+        return [_log_response(log, log_id) async for log_id, log in db.iter_logs(match_id)]
+    except Exception as e:
+        logger.error(f"获取日志时出错: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/matches/{match_id}/logs/page", response_model=LogPageResponse)
+async def get_match_logs_page(
+    match_id: str,
+    after: int = Query(0, ge=0, description="Return entries with id greater than this cursor"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncDatabaseClient = Depends(get_db),
+    # token: str = Depends(verify_token),
+):
+    """Get one page of match logs (keyset pagination on the log id)."""
+    try:
+        rows, next_cursor = await db.get_logs_page(match_id, after_id=after, limit=limit)
+        return LogPageResponse(
+            entries=[_log_response(log, log_id) for log_id, log in rows],
+            next_cursor=next_cursor,
+        )
     except Exception as e:
         logger.error(f"获取日志时出错: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/matches/{match_id}/logs/stream")
+async def stream_match_logs(
+    match_id: str,
+    http_request: Request,
+    after: int = Query(0, ge=0, description="Return entries with id greater than this cursor"),
+    follow: bool = Query(False, description="Keep the connection open and tail new entries"),
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    poll_interval: float = Query(1.0, gt=0, le=30),
+    db: AsyncDatabaseClient = Depends(get_db),
+    # token: str = Depends(verify_token),
+):
+    """Stream match logs as NDJSON or server-sent events.
+
+    Without ``follow`` the log is read through a server-side cursor and the
+    response ends at the last entry. With ``follow`` new entries are polled
+    every ``poll_interval`` seconds until the client disconnects. SSE clients
+    resume from the ``Last-Event-ID`` header after a reconnect.
+    """
+    last_event_id = http_request.headers.get("last-event-id")
+    if output_format == "sse" and last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+    encode = _encode_sse if output_format == "sse" else _encode_ndjson
+    media_type = "text/event-stream" if output_format == "sse" else "application/x-ndjson"
+
+    if not follow:
+        async def read_all():
+            async for log_id, log in db.iter_logs(match_id, after_id=after):
+                yield encode(log_id, log)
+
+        return StreamingResponse(read_all(), media_type=media_type)
+
+    async def tail():
+        cursor = after
+        while True:
+            rows, next_cursor = await db.get_logs_page(match_id, after_id=cursor, limit=_FOLLOW_PAGE_SIZE)
+            for log_id, log in rows:
+                cursor = log_id
+                yield encode(log_id, log)
+            if next_cursor is not None:
+                continue
+            if await http_request.is_disconnected():
+                break
+            if output_format == "sse":
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(poll_interval)
+
+    return StreamingResponse(tail(), media_type=media_type)
+
+
+_FOLLOW_PAGE_SIZE = 500
+
+
+def _format_seed(seed) -> Optional[str]:
+    if not seed:
+        return None
+    if isinstance(seed, (bytes, bytearray, memoryview)):
+        return bytes(seed).hex()
+    return str(seed)
+
+
+def _log_response(log: GameLogEntry, log_id: Optional[int] = None) -> LogEntryResponse:
+    return LogEntryResponse(
+        id=log_id,
+        match_id=log.match_id,
+        actor=log.actor,
+        action=log.action,
+        payload=log.payload,
+        random_seed=_format_seed(log.random_seed),
+        timestamp=None,  # TODO: Add timestamp to GameLogEntry
+    )
+
+
+def _log_json(log_id: int, log: GameLogEntry) -> str:
+    return json.dumps(
+        {
+            "id": log_id,
+            "match_id": log.match_id,
+            "actor": log.actor,
+            "action": log.action,
+            "payload": log.payload,
+            "random_seed": _format_seed(log.random_seed),
+        },
+        ensure_ascii=False,
+    )
+
+
+def _encode_ndjson(log_id: int, log: GameLogEntry) -> str:
+    return _log_json(log_id, log) + "\n"
+
+
+def _encode_sse(log_id: int, log: GameLogEntry) -> str:
+    return f"id: {log_id}\nevent: log\ndata: {_log_json(log_id, log)}\n\n"
+
+
 @app.post("/matches/{match_id}/replay")
 async def replay_match(
     match_id: str,
     request: ReplayRequest,
-    db: DatabaseClient = Depends(get_db),
+    db: AsyncDatabaseClient = Depends(get_db),
     # token: str = Depends(verify_token),
 ):
-    """Replay a match from logs."""
+    """Replay a match from logs.
+
+    Streams NDJSON: one reconstructed state per turn start in
+    ``[from_turn, to_turn]`` (or per log entry with ``per_action``).
+    """
     try:
-        logs = db.get_logs(match_id)
-        
-        # Filter by turn range if specified
-        if request.from_turn or request.to_turn:
-            # TODO: Filter logs by turn number
-            pass
-        
-        # Replay logic would go here
-        # For now, just return the logs
-        return {
-            "match_id": match_id,
-            "logs_count": len(logs),
-            "message": "Replay functionality to be implemented",
-        }
+        engine = ReplayEngine(await db.get_logs(match_id))
+    except ReplayError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"重放对局时出错: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    if request.per_action:
+        frames = engine.iter_frames(request.from_turn, request.to_turn)
+    else:
+        frames = engine.iter_turns(request.from_turn, request.to_turn)
+
+    def stream():
+        try:
+            for frame in frames:
+                yield json.dumps(
+                    {
+                        "match_id": match_id,
+                        "position": frame.position,
+                        "action": frame.entry.action if frame.entry else None,
+                        "turn_player": frame.state.turn_player,
+                        "turn_number": frame.state.turn_number,
+                        "phase": frame.state.phase,
+                        "state": capture_checkpoint(frame.state),
+                    }
+                ) + "\n"
+        except ReplayError as e:
+            logger.error(f"重放对局时出错: {e}")
+            yield json.dumps({"match_id": match_id, "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 
 @app.get("/health")
 async def health():
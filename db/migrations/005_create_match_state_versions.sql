@@ -0,0 +1,17 @@
+-- Migration: Store match state as periodic checkpoints plus per-action deltas
+-- matches.snapshot is only rewritten at checkpoints; every other action
+-- appends a compact delta row here.
+
+CREATE TABLE IF NOT EXISTS match_state_versions (
+    match_id TEXT NOT NULL REFERENCES matches(match_id) ON DELETE CASCADE,
+    version INT NOT NULL,
+    is_checkpoint BOOLEAN NOT NULL DEFAULT FALSE,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (match_id, version)
+);
+
+-- Partial index used to find the nearest checkpoint at or before a version
+CREATE INDEX IF NOT EXISTS idx_match_state_versions_checkpoints
+ON match_state_versions(match_id, version)
+WHERE is_checkpoint;
@@ -0,0 +1,16 @@
+-- Migration: Persistent embedding cache shared by the rule and memory services
+-- Vectors are keyed by model and the SHA-256 of the embedded text. They are
+-- stored as REAL[] rather than pgvector columns so models of any dimension
+-- share the table. Rows older than PTCG_EMBEDDING_CACHE_MAX_AGE_DAYS are
+-- ignored and pruned by the services.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    text_sha256 TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (model, text_sha256)
+);
+
+-- Used to prune expired rows
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
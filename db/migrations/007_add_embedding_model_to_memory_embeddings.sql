@@ -0,0 +1,12 @@
+-- Migration: Record which embedding model produced each memory vector
+-- Vectors from different models live in different spaces; the memory store
+-- only compares a query with memories embedded by the same model.
+-- Existing rows were embedded with OpenAI's text-embedding-3-large.
+
+ALTER TABLE memory_embeddings ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+UPDATE memory_embeddings
+SET embedding_model = 'text-embedding-3-large'
+WHERE embedding_model IS NULL AND embedding IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_memory_embeddings_model ON memory_embeddings(agent_id, embedding_model);
@@ -0,0 +1,24 @@
+-- Migration: Record which embedding model produced each rule vector
+-- Rule search only compares a query with rules embedded by the same model,
+-- and re-indexing skips rules whose text hash and model are unchanged.
+-- rule_embeddings is created by VectorRuleSearch.index_rules, so this is a
+-- no-op on databases where rules were never indexed. Existing rows were
+-- embedded with OpenAI's text-embedding-3-large.
+
+DO $$
+BEGIN
+    IF to_regclass('rule_embeddings') IS NOT NULL THEN
+        ALTER TABLE rule_embeddings
+            ADD COLUMN IF NOT EXISTS text_sha256 TEXT,
+            ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+        UPDATE rule_embeddings
+        SET embedding_model = 'text-embedding-3-large'
+        WHERE embedding_model IS NULL AND embedding IS NOT NULL;
+
+        -- Same key as ptcg_ai.embedding_cache.text_key (SHA-256 of the UTF-8 text)
+        UPDATE rule_embeddings
+        SET text_sha256 = encode(sha256(convert_to(text, 'UTF8')), 'hex')
+        WHERE text_sha256 IS NULL;
+    END IF;
+END $$;
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Estimate mulligan rate, opener odds and prize distribution for a deck."""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ptcg_ai.opening import analyze_opening
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--deck", default=str(project_root / "doc" / "deck" / "deck1.txt"))
+    parser.add_argument("--opponent-deck", default=None, help="Include the opponent's mulligan draws")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Games per batch")
+    parser.add_argument("--card", action="append", default=[], help="Card name to report (repeatable, default: all)")
+    args = parser.parse_args()
+
+    report = analyze_opening(
+        args.deck,
+        args.games,
+        seed=args.seed,
+        workers=args.workers,
+        opponent_deck_file=args.opponent_deck,
+        chunk_size=args.chunk_size,
+    )
+
+    print(f"Games:           {report.games}")
+    print(f"Wall time:       {report.wall_time:.2f}s")
+    print(f"Games/second:    {report.games_per_second:.0f}")
+    print(f"Mulligan rate:   {report.mulligan_rate:.2%}")
+    print(f"Avg mulligans:   {report.average_mulligans:.3f}")
+    if report.aborted:
+        print(f"Aborted:         {report.aborted}")
+    print()
+    print(f"{'Card':<32} {'In opener':>10}   Copies prized (0/1/2/...)")
+    for name in args.card or sorted(report.openers, key=report.openers.get, reverse=True):
+        distribution = report.prize_distribution(name)
+        prized = " / ".join(f"{distribution.get(copies, 0.0):.1%}" for copies in range(max(distribution, default=0) + 1))
+        print(f"{name:<32} {report.opener_probability(name):>10.1%}   {prized}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark GameState snapshot encode/decode throughput and size."""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ptcg_ai.headless import HeadlessMatch, RandomPlayerAgent, clone_deck
+from src.ptcg_ai.models import CardDefinition, CardInstance, Deck
+from src.ptcg_ai.referee import RefereeAgent
+from src.ptcg_ai.rulebook import RuleKnowledgeBase
+from src.ptcg_ai.simulation import build_deck
+from src.ptcg_ai.snapshot import CODEC_JSON_ZLIB, CODEC_MSGPACK, decode_state, encode_state, msgpack
+
+
+def _synthetic_deck(player_id: str) -> Deck:
+    pokemon = CardDefinition(
+        set_code="BEN",
+        number="1",
+        name="Bench Mon",
+        card_type="Pokemon",
+        hp=120,
+        stage="Basic",
+        rules_text="A benchmark Pokémon.",
+        attacks=[{"name": "Tackle", "cost": ["Colorless"], "damage": "30", "text": ""}],
+    )
+    energy = CardDefinition(set_code="BEN", number="2", name="Basic Energy", card_type="Energy")
+    cards = [
+        CardInstance(uid=f"{player_id}-{i}", owner_id=player_id, definition=pokemon if i % 2 == 0 else energy)
+        for i in range(60)
+    ]
+    return Deck(player_id=player_id, cards=cards)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--deck",
+        default=None,
+        help="Deck file, read via the card cache or JSON dumps; synthetic decks otherwise",
+    )
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=8, help="Turns to play before snapshotting")
+    args = parser.parse_args()
+
+    if args.deck:
+        decks = {pid: build_deck(pid, args.deck) for pid in ("playerA", "playerB")}
+    else:
+        decks = {pid: _synthetic_deck(pid) for pid in ("playerA", "playerB")}
+    referee = RefereeAgent.create(
+        "snapshot-benchmark",
+        {pid: clone_deck(deck) for pid, deck in decks.items()},
+        RuleKnowledgeBase(),
+    )
+    players = {pid: RandomPlayerAgent(pid, rng=random.Random(0)) for pid in decks}
+    HeadlessMatch(referee=referee, players=players, max_turns=args.turns).play()
+    state = referee.state
+
+    codecs = [("json+zlib", CODEC_JSON_ZLIB)]
+    if msgpack is not None:
+        codecs.append(("msgpack", CODEC_MSGPACK))
+    print(f"uid-only snapshot(): {len(str(state.snapshot()).encode('utf-8'))} bytes (repr)")
+    for label, codec in codecs:
+        payload = encode_state(state, codec)
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            encode_state(state, codec)
+        encode_time = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            decode_state(payload)
+        decode_time = time.perf_counter() - started
+        print(
+            f"{label:10s} size={len(payload):6d} bytes  "
+            f"encode={args.iterations / encode_time:9.0f}/s  decode={args.iterations / decode_time:9.0f}/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Build (or refresh) the local card cache used by build_deck."""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ptcg_ai.card_cache import DEFAULT_CACHE_PATH, open_card_cache
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=str(DEFAULT_CACHE_PATH), help="Cache file location")
+    parser.add_argument("--source", choices=["auto", "postgres", "json"], default="auto")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cache = open_card_cache(args.path, source=args.source)
+    print(f"Cache:        {cache.path}")
+    print(f"Source:       {cache.source} ({cache.source_hash[:12]})")
+    print(f"Cards:        {len(cache)}")
+    print(f"Elapsed:      {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Play random-policy matches without LLM agents and report throughput."""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ptcg_ai.tournament import run_tournament
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--deck-a", default=str(project_root / "doc" / "deck" / "deck1.txt"))
+    parser.add_argument("--deck-b", default=None, help="Defaults to --deck-a")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="Per-match results file (.csv, .jsonl or .parquet)")
+    args = parser.parse_args()
+
+    deck_files = {"playerA": args.deck_a, "playerB": args.deck_b or args.deck_a}
+    summary = run_tournament(
+        deck_files,
+        args.matches,
+        output=args.output,
+        seed=args.seed,
+        workers=args.workers,
+        max_turns=args.max_turns,
+    )
+
+    print(f"Matches:         {summary.matches}")
+    print(f"Wall time:       {summary.wall_time:.2f}s")
+    print(f"Matches/second:  {summary.matches_per_second:.1f}")
+    print(f"Average turns:   {summary.average_turns:.1f}")
+    for winner, count in sorted(summary.wins.items()):
+        print(f"  {winner}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
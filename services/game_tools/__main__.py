@@ -36,6 +36,8 @@ def main():
     except KeyboardInterrupt:
         logger.info("正在关闭服务器...")
         server.stop(0)
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
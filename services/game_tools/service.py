@@ -124,6 +124,7 @@ class GameToolsServicer(game_tools_pb2_grpc.GameToolsServiceServicer):
             drawn = deck.cards[:request.count]
             del deck.cards[:request.count]
             hand.cards.extend(drawn)
+            state.index_zone(request.player_id, Zone.HAND, len(hand.cards) - len(drawn))
             
             # Log the action
             from src.ptcg_ai.models import GameLogEntry
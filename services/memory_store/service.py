@@ -13,6 +13,9 @@ except ImportError:
     asyncpg = None
     OpenAI = None
 
+from src.ptcg_ai.embedding_cache import CachedEmbeddingProvider, EmbeddingStore, PostgresEmbeddingStore
+from src.ptcg_ai.embeddings import EmbeddingProvider, default_embedding_provider
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +29,8 @@ class MemoryStore:
         embedding_model: str = "text-embedding-3-large",
         similarity_threshold: float = 0.35,
         compression_interval: int = 10,
+        embedder: Optional[EmbeddingProvider] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
     ):
         """Initialize memory store.
         
@@ -35,10 +40,19 @@ class MemoryStore:
             embedding_model: Model for embeddings
             similarity_threshold: Cosine distance threshold for retrieval
             compression_interval: Number of events before compression
+            embedder: Embedding provider; defaults to ``default_embedding_provider``
+                (OpenAI when configured, the local hashing provider otherwise)
+            embedding_store: Persistent cache of query embeddings (memory
+                contents are not stored there); defaults to the
+                ``embedding_cache`` table in ``pool``
         """
         self.pool = pool
         self.client = openai_client or (OpenAI() if OpenAI else None)
-        self.embedding_model = embedding_model
+        self.embedder = CachedEmbeddingProvider(
+            embedder or default_embedding_provider(openai_client, model=embedding_model),
+            store=embedding_store or (PostgresEmbeddingStore(pool) if pool else None),
+        )
+        self.embedding_model = self.embedder.model
         self.similarity_threshold = similarity_threshold
         self.compression_interval = compression_interval
 
@@ -72,30 +86,26 @@ class MemoryStore:
 
         try:
             # Generate embedding
-            embedding = None
-            if self.client:
-                response = self.client.embeddings.create(
-                    model=self.embedding_model,
-                    input=content,
-                )
-                embedding = response.data[0].embedding
+            embedding = (await self.embedder.aembed([content], persist=False))[0]
 
             # Store in database
             async with self.pool.acquire() as conn:
                 await conn.execute(
                     """
                     INSERT INTO memory_embeddings 
-                    (agent_id, uid, content, embedding, metadata, match_id, turn_number, event_type)
-                    VALUES ($1, $2, $3, $4::vector, $5, $6, $7, $8)
+                    (agent_id, uid, content, embedding, embedding_model, metadata, match_id, turn_number, event_type)
+                    VALUES ($1, $2, $3, $4::vector, $5, $6, $7, $8, $9)
                     ON CONFLICT (uid) DO UPDATE SET
                         content = EXCLUDED.content,
                         embedding = EXCLUDED.embedding,
+                        embedding_model = EXCLUDED.embedding_model,
                         metadata = EXCLUDED.metadata
                     """,
                     agent_id,
                     uid,
                     content,
                     embedding,
+                    self.embedding_model,
                     json.dumps(metadata) if metadata else None,
                     match_id,
                     turn_number,
@@ -128,17 +138,13 @@ class MemoryStore:
         Returns:
             List of memory dictionaries
         """
-        if not self.pool or not self.client:
+        if not self.pool:
             # Fallback to recent memories
             return await self._get_recent_memories(agent_id, limit, match_id)
 
         try:
             # Generate query embedding
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=query,
-            )
-            query_embedding = response.data[0].embedding
+            query_embedding = (await self.embedder.aembed([query]))[0]
 
             # Search using pgvector
             async with self.pool.acquire() as conn:
@@ -149,18 +155,20 @@ class MemoryStore:
                     WHERE agent_id = $2
                       AND archived = FALSE
                       AND embedding IS NOT NULL
+                      AND embedding_model = $3
                 """
-                params = [query_embedding, agent_id]
+                # Memories embedded by another model live in another vector space
+                params = [query_embedding, agent_id, self.embedding_model]
 
                 if match_id:
-                    sql += " AND match_id = $3"
                     params.append(match_id)
+                    sql += f" AND match_id = ${len(params)}"
 
-                sql += """
+                params.append(limit * 2)  # Get more to filter by threshold
+                sql += f"""
                     ORDER BY embedding <=> $1::vector
-                    LIMIT $4
+                    LIMIT ${len(params)}
                 """
-                params.append(limit * 2)  # Get more to filter by threshold
 
                 rows = await conn.fetch(sql, *params)
 
@@ -303,24 +311,21 @@ class MemoryStore:
                 summary = response.choices[0].message.content
 
                 # Generate embedding for summary
-                embedding_response = self.client.embeddings.create(
-                    model=self.embedding_model,
-                    input=summary,
-                )
-                embedding = embedding_response.data[0].embedding
+                embedding = (await self.embedder.aembed([summary], persist=False))[0]
 
                 # Store summary
                 summary_uid = f"{agent_id}-summary-{datetime.utcnow().isoformat()}"
                 await conn.execute(
                     """
                     INSERT INTO memory_embeddings
-                    (agent_id, uid, content, embedding, metadata, match_id, archived)
-                    VALUES ($1, $2, $3, $4::vector, $5, $6, FALSE)
+                    (agent_id, uid, content, embedding, embedding_model, metadata, match_id, archived)
+                    VALUES ($1, $2, $3, $4::vector, $5, $6, $7, FALSE)
                     """,
                     agent_id,
                     summary_uid,
                     summary,
                     embedding,
+                    self.embedding_model,
                     json.dumps({"type": "summary", "compressed_from": len(rows)}),
                     match_id,
                 )
@@ -1,6 +1,7 @@
 """Vector search implementation for Rule Knowledge Base."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import List, Optional
 
@@ -11,6 +12,8 @@ except ImportError:
     asyncpg = None
     OpenAI = None
 
+from src.ptcg_ai.embedding_cache import CachedEmbeddingProvider, EmbeddingStore, PostgresEmbeddingStore, text_key
+from src.ptcg_ai.embeddings import EmbeddingProvider, default_embedding_provider
 from src.ptcg_ai.rulebook import RuleEntry, RuleKnowledgeBase
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,8 @@ class VectorRuleSearch:
         openai_client: Optional[OpenAI] = None,
         embedding_model: str = "text-embedding-3-large",
         similarity_threshold: float = 0.35,
+        embedder: Optional[EmbeddingProvider] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
     ):
         """Initialize vector search.
         
@@ -33,10 +38,17 @@ class VectorRuleSearch:
             openai_client: OpenAI client for embeddings
             embedding_model: Model to use for embeddings
             similarity_threshold: Cosine distance threshold (lower = more similar)
+            embedder: Embedding provider; defaults to ``default_embedding_provider``
+                (OpenAI when configured, the local hashing provider otherwise)
+            embedding_store: Persistent embedding cache; defaults to the
+                ``embedding_cache`` table in ``pool``
         """
         self.pool = pool
-        self.client = openai_client or (OpenAI() if OpenAI else None)
-        self.embedding_model = embedding_model
+        self.embedder = CachedEmbeddingProvider(
+            embedder or default_embedding_provider(openai_client, model=embedding_model),
+            store=embedding_store or (PostgresEmbeddingStore(pool) if pool else None),
+        )
+        self.embedding_model = self.embedder.model
         self.similarity_threshold = similarity_threshold
         self.fallback_kb: Optional[RuleKnowledgeBase] = None
 
@@ -60,7 +72,7 @@ class VectorRuleSearch:
         Returns:
             List of matching rule entries
         """
-        if not self.pool or not self.client:
+        if not self.pool:
             # Fallback to substring search
             if use_fallback and self.fallback_kb:
                 return self.fallback_kb.find(query, limit=limit)
@@ -68,11 +80,7 @@ class VectorRuleSearch:
 
         try:
             # Generate query embedding
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=query,
-            )
-            query_embedding = response.data[0].embedding
+            query_embedding = (await self.embedder.aembed([query]))[0]
 
             # Search using pgvector
             async with self.pool.acquire() as conn:
@@ -84,11 +92,13 @@ class VectorRuleSearch:
                            (embedding <=> $1::vector) as distance
                     FROM rule_embeddings
                     WHERE embedding IS NOT NULL
+                      AND embedding_model = $3
                     ORDER BY embedding <=> $1::vector
                     LIMIT $2
                     """,
                     query_embedding,
                     limit * 2,  # Get more results to filter by threshold
+                    self.embedding_model,  # Vectors of other models live in another space
                 )
 
                 results = []
@@ -111,71 +121,136 @@ class VectorRuleSearch:
 
         return []
 
-    async def index_rules(self, kb: RuleKnowledgeBase) -> int:
+    async def index_rules(
+        self,
+        kb: RuleKnowledgeBase,
+        batch_size: int = 64,
+        concurrency: int = 4,
+    ) -> int:
         """Index rules from knowledge base into vector database.
         
+        Rules whose text hash and embedding model match the stored row are
+        skipped. The rest are embedded in batches of ``batch_size`` texts with
+        at most ``concurrency`` requests in flight, bulk-loaded with COPY and
+        upserted in one statement. The vector index is built after the load.
+        
         Args:
             kb: Rule knowledge base to index
+            batch_size: Number of texts per embedding request
+            concurrency: Maximum number of concurrent embedding requests
             
         Returns:
-            Number of rules indexed
+            Number of rules indexed (unchanged rules are not counted)
         """
-        if not self.pool or not self.client:
-            logger.warning("无法索引规则：连接池或客户端不可用")
+        if not self.pool:
+            logger.warning("无法索引规则：连接池不可用")
             return 0
 
-        indexed = 0
         async with self.pool.acquire() as conn:
             # Create rule_embeddings table if it doesn't exist
             await conn.execute(
-                """
+                f"""
                 CREATE TABLE IF NOT EXISTS rule_embeddings (
                     section TEXT PRIMARY KEY,
                     text TEXT NOT NULL,
-                    embedding vector(3072),
+                    embedding vector({self.embedder.dimensions}),
                     created_at TIMESTAMP DEFAULT NOW()
                 )
                 """
             )
+            await conn.execute(
+                """
+                ALTER TABLE rule_embeddings
+                    ADD COLUMN IF NOT EXISTS text_sha256 TEXT,
+                    ADD COLUMN IF NOT EXISTS embedding_model TEXT
+                """
+            )
+            rows = await conn.fetch(
+                "SELECT section, text_sha256, embedding_model FROM rule_embeddings WHERE embedding IS NOT NULL"
+            )
 
-            # Create index for vector search
-            try:
+        # Skip rules that are already embedded from the same text with the same model
+        stored = {row["section"]: (row["text_sha256"], row["embedding_model"]) for row in rows}
+        pending = []
+        total = 0
+        for entry in kb:
+            total += 1
+            digest = text_key(entry.text)
+            if stored.get(entry.section) != (digest, self.embedding_model):
+                pending.append((entry, digest))
+        if not pending:
+            logger.info("规则索引已是最新，无需更新")
+            return 0
+
+        # Embed in batches; the index bypasses the query cache so it is not flooded
+        provider = self.embedder.provider
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        batches = [pending[start : start + batch_size] for start in range(0, len(pending), max(1, batch_size))]
+
+        async def embed_batch(batch):
+            async with semaphore:
+                try:
+                    return await provider.aembed([entry.text for entry, _ in batch])
+                except Exception as e:
+                    sections = f"{batch[0][0].section}..{batch[-1][0].section}"
+                    logger.error(f"嵌入规则 {sections} 时出错: {e}", exc_info=True)
+                    return None
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        records = [
+            (entry.section, entry.text, digest, self.embedding_model, [float(value) for value in embedding])
+            for batch, embeddings in zip(batches, results)
+            if embeddings is not None
+            for (entry, digest), embedding in zip(batch, embeddings)
+        ]
+        if not records:
+            return 0
+
+        async with self.pool.acquire() as conn:
+            # Bulk load through a staging table, then upsert in one statement
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE rule_embeddings_load (
+                        section TEXT,
+                        text TEXT,
+                        text_sha256 TEXT,
+                        embedding_model TEXT,
+                        embedding REAL[]
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table(
+                    "rule_embeddings_load",
+                    records=records,
+                    columns=["section", "text", "text_sha256", "embedding_model", "embedding"],
+                )
                 await conn.execute(
                     """
+                    INSERT INTO rule_embeddings (section, text, text_sha256, embedding_model, embedding)
+                    SELECT section, text, text_sha256, embedding_model, embedding::vector
+                    FROM rule_embeddings_load
+                    ON CONFLICT (section) DO UPDATE SET
+                        text = EXCLUDED.text,
+                        text_sha256 = EXCLUDED.text_sha256,
+                        embedding_model = EXCLUDED.embedding_model,
+                        embedding = EXCLUDED.embedding
+                    """
+                )
+
+            # Build the vector index once the data is in place
+            count = await conn.fetchval("SELECT COUNT(*) FROM rule_embeddings WHERE embedding IS NOT NULL")
+            try:
+                await conn.execute(
+                    f"""
                     CREATE INDEX IF NOT EXISTS idx_rule_embeddings_vector
                     ON rule_embeddings USING ivfflat (embedding vector_cosine_ops)
-                    WITH (lists = 100)
+                    WITH (lists = {max(1, count // 1000)})
                     """
                 )
             except Exception as e:
                 logger.warning(f"无法创建向量索引: {e}")
+            await conn.execute("ANALYZE rule_embeddings")
 
-            # Index each rule
-            for entry in kb:
-                try:
-                    # Generate embedding
-                    response = self.client.embeddings.create(
-                        model=self.embedding_model,
-                        input=entry.text,
-                    )
-                    embedding = response.data[0].embedding
-
-                    # Store in database
-                    await conn.execute(
-                        """
-                        INSERT INTO rule_embeddings (section, text, embedding)
-                        VALUES ($1, $2, $3::vector)
-                        ON CONFLICT (section) DO UPDATE SET
-                            text = EXCLUDED.text,
-                            embedding = EXCLUDED.embedding
-                        """,
-                        entry.section,
-                        entry.text,
-                        embedding,
-                    )
-                    indexed += 1
-                except Exception as e:
-                    logger.error(f"索引规则 {entry.section} 时出错: {e}", exc_info=True)
-
-        logger.info(f"已索引 {indexed} 条规则")
-        return indexed
+        logger.info(f"已索引 {len(records)} 条规则（跳过 {total - len(pending)} 条未变更规则）")
+        return len(records)
@@ -279,12 +279,10 @@ def run_full_game(referee: BaseRefereeAgent, players: dict[str, Union[BasePlayer
     # 1.2 双方充分洗牌（如果初始化时已经放置了奖赏卡，需要先洗回牌库）
     for player_id in players.keys():
         prize_zone = referee.state.players[player_id].zone(Zone.PRIZE)
-        deck = referee.state.players[player_id].zone(Zone.DECK)
-        
+
         # 如果奖赏卡已经放置了（初始化时），先洗回牌库
         if prize_zone.cards:
-            deck.cards.extend(prize_zone.cards)
-            prize_zone.cards.clear()
+            referee.tools.return_prizes_to_deck(player_id)
             log_print(f"  {player_id}: 将初始化时放置的奖赏卡洗回牌库")
         
         referee.tools.shuffle(player_id, Zone.DECK)
@@ -395,14 +393,12 @@ def run_full_game(referee: BaseRefereeAgent, players: dict[str, Union[BasePlayer
                 # 如果奖赏卡已经放置了（初始化时），先清空
                 if prize_zone.cards:
                     # 将已放置的奖赏卡洗回牌库
-                    deck.cards.extend(prize_zone.cards)
-                    prize_zone.cards.clear()
+                    referee.tools.return_prizes_to_deck(player_id)
                     referee.tools.shuffle(player_id, Zone.DECK)
                 
                 # 确保牌库有足够的卡
                 if len(deck.cards) >= 6:
-                    prize_zone.cards[:] = deck.cards[:6]
-                    del deck.cards[:6]
+                    referee.tools.place_prizes(player_id, 6)
                     log_print(f"  {player_id}: 放置6张奖赏卡")
                 else:
                     log_print(f"  ⚠️ {player_id}: 牌库不足6张，无法放置奖赏卡")
@@ -601,6 +597,11 @@ def run_full_game(referee: BaseRefereeAgent, players: dict[str, Union[BasePlayer
                     }
                     for card in opponent_discard.cards[-10:]  # 只显示最近10张
                 ],
+                # 当前合法操作菜单（已按回合、每回合限制、能量需求等规则过滤）
+                "legal_actions": [
+                    {"action": request.action, "payload": request.payload}
+                    for request in referee.legal_actions(current_player)
+                ],
             }
             
             # 如果有上一次操作的错误消息，添加到观察信息中
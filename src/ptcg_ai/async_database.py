@@ -0,0 +1,291 @@
+"""Async, pooled counterpart of :class:`~ptcg_ai.database.DatabaseClient`.
+
+Web services create one :class:`AsyncDatabaseClient` at startup and share it
+across requests. Connections come from a ``psycopg_pool.AsyncConnectionPool``,
+so handlers never block the event loop and the number of Postgres connections
+stays bounded by ``max_size`` however many requests are in flight. Without a
+DSN or ``psycopg_pool`` the client uses the same in-memory store as the
+synchronous client.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .database import (
+    _LOG_INSERT,
+    _LOGS_PAGE_SELECT,
+    _LOGS_SELECT,
+    _LOGS_TAIL_SELECT,
+    _MATCH_UPSERT,
+    _VERSION_INSERT,
+    _VERSIONS_SELECT,
+    DatabaseClient,
+    InMemoryDatabase,
+    _follows_journal,
+    _latest_version,
+    _log_row,
+    _match_row,
+    _stage_version,
+    build_postgres_dsn,
+)
+from .models import GameLogEntry, GameState
+from .state_delta import Checkpoint, rebuild_version
+
+try:  # pragma: no cover - optional dependency
+    from psycopg_pool import AsyncConnectionPool
+except Exception:  # pragma: no cover - optional dependency
+    AsyncConnectionPool = None  # type: ignore
+
+
+class AsyncDatabaseClient:
+    """Async database client sharing one connection pool.
+
+    Exposes the :class:`~ptcg_ai.database.DatabaseClient` surface
+    (``persist_state``, ``append_log``, ``get_logs`` …) as coroutines. Log
+    entries are buffered exactly like the synchronous client and written in
+    one ``executemany`` per flush; a lock keeps concurrent flushes from
+    interleaving. Call :meth:`open` before use and :meth:`close` on shutdown
+    (or use ``async with``).
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        memory_store: Optional[InMemoryDatabase] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        log_batch_size: int = 500,
+        log_flush_interval: float = 1.0,
+        checkpoint_interval: int = 50,
+    ) -> None:
+        self._memory = DatabaseClient(memory_store=memory_store, checkpoint_interval=checkpoint_interval)
+        self._pool = None
+        self._log_batch_size = log_batch_size
+        self._log_flush_interval = log_flush_interval
+        self._log_buffer: List[Tuple[object, ...]] = []
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+        self._checkpoint_interval = checkpoint_interval
+        self._versions: Dict[str, Tuple[int, object, int]] = {}
+        self._copied_logs: Dict[str, int] = {}
+        if dsn and AsyncConnectionPool is not None:
+            self._pool = AsyncConnectionPool(  # pragma: no cover - integration path
+                dsn, min_size=min_size, max_size=max_size, open=False
+            )
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "AsyncDatabaseClient":
+        """Build a client from the ``PG*`` variables plus ``PGPOOL_MIN_SIZE``/``PGPOOL_MAX_SIZE``."""
+
+        kwargs.setdefault("min_size", int(os.getenv("PGPOOL_MIN_SIZE", "1")))
+        kwargs.setdefault("max_size", int(os.getenv("PGPOOL_MAX_SIZE", "10")))
+        return cls(dsn=build_postgres_dsn(), **kwargs)
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+    async def open(self) -> None:
+        if self._pool is not None:
+            await self._pool.open()
+
+    async def close(self) -> None:
+        """Flush pending log entries and close the pool."""
+
+        if self._pool is None:
+            return
+        try:  # pragma: no cover - integration path
+            await self.flush_logs()
+        finally:  # pragma: no cover - integration path
+            await self._pool.close()
+
+    async def __aenter__(self) -> "AsyncDatabaseClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # persistence helpers
+    # ------------------------------------------------------------------
+    async def persist_state(self, state: GameState) -> Optional[int]:
+        """Record the current state as a new version (see :meth:`DatabaseClient.persist_state`)."""
+
+        if self._pool is None:
+            return self._memory.persist_state(state)
+        return await self._persist(state, [])
+
+    async def _persist(self, state: GameState, log_rows: List[Tuple[object, ...]]) -> Optional[int]:
+        """Write the next version of ``state``, then ``log_rows`` and the buffered logs.
+
+        ``log_rows`` only join the buffer once the ``matches`` row is written
+        (or known to exist), so no flush can send them ahead of it.
+        """
+
+        tracked = self._versions.get(state.match_id)
+        latest = None if _follows_journal(tracked, state) else await self._load_latest(state.match_id)
+        tracked, row = _stage_version(tracked, latest, state, self._checkpoint_interval)
+        if row is None:
+            # A stored version exists, and with it the matches row.
+            self._versions[state.match_id] = tracked
+            if log_rows:
+                self._log_buffer.extend(log_rows)
+                await self.flush_logs()
+            return None
+        version, is_checkpoint, payload = row
+        queued = False
+        try:
+            async with self._flush_lock, self._pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(_MATCH_UPSERT, _match_row(state, is_checkpoint))
+                    await cur.execute(_VERSION_INSERT, (state.match_id, version, is_checkpoint, payload))
+                    self._log_buffer[:0] = log_rows
+                    queued = True
+                    await self._write_buffered_logs(cur)
+        except Exception:
+            # Another writer may own this version; re-read the table next time.
+            self._versions.pop(state.match_id, None)
+            if queued:
+                # The caller hands these rows over again on its next attempt.
+                del self._log_buffer[: len(log_rows)]
+            raise
+        self._versions[state.match_id] = tracked
+        self._last_flush = time.monotonic()
+        return version
+
+    async def _load_latest(self, match_id: str) -> Optional[Tuple[int, Checkpoint]]:
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_VERSIONS_SELECT, {"match_id": match_id, "version": None})
+                return _latest_version(await cur.fetchall())
+
+    async def append_log(self, entry: GameLogEntry) -> None:
+        if self._pool is None:
+            self._memory.append_log(entry)
+            return
+
+        self._log_buffer.append(_log_row(entry))
+        if (
+            len(self._log_buffer) >= self._log_batch_size
+            or time.monotonic() - self._last_flush >= self._log_flush_interval
+        ):
+            await self.flush_logs()
+
+    async def flush_logs(self) -> None:
+        """Write all buffered log entries in one round trip and commit."""
+
+        if self._pool is None or not self._log_buffer:
+            return
+        async with self._flush_lock, self._pool.connection() as conn:  # pragma: no cover - integration path
+            async with conn.cursor() as cur:
+                await self._write_buffered_logs(cur)
+        self._last_flush = time.monotonic()
+
+    async def _write_buffered_logs(self, cur) -> None:  # pragma: no cover - integration path
+        if not self._log_buffer:
+            return
+        rows = self._log_buffer
+        self._log_buffer = []
+        try:
+            await cur.executemany(_LOG_INSERT, rows)
+        except Exception:
+            # Keep the rows so a later flush can retry them; the pool rolls
+            # the connection back when the block exits with an error.
+            self._log_buffer = rows + self._log_buffer
+            raise
+
+    # ------------------------------------------------------------------
+    # read helpers
+    # ------------------------------------------------------------------
+    async def load_state_version(self, match_id: str, version: Optional[int] = None) -> Tuple[int, Checkpoint]:
+        if self._pool is None:
+            return self._memory.load_state_version(match_id, version)
+
+        async with self._pool.connection() as conn:  # pragma: no cover - integration path
+            async with conn.cursor() as cur:
+                await cur.execute(_VERSIONS_SELECT, {"match_id": match_id, "version": version})
+                rows = await cur.fetchall()
+        return rebuild_version(rows, version)
+
+    async def get_logs(self, match_id: str) -> List[GameLogEntry]:
+        if self._pool is None:
+            return self._memory.get_logs(match_id)
+
+        await self.flush_logs()
+        async with self._pool.connection() as conn:  # pragma: no cover - integration path
+            async with conn.cursor() as cur:
+                await cur.execute(_LOGS_SELECT, (match_id,))
+                rows = await cur.fetchall()
+        return [GameLogEntry(*row) for row in rows]
+
+    async def get_logs_page(
+        self, match_id: str, after_id: int = 0, limit: int = 500
+    ) -> Tuple[List[Tuple[int, GameLogEntry]], Optional[int]]:
+        """Keyset-paginated log read (see :meth:`DatabaseClient.get_logs_page`)."""
+
+        if self._pool is None:
+            return self._memory.get_logs_page(match_id, after_id=after_id, limit=limit)
+
+        await self.flush_logs()
+        async with self._pool.connection() as conn:  # pragma: no cover - integration path
+            async with conn.cursor() as cur:
+                await cur.execute(_LOGS_PAGE_SELECT, (match_id, after_id, limit))
+                rows = [(row[0], GameLogEntry(*row[1:])) for row in await cur.fetchall()]
+        next_cursor = rows[-1][0] if len(rows) == limit else None
+        return rows, next_cursor
+
+    async def iter_logs(
+        self, match_id: str, after_id: int = 0, batch_size: int = 500
+    ) -> AsyncIterator[Tuple[int, GameLogEntry]]:
+        """Stream ``(id, entry)`` pairs through a server-side cursor.
+
+        The pooled connection is held until the iteration finishes.
+        """
+
+        if self._pool is None:
+            for row in self._memory.iter_logs(match_id, after_id=after_id):
+                yield row
+            return
+
+        await self.flush_logs()
+        async with self._pool.connection() as conn:  # pragma: no cover - integration path
+            async with conn.cursor(name=f"match_logs_{match_id}_{after_id}") as cur:
+                cur.itersize = batch_size
+                await cur.execute(_LOGS_TAIL_SELECT, (match_id, after_id))
+                async for row in cur:
+                    yield row[0], GameLogEntry(*row[1:])
+
+    # ------------------------------------------------------------------
+    # bridging
+    # ------------------------------------------------------------------
+    async def persist_local(self, local: DatabaseClient, match_id: str) -> Optional[int]:
+        """Copy a match recorded by an in-memory :class:`DatabaseClient`.
+
+        Lets request handlers run synchronous engine code (the referee calls
+        its database inline) against a throwaway in-memory client, then write
+        the resulting logs and latest state through the pool. Logs recorded
+        since the previous call are written in the same transaction as the
+        state, after the ``matches`` row they reference, without going
+        through :meth:`append_log` (whose flush could run first). Nothing is
+        copied until the match has a state.
+        """
+
+        store = local._memory
+        state = store.matches.get(match_id)
+        if state is None:
+            return None
+        entries = store.logs.get(match_id, [])
+        pending = entries[self._copied_logs.get(match_id, 0):]
+        if self._pool is None:
+            for entry in pending:
+                self._memory.append_log(entry)
+            version = self._memory.persist_state(state)
+        else:
+            version = await self._persist(state, [_log_row(entry) for entry in pending])
+        self._copied_logs[match_id] = len(entries)
+        return version
+
+__all__ = ["AsyncDatabaseClient"]
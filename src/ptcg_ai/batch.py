@@ -0,0 +1,292 @@
+"""Lockstep batch engine for Monte Carlo opening-hand and prize analysis.
+
+:class:`BatchEngine` advances ``B`` independent matches between the same two
+decks at once. Cards are identified by their index in the template deck and
+every zone is one flat, row-major index array per player (``B`` rows of deck
+length, plus a length column), so one operation walks the batch with C-level
+slice copies instead of moving :class:`~ptcg_ai.models.CardInstance` objects.
+Damage lives in a parallel ``B x deck`` column.
+
+The operations mirror :class:`~ptcg_ai.game_tools.GameTools` (``shuffle``,
+``draw``, ``take_prize``, ``update_damage``, ``check_ko`` …) and each row
+draws from its own :class:`~ptcg_ai.rng.MatchRng`, so row ``b`` ends in the
+same state as a scalar match seeded with ``seeds[b]`` that ran the same
+operations. :meth:`BatchEngine.setup` is the batched
+:meth:`HeadlessMatch.setup <ptcg_ai.headless.HeadlessMatch.setup>`.
+"""
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from .headless import MAX_BENCH_SIZE, OPENING_HAND_SIZE, PRIZE_COUNT
+from .models import CardDefinition, Deck, Zone
+from .rng import MatchRng
+
+Rows = Optional[Iterable[int]]
+
+
+def _is_basic_pokemon(definition: CardDefinition) -> bool:
+    return definition.card_type == "Pokemon" and definition.stage == "Basic"
+
+
+class _Side:
+    """Column storage for one player across the whole batch."""
+
+    __slots__ = ("definitions", "width", "hp", "basic", "cards", "lengths", "damage", "prizes_remaining")
+
+    def __init__(self, deck: Deck, size: int) -> None:
+        self.definitions: List[CardDefinition] = [card.definition for card in deck.cards]
+        width = self.width = len(self.definitions)
+        self.hp = array("i", [-1 if d.hp is None else d.hp for d in self.definitions])
+        self.basic = bytes(_is_basic_pokemon(d) for d in self.definitions)
+        self.cards = {zone: array("h", [0]) * (size * width) for zone in Zone}
+        self.lengths = {zone: array("H", [0]) * size for zone in Zone}
+        self.cards[Zone.DECK] = array("h", range(width)) * size
+        self.lengths[Zone.DECK] = array("H", [width]) * size
+        self.damage = array("H", [card.damage for card in deck.cards]) * size
+        self.prizes_remaining = array("b", [PRIZE_COUNT]) * size
+
+    def row(self, zone: Zone, b: int) -> array:
+        start = b * self.width
+        return self.cards[zone][start : start + self.lengths[zone][b]]
+
+    def take_top(self, zone: Zone, b: int, count: int) -> array:
+        cards = self.cards[zone]
+        start = b * self.width
+        length = self.lengths[zone][b]
+        count = min(count, length)
+        taken = cards[start : start + count]
+        cards[start : start + length - count] = cards[start + count : start + length]
+        self.lengths[zone][b] = length - count
+        return taken
+
+    def extend(self, zone: Zone, b: int, values: array) -> None:
+        start = b * self.width + self.lengths[zone][b]
+        self.cards[zone][start : start + len(values)] = values
+        self.lengths[zone][b] += len(values)
+
+    def remove(self, zone: Zone, b: int, card: int) -> None:
+        row = self.row(zone, b)
+        try:
+            index = row.index(card)
+        except ValueError:
+            raise ValueError(f"Card {card} not found in {zone.value} of row {b}") from None
+        start = b * self.width
+        length = len(row)
+        cards = self.cards[zone]
+        cards[start + index : start + length - 1] = cards[start + index + 1 : start + length]
+        self.lengths[zone][b] = length - 1
+
+
+class BatchEngine:
+    """``B`` matches of the same two decks advanced in lockstep.
+
+    Every operation takes an optional ``rows`` iterable to restrict it to a
+    subset of matches (for example the rows that must mulligan); by default it
+    applies to the whole batch. Card ids returned by queries are indexes into
+    ``decks[player_id].cards``. With a single deck the engine runs solitaire:
+    there is no opponent to take prizes or grant mulligan draws.
+    """
+
+    def __init__(self, decks: Mapping[str, Deck], seeds: Sequence[int]) -> None:
+        if len(decks) not in (1, 2):
+            raise ValueError("BatchEngine needs one or two decks")
+        self.size = len(seeds)
+        self.player_ids = list(decks)
+        self.rngs = [MatchRng(seed) for seed in seeds]
+        self._sides = {player_id: _Side(deck, self.size) for player_id, deck in decks.items()}
+        self.mulligans = {player_id: array("H", [0]) * self.size for player_id in decks}
+        self._random = random.Random()
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    def zone(self, player_id: str, zone: Zone, row: int) -> List[int]:
+        return self._sides[player_id].row(zone, row).tolist()
+
+    def zone_sizes(self, player_id: str, zone: Zone) -> List[int]:
+        return self._sides[player_id].lengths[zone].tolist()
+
+    def damage(self, player_id: str, card: int, row: int) -> int:
+        side = self._sides[player_id]
+        return side.damage[row * side.width + card]
+
+    def prizes_remaining(self, player_id: str) -> List[int]:
+        return self._sides[player_id].prizes_remaining.tolist()
+
+    def definition(self, player_id: str, card: int) -> CardDefinition:
+        return self._sides[player_id].definitions[card]
+
+    def count_basics(self, player_id: str, zone: Zone = Zone.HAND, rows: Rows = None) -> List[int]:
+        """Number of Basic Pokémon in ``zone`` for each row."""
+
+        side = self._sides[player_id]
+        basic = side.basic
+        return [sum(basic[card] for card in side.row(zone, b)) for b in self._rows(rows)]
+
+    # ------------------------------------------------------------------
+    # GameTools operations
+    # ------------------------------------------------------------------
+    def shuffle(self, player_id: str, zone: Zone, rows: Rows = None) -> None:
+        side = self._sides[player_id]
+        cards = side.cards[zone]
+        for b in self._rows(rows):
+            start = b * side.width
+            stop = start + side.lengths[zone][b]
+            values = cards[start:stop]
+            self._random.seed(self.rngs[b].next_int())
+            self._random.shuffle(values)
+            cards[start:stop] = values
+
+    def draw(self, player_id: str, count: int, rows: Rows = None) -> None:
+        self._move_top(player_id, Zone.DECK, Zone.HAND, count, rows)
+
+    def place_prizes(self, player_id: str, count: int = PRIZE_COUNT, rows: Rows = None) -> None:
+        self._move_top(player_id, Zone.DECK, Zone.PRIZE, count, rows)
+
+    def return_prizes_to_deck(self, player_id: str, rows: Rows = None) -> None:
+        side = self._sides[player_id]
+        for b in self._rows(rows):
+            side.extend(Zone.DECK, b, side.take_top(Zone.PRIZE, b, side.width))
+
+    def take_prize(self, player_id: str, count: int = 1, rows: Rows = None) -> None:
+        side = self._sides[player_id]
+        for b in self._rows(rows):
+            taken = side.take_top(Zone.PRIZE, b, count)
+            side.extend(Zone.HAND, b, taken)
+            side.prizes_remaining[b] -= len(taken)
+
+    def shuffle_hand_into_deck(self, player_id: str, rows: Rows = None) -> None:
+        rows = list(self._rows(rows))
+        side = self._sides[player_id]
+        for b in rows:
+            side.extend(Zone.DECK, b, side.take_top(Zone.HAND, b, side.width))
+        self.shuffle(player_id, Zone.DECK, rows)
+
+    def move_card(self, player_id: str, source: Zone, target: Zone, cards: Sequence[int], rows: Rows = None) -> None:
+        """Move ``cards[i]`` from ``source`` to the end of ``target`` in the i-th selected row."""
+
+        side = self._sides[player_id]
+        for b, card in zip(self._rows(rows), cards):
+            side.remove(source, b, card)
+            side.extend(target, b, array("h", (card,)))
+
+    def update_damage(self, player_id: str, delta: int, rows: Rows = None) -> None:
+        """Add ``delta`` damage (heal when negative) to each row's Active Pokémon."""
+
+        side = self._sides[player_id]
+        for b in self._rows(rows):
+            slot = b * side.width + self._active(side, b)
+            side.damage[slot] = max(0, side.damage[slot] + delta)
+
+    def check_ko(self, player_id: str, rows: Rows = None) -> List[bool]:
+        """Knock out each row's Active Pokémon if its damage reaches its HP.
+
+        As in :meth:`GameTools.check_ko`, the opponent takes one prize and the
+        Pokémon goes to the discard pile. Returns one flag per selected row.
+        """
+
+        side = self._sides[player_id]
+        opponent_id = self._opponent(player_id)
+        opponent = self._sides.get(opponent_id)
+        knocked_out = []
+        for b in self._rows(rows):
+            card = self._active(side, b)
+            hp = side.hp[card]
+            is_ko = hp >= 0 and side.damage[b * side.width + card] >= hp
+            if is_ko:
+                if opponent is not None and opponent.prizes_remaining[b] > 0:
+                    self.take_prize(opponent_id, 1, (b,))
+                side.extend(Zone.DISCARD, b, side.take_top(Zone.ACTIVE, b, 1))
+            knocked_out.append(is_ko)
+        return knocked_out
+
+    # ------------------------------------------------------------------
+    # match flow
+    # ------------------------------------------------------------------
+    def initialise(self) -> None:
+        """Shuffle each deck and set aside prizes, like :meth:`RefereeAgent.create`."""
+
+        for player_id in self.player_ids:
+            self.shuffle(player_id, Zone.DECK)
+            self.place_prizes(player_id, PRIZE_COUNT)
+
+    def setup(self, max_mulligans: int = 50) -> List[Optional[str]]:
+        """Opening hands, mulligans, Active/Bench placement and prizes.
+
+        Mirrors :meth:`HeadlessMatch.setup` with the default choice of the
+        first Basic as Active. Returns one abort reason (or ``None``) per row;
+        aborted rows are left where the scalar engine would stop. Mulligan
+        counts are kept in :attr:`mulligans`.
+        """
+
+        for player_id in self.player_ids:
+            side = self._sides[player_id]
+            self.return_prizes_to_deck(player_id, [b for b in self._rows(None) if side.lengths[Zone.PRIZE][b]])
+            self.shuffle(player_id, Zone.DECK)
+            self.draw(player_id, OPENING_HAND_SIZE)
+
+        mulligans = self.mulligans
+        reasons: List[Optional[str]] = [None] * self.size
+        pending = list(self._rows(None))
+        while pending:
+            missing = {player_id: self.count_basics(player_id, rows=pending) for player_id in self.player_ids}
+            still_pending = []
+            for i, b in enumerate(pending):
+                if not any(missing[player_id][i] == 0 for player_id in self.player_ids):
+                    continue
+                still_pending.append(b)
+                for player_id in self.player_ids:
+                    if missing[player_id][i]:
+                        continue
+                    mulligans[player_id][b] += 1
+                    if mulligans[player_id][b] > max_mulligans:
+                        reasons[b] = f"no_basic_pokemon:{player_id}"
+                        still_pending.pop()
+                        break
+                    self.shuffle_hand_into_deck(player_id, (b,))
+                    self.draw(player_id, OPENING_HAND_SIZE, (b,))
+            pending = still_pending
+
+        ready = [b for b in self._rows(None) if reasons[b] is None]
+        for player_id in self.player_ids if len(self.player_ids) == 2 else ():
+            opponent_mulligans = mulligans[self._opponent(player_id)]
+            for b in ready:
+                extra = opponent_mulligans[b] - mulligans[player_id][b]
+                if extra > 0:
+                    self.draw(player_id, extra, (b,))
+
+        for player_id in self.player_ids:
+            side = self._sides[player_id]
+            for b in ready:
+                basics = [card for card in side.row(Zone.HAND, b) if side.basic[card]]
+                self.move_card(player_id, Zone.HAND, Zone.ACTIVE, basics[:1], (b,))
+                bench = basics[1 : 1 + MAX_BENCH_SIZE]
+                self.move_card(player_id, Zone.HAND, Zone.BENCH, bench, (b,) * len(bench))
+            self.place_prizes(player_id, PRIZE_COUNT, ready)
+        return reasons
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+    def _rows(self, rows: Rows) -> Iterable[int]:
+        return range(self.size) if rows is None else rows
+
+    def _opponent(self, player_id: str) -> Optional[str]:
+        return next((pid for pid in self.player_ids if pid != player_id), None)
+
+    def _move_top(self, player_id: str, source: Zone, target: Zone, count: int, rows: Rows) -> None:
+        side = self._sides[player_id]
+        for b in self._rows(rows):
+            side.extend(target, b, side.take_top(source, b, count))
+
+    @staticmethod
+    def _active(side: _Side, b: int) -> int:
+        if not side.lengths[Zone.ACTIVE][b]:
+            raise ValueError(f"No Active Pokémon in row {b}")
+        return side.cards[Zone.ACTIVE][b * side.width]
+
+
+__all__ = ["BatchEngine"]
@@ -0,0 +1,406 @@
+"""Compiled on-disk card definition cache.
+
+Deck building used to run one to three PostgreSQL queries per deck line. The
+cache stores every card, already mapped to :class:`CardDefinition` fields, in
+a local SQLite file keyed by ``(set_ptcgo_code, number)``. It is built either
+from PostgreSQL (``ptcg_cards`` joined with ``ptcg_sets``) or from the
+official JSON dumps in ``doc/cards/en`` + ``doc/set/setdata.json``.
+
+The file records a schema version and a content hash of its source. When the
+source hash changes (or the schema version is bumped) the cache is rebuilt
+into a temporary file and swapped in atomically, so concurrent readers such as
+tournament workers never see a half-written cache. In the default ``auto``
+mode an unreachable database falls back to the existing file or, without
+one, to the JSON dumps.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .card_loader import _map_card_fields
+from .database import build_postgres_dsn
+from .models import CardDefinition
+
+try:  # pragma: no cover - optional dependency
+    import psycopg
+except Exception:  # pragma: no cover - optional dependency
+    psycopg = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA_VERSION = 1
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CARDS_DIR = PROJECT_ROOT / "doc" / "cards" / "en"
+DEFAULT_SET_FILE = PROJECT_ROOT / "doc" / "set" / "setdata.json"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "ptcg_ai" / "cards.sqlite3"
+
+CardKey = Tuple[str, str]
+
+_SCHEMA = """
+    CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    CREATE TABLE cards (
+        set_code TEXT NOT NULL,
+        number TEXT NOT NULL,
+        name TEXT NOT NULL,
+        card_type TEXT NOT NULL,
+        hp INTEGER,
+        stage TEXT,
+        rules_text TEXT,
+        subtypes TEXT,
+        abilities TEXT,
+        attacks TEXT,
+        PRIMARY KEY (set_code, number)
+    ) WITHOUT ROWID;
+    CREATE INDEX cards_number ON cards (number);
+"""
+
+_CARD_COLUMNS = "set_code, number, name, card_type, hp, stage, rules_text, subtypes, abilities, attacks"
+
+_POSTGRES_SOURCE_HASH = """
+    SELECT
+        (SELECT md5(string_agg(h, '' ORDER BY h)) FROM (SELECT md5(c::text) AS h FROM ptcg_cards c) AS cards),
+        (SELECT md5(string_agg(h, '' ORDER BY h)) FROM (SELECT md5(s::text) AS h FROM ptcg_sets s) AS sets)
+"""
+
+_POSTGRES_CARDS = """
+    SELECT c.name, c.supertype, c.subtypes, c.hp, c.rules,
+           COALESCE(c.set_ptcgo_code, s.ptcgo_code) AS set_ptcgo_code,
+           c.number, c.abilities, c.attacks
+    FROM ptcg_cards c
+    LEFT JOIN ptcg_sets s ON c.set_id = s.id
+    WHERE c.number IS NOT NULL
+    ORDER BY (c.set_ptcgo_code IS NULL)
+"""
+
+
+class CardCacheError(RuntimeError):
+    """Raised when the card cache cannot be built or opened."""
+
+
+class CardCache:
+    """Read access to a compiled card cache file.
+
+    Lookups never touch PostgreSQL. The connection is shared between threads
+    (the simulator API builds decks in a worker thread), so queries are
+    serialised with a lock.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise CardCacheError(f"Card cache not found: {self.path}")
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self.schema_version = int(meta.get("schema_version", 0))
+        self.source = meta.get("source", "")
+        self.source_hash = meta.get("source_hash", "")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def get(self, set_code: str, number: str) -> Optional[CardDefinition]:
+        return self.get_many([(set_code, number)]).get((set_code, number))
+
+    def get_many(self, keys: Iterable[CardKey]) -> Dict[CardKey, CardDefinition]:
+        """Resolve ``keys`` in one query; missing keys are absent from the result."""
+
+        wanted = list(dict.fromkeys(keys))
+        if not wanted:
+            return {}
+        placeholders = ",".join("(?, ?)" for _ in wanted)
+        params = [value for key in wanted for value in key]
+        with self._lock:
+            rows = self._conn.execute(
+                f"WITH wanted(set_code, number) AS (VALUES {placeholders}) "
+                f"SELECT {_CARD_COLUMNS} FROM cards JOIN wanted USING (set_code, number)",
+                params,
+            ).fetchall()
+        return {(row[0], row[1]): _definition_from_row(row) for row in rows}
+
+    def similar(self, set_code: str, number: str, limit: int = 5) -> List[Tuple[str, str, str]]:
+        """``(name, set_code, number)`` hints for a missing card.
+
+        Cards sharing ``number`` first, otherwise cards from ``set_code``.
+        """
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, set_code, number FROM cards WHERE number = ? LIMIT ?", (number, limit)
+            ).fetchall()
+            if not rows:
+                rows = self._conn.execute(
+                    "SELECT name, set_code, number FROM cards WHERE set_code = ? LIMIT ?", (set_code, limit)
+                ).fetchall()
+        return rows
+
+
+def _definition_from_row(row: Sequence[object]) -> CardDefinition:
+    set_code, number, name, card_type, hp, stage, rules_text, subtypes, abilities, attacks = row
+    return CardDefinition(
+        set_code=set_code,  # type: ignore[arg-type]
+        number=number,  # type: ignore[arg-type]
+        name=name,  # type: ignore[arg-type]
+        card_type=card_type,  # type: ignore[arg-type]
+        hp=hp,  # type: ignore[arg-type]
+        stage=stage,  # type: ignore[arg-type]
+        rules_text=rules_text,  # type: ignore[arg-type]
+        subtypes=json.loads(subtypes) if subtypes else None,  # type: ignore[arg-type]
+        abilities=json.loads(abilities) if abilities else None,  # type: ignore[arg-type]
+        attacks=json.loads(attacks) if attacks else None,  # type: ignore[arg-type]
+    )
+
+
+def _definition_to_row(definition: CardDefinition) -> Tuple[object, ...]:
+    def dump(value: object) -> Optional[str]:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")) if value else None
+
+    return (
+        definition.set_code,
+        definition.number,
+        definition.name,
+        definition.card_type,
+        definition.hp,
+        definition.stage,
+        definition.rules_text,
+        dump(definition.subtypes),
+        dump(definition.abilities),
+        dump(definition.attacks),
+    )
+
+
+def write_card_cache(path: str | Path, definitions: Iterable[CardDefinition], source: str, source_hash: str) -> Path:
+    """Compile ``definitions`` into a cache file at ``path``.
+
+    The first definition seen for a ``(set_code, number)`` key wins, matching
+    the ``LIMIT 1`` lookups the cache replaces.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany(
+            f"INSERT OR IGNORE INTO cards ({_CARD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (_definition_to_row(definition) for definition in definitions),
+        )
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [
+                ("schema_version", str(CACHE_SCHEMA_VERSION)),
+                ("source", source),
+                ("source_hash", source_hash),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+# ----------------------------------------------------------------------
+# sources
+# ----------------------------------------------------------------------
+def json_source_hash(cards_dir: str | Path = DEFAULT_CARDS_DIR, set_file: str | Path = DEFAULT_SET_FILE) -> str:
+    """Content hash of the JSON card dumps and the set list."""
+
+    digest = hashlib.sha256()
+    for file in [Path(set_file), *sorted(Path(cards_dir).glob("*.json"))]:
+        digest.update(file.name.encode("utf-8"))
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def iter_json_definitions(
+    cards_dir: str | Path = DEFAULT_CARDS_DIR, set_file: str | Path = DEFAULT_SET_FILE
+) -> Iterator[CardDefinition]:
+    """Map the JSON dumps to definitions keyed by the set's PTCGO code.
+
+    Sets are visited in ``setdata.json`` order, so when two sets share a
+    code (e.g. ``cel25``/``cel25c``) the main set's cards come first.
+    """
+
+    sets = json.loads(Path(set_file).read_text(encoding="utf-8"))["data"]
+    cards_dir = Path(cards_dir)
+    for card_set in sets:
+        set_code = card_set.get("ptcgoCode")
+        file = cards_dir / f"{card_set['id']}.json"
+        if not set_code or not file.is_file():
+            continue
+        for card in json.loads(file.read_text(encoding="utf-8")):
+            hp = card.get("hp")
+            yield _map_card_fields(
+                db_name=card["name"],
+                db_supertype=card.get("supertype"),
+                db_subtypes=card.get("subtypes"),
+                db_hp=int(hp) if hp and str(hp).isdigit() else None,
+                db_rules=card.get("rules"),
+                db_set_code=set_code,
+                db_number=card["number"],
+                db_abilities=card.get("abilities"),
+                db_attacks=card.get("attacks"),
+            )
+
+
+def _postgres_connect(dsn: Optional[str]):
+    if psycopg is None:
+        raise CardCacheError(
+            "psycopg is required to build the card cache from PostgreSQL. "
+            "Install it with: pip install 'psycopg[binary]'"
+        )
+    try:
+        return psycopg.connect(dsn or build_postgres_dsn())
+    except Exception as exc:
+        raise CardCacheError(f"Failed to connect to PostgreSQL: {exc}") from exc
+
+
+def _postgres_source_hash(conn) -> str:  # pragma: no cover - integration path
+    with conn.cursor() as cur:
+        cur.execute(_POSTGRES_SOURCE_HASH)
+        cards_hash, sets_hash = cur.fetchone()
+    return hashlib.sha256(f"{cards_hash}:{sets_hash}".encode("utf-8")).hexdigest()
+
+
+def _iter_postgres_definitions(conn) -> Iterator[CardDefinition]:  # pragma: no cover - integration path
+    with conn.cursor() as cur:
+        cur.execute(_POSTGRES_CARDS)
+        for name, supertype, subtypes, hp, rules, set_code, number, abilities, attacks in cur:
+            if not set_code:
+                continue
+            yield _map_card_fields(
+                db_name=name,
+                db_supertype=supertype,
+                db_subtypes=subtypes,
+                db_hp=hp,
+                db_rules=rules,
+                db_set_code=set_code,
+                db_number=number,
+                db_abilities=abilities,
+                db_attacks=attacks,
+            )
+
+
+# ----------------------------------------------------------------------
+# opening with staleness check
+# ----------------------------------------------------------------------
+def _cache_meta(path: Path) -> Optional[Tuple[int, str, str]]:
+    """``(schema_version, source, source_hash)`` of the file at ``path``, or ``None``."""
+
+    if not path.is_file():
+        return None
+    try:
+        cache = CardCache(path)
+    except (CardCacheError, sqlite3.DatabaseError):
+        return None
+    try:
+        return cache.schema_version, cache.source, cache.source_hash
+    finally:
+        cache.close()
+
+
+def _is_fresh(path: Path, source: str, source_hash: str) -> bool:
+    return _cache_meta(path) == (CACHE_SCHEMA_VERSION, source, source_hash)
+
+
+def _is_usable(path: Path) -> bool:
+    meta = _cache_meta(path)
+    return meta is not None and meta[0] == CACHE_SCHEMA_VERSION
+
+
+def open_card_cache(
+    path: str | Path = DEFAULT_CACHE_PATH,
+    source: str = "auto",
+    dsn: Optional[str] = None,
+    cards_dir: str | Path = DEFAULT_CARDS_DIR,
+    set_file: str | Path = DEFAULT_SET_FILE,
+) -> CardCache:
+    """Open the cache at ``path``, building or rebuilding it when it is stale.
+
+    ``source="postgres"`` or ``"json"`` checks that source (a single hash
+    query for PostgreSQL) and rebuilds a stale cache. ``"auto"`` checks
+    PostgreSQL when psycopg is installed and the JSON dumps when not. When
+    the PostgreSQL check fails, an existing cache of the current schema is
+    used as is; without one the cache is built from the JSON dumps.
+    """
+
+    path = Path(path)
+    if source == "auto":
+        if psycopg is None:
+            source = "json"
+        else:
+            try:
+                return open_card_cache(path, source="postgres", dsn=dsn)
+            except Exception as exc:
+                if _is_usable(path):
+                    logger.warning(f"Card cache not checked against PostgreSQL, using {path}: {exc}")
+                    return CardCache(path)
+                logger.warning(f"Card cache not built from PostgreSQL, using the JSON dumps: {exc}")
+                source = "json"
+    if source == "json":
+        source_hash = json_source_hash(cards_dir, set_file)
+        if not _is_fresh(path, source, source_hash):
+            write_card_cache(path, iter_json_definitions(cards_dir, set_file), source, source_hash)
+    elif source == "postgres":  # pragma: no cover - integration path
+        conn = _postgres_connect(dsn)
+        try:
+            source_hash = _postgres_source_hash(conn)
+            if not _is_fresh(path, source, source_hash):
+                write_card_cache(path, _iter_postgres_definitions(conn), source, source_hash)
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Unknown card cache source: {source!r}")
+    return CardCache(path)
+
+
+_default_caches: Dict[Tuple[int, str, str], CardCache] = {}
+_default_lock = threading.Lock()
+
+
+def default_card_cache(dsn: Optional[str] = None) -> Optional[CardCache]:
+    """Process-wide cache used by :func:`~ptcg_ai.simulation.build_deck`.
+
+    Configured with ``PTCG_CARD_CACHE`` (file path, or ``off`` to disable)
+    and ``PTCG_CARD_CACHE_SOURCE`` (``auto``/``postgres``/``json``). The cache
+    is opened once per process (see :func:`open_card_cache` for when it is
+    checked against its source); returns ``None`` when disabled.
+    """
+
+    location = os.getenv("PTCG_CARD_CACHE", str(DEFAULT_CACHE_PATH))
+    if location.lower() in {"", "0", "off", "false", "no"}:
+        return None
+    source = os.getenv("PTCG_CARD_CACHE_SOURCE", "auto")
+    key = (os.getpid(), location, source)
+    with _default_lock:
+        cache = _default_caches.get(key)
+        if cache is None:
+            cache = _default_caches[key] = open_card_cache(location, source=source, dsn=dsn)
+    return cache
+
+
+__all__ = [
+    "CACHE_SCHEMA_VERSION",
+    "CardCache",
+    "CardCacheError",
+    "default_card_cache",
+    "iter_json_definitions",
+    "json_source_hash",
+    "open_card_cache",
+    "write_card_cache",
+]
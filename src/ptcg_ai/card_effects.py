@@ -21,6 +21,36 @@ class EffectContext:
     referee: Optional[Any] = None  # Optional RefereeAgent reference for ending turns
 
 
+def ability_usage_scope(ability: Dict[str, object]) -> Optional[str]:
+    """``"turn"`` or ``"game"`` for abilities limited to one use per turn or game, else ``None``."""
+    ability_text = str(ability.get("text", ""))
+    if "Once during your turn" in ability_text:
+        return "turn"
+    if "Once during your game" in ability_text or "Once per game" in ability_text:
+        return "game"
+    return None
+
+
+def ability_unavailable(
+    game_state: GameState, player_id: str, card: CardInstance, ability: Dict[str, object]
+) -> Optional[str]:
+    """Why ``card`` cannot use ``ability`` right now, or ``None`` when it can.
+
+    Checks the once-per-turn/once-per-game limits and abilities that only
+    work from the Active Spot. Shared by :meth:`EffectExecutor.execute_ability`
+    and :meth:`~ptcg_ai.referee.RefereeAgent.legal_actions`.
+    """
+    ability_name = str(ability.get("name", ""))
+    player = game_state.players[player_id]
+    scope = ability_usage_scope(ability)
+    if scope is not None and player.get_usage_count(card.uid, "ability", scope=scope) > 0:
+        return f"{ability_name} already used this {scope}"
+    if "if this Pokémon is in the Active Spot" in str(ability.get("text", "")):
+        if card not in player.zone(Zone.ACTIVE).cards:
+            return f"{ability_name} requires this Pokémon to be Active"
+    return None
+
+
 class EffectExecutor:
     """Executes card effects by parsing text and calling appropriate tools."""
     
@@ -526,11 +556,9 @@ class EffectExecutor:
         if not source_zone:
             return None
         
-        zone_state = self.context.game_state.players[self.context.player_id].zone(source_zone)
-        for card in zone_state.cards:
-            if card.uid == card_uid:
-                return card
-        return None
+        return self.context.game_state.find_card(
+            card_uid, zones=(source_zone,), player_id=self.context.player_id
+        )
     
     def execute_ability(self, ability: Dict[str, object]) -> Dict[str, object]:
         """Execute a Pokémon ability.
@@ -542,52 +570,25 @@ class EffectExecutor:
             Result dict with execution status
         """
         ability_text = str(ability.get("text", ""))
-        ability_name = str(ability.get("name", ""))
-        
-        # Check usage restrictions
-        if "Once during your turn" in ability_text:
-            usage_count = self.context.tools.get_usage_count(
-                self.context.player_id,
-                self.context.card_instance.uid,
-                "ability",
-                scope="turn"
-            )
-            if usage_count > 0:
-                return {"success": False, "message": f"{ability_name} already used this turn"}
-        
-        if "Once during your game" in ability_text or "Once per game" in ability_text:
-            usage_count = self.context.tools.get_usage_count(
-                self.context.player_id,
-                self.context.card_instance.uid,
-                "ability",
-                scope="game"
-            )
-            if usage_count > 0:
-                return {"success": False, "message": f"{ability_name} already used this game"}
         
-        # Check conditions
-        if "if this Pokémon is in the Active Spot" in ability_text:
-            active = self.context.game_state.players[self.context.player_id].zone(Zone.ACTIVE)
-            if self.context.card_instance not in active.cards:
-                return {"success": False, "message": f"{ability_name} requires this Pokémon to be Active"}
+        # Check usage restrictions and conditions
+        reason = ability_unavailable(
+            self.context.game_state, self.context.player_id, self.context.card_instance, ability
+        )
+        if reason is not None:
+            return {"success": False, "message": reason}
         
         # Execute based on ability text patterns
         result = self._execute_effect_text(ability_text)
         
         # Track usage
-        if "Once during your turn" in ability_text:
+        scope = ability_usage_scope(ability)
+        if scope is not None:
             self.context.tools.track_usage(
                 self.context.player_id,
                 self.context.card_instance.uid,
                 "ability",
-                scope="turn"
-            )
-        elif "Once during your game" in ability_text or "Once per game" in ability_text:
-            self.context.tools.track_usage(
-                self.context.player_id,
-                self.context.card_instance.uid,
-                "ability",
-                scope="game"
+                scope=scope
             )
         
         return result
@@ -879,5 +880,5 @@ class EffectExecutor:
             return None
 
 
-__all__ = ["EffectContext", "EffectExecutor"]
+__all__ = ["EffectContext", "EffectExecutor", "ability_unavailable", "ability_usage_scope"]
 
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
+from .card_registry import intern_definition
 from .database import build_postgres_dsn
 from .models import CardDefinition, CardInstance
 
@@ -183,7 +184,7 @@ class CardLibrary:
         definitions = {}
         for card in data:
             key = (card["set"], card["number"])
-            definitions[key] = CardDefinition(
+            definitions[key] = intern_definition(CardDefinition(
                 set_code=card["set"],
                 number=card["number"],
                 name=card["name"],
@@ -191,7 +192,7 @@ class CardLibrary:
                 hp=int(card["hp"]) if card.get("hp") else None,
                 stage=card.get("stage"),
                 rules_text=card.get("rules_text"),
-            )
+            ))
         return cls(definitions)
 
     @classmethod
@@ -265,7 +266,7 @@ class CardLibrary:
                     )
 
                     key = (db_set_code, db_number)
-                    definitions[key] = definition
+                    definitions[key] = intern_definition(definition)
 
         finally:
             conn.close()
@@ -0,0 +1,84 @@
+"""Process-wide registry of canonical, immutable card definitions.
+
+:class:`~ptcg_ai.models.CardDefinition` is frozen and hashable by value, so
+equal definitions coming from different decks, matches or restored
+snapshots can be collapsed into one shared object. Strings are interned as
+well, leaving only the mutable :class:`~ptcg_ai.models.CardInstance` state
+per match.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Any, Dict, Iterable, List
+
+from .models import CardDefinition, CardInstance, FrozenDict
+
+
+def _intern_data(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, FrozenDict):
+        return FrozenDict((sys.intern(key), _intern_data(item)) for key, item in value.items())
+    if isinstance(value, tuple):
+        return tuple(_intern_data(item) for item in value)
+    return value
+
+
+class CardRegistry:
+    """Map every definition to a single canonical instance."""
+
+    def __init__(self) -> None:
+        self._definitions: Dict[CardDefinition, CardDefinition] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._definitions)
+
+    def __contains__(self, definition: object) -> bool:
+        return definition in self._definitions
+
+    def intern(self, definition: CardDefinition) -> CardDefinition:
+        """Return the canonical instance equal to ``definition``."""
+
+        canonical = self._definitions.get(definition)
+        if canonical is not None:
+            return canonical
+        candidate = CardDefinition(
+            set_code=sys.intern(definition.set_code),
+            number=sys.intern(definition.number),
+            name=sys.intern(definition.name),
+            card_type=sys.intern(definition.card_type),
+            hp=definition.hp,
+            stage=_intern_data(definition.stage),
+            rules_text=definition.rules_text,
+            subtypes=_intern_data(definition.subtypes),
+            abilities=_intern_data(definition.abilities),
+            attacks=_intern_data(definition.attacks),
+        )
+        with self._lock:
+            return self._definitions.setdefault(candidate, candidate)
+
+    def intern_cards(self, cards: Iterable[CardInstance]) -> List[CardInstance]:
+        """Point each card at its canonical definition (in place) and return them."""
+
+        cards = list(cards)
+        for card in cards:
+            card.definition = self.intern(card.definition)
+        return cards
+
+    def clear(self) -> None:
+        with self._lock:
+            self._definitions.clear()
+
+
+registry = CardRegistry()
+
+
+def intern_definition(definition: CardDefinition) -> CardDefinition:
+    """Intern ``definition`` in the process-wide :data:`registry`."""
+
+    return registry.intern(definition)
+
+
+__all__ = ["CardRegistry", "intern_definition", "registry"]
@@ -0,0 +1,361 @@
+"""Struct-of-arrays card storage for memory-dense batch simulation.
+
+A :class:`CardStore` keeps the mutable state of every card in a match in a
+few flat columns (``array`` based, one entry per card) instead of one
+:class:`~ptcg_ai.models.CardInstance` object with two Python lists each:
+
+* ``uid`` – ids into a process-wide uid table (deck uids repeat across
+  matches, so the table stays small and no per-match dict is needed),
+* ``owner`` / ``definition`` – small-int indexes into per-store tables,
+* ``damage`` – unsigned 16-bit damage counters,
+* ``conditions`` – a bitmask over :data:`SPECIAL_CONDITIONS`,
+* ``energy`` – sparse ``card id -> array`` of attached uid ids.
+
+Zones hold :class:`CardView` objects, two-slot proxies exposing the
+``CardInstance`` API (``uid``, ``damage``, ``attached_energy`` …), so the
+referee and tools run unchanged. ``clone()`` materialises a plain
+``CardInstance``, which keeps copy-on-write forks working: a branch that
+writes to a card gets its own object while the store stays untouched.
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, List, Optional
+
+from .models import CardDefinition, CardInstance, Deck, GameState
+
+SPECIAL_CONDITIONS = ("Asleep", "Burned", "Confused", "Paralyzed", "Poisoned")
+_CONDITION_BITS = {name: 1 << bit for bit, name in enumerate(SPECIAL_CONDITIONS)}
+
+_uids: List[str] = []
+_uid_ids: Dict[str, int] = {}
+_uid_lock = threading.Lock()
+
+
+def uid_id(uid: str) -> int:
+    """Process-wide integer id for ``uid`` (ids are not portable across processes)."""
+
+    value = _uid_ids.get(uid)
+    if value is None:
+        with _uid_lock:
+            value = _uid_ids.get(uid)
+            if value is None:
+                value = _uid_ids[uid] = len(_uids)
+                _uids.append(uid)
+    return value
+
+
+class CardStore:
+    """Column storage for the cards of one match."""
+
+    __slots__ = (
+        "owners",
+        "definitions",
+        "uid",
+        "owner",
+        "definition",
+        "damage",
+        "conditions",
+        "energy",
+        "extra_conditions",
+        "_owner_ids",
+        "_definition_ids",
+    )
+
+    def __init__(self) -> None:
+        self.owners: List[str] = []
+        self.definitions: List[CardDefinition] = []
+        self.uid = array("I")
+        self.owner = array("B")
+        self.definition = array("H")
+        self.damage = array("H")
+        self.conditions = array("B")
+        self.energy: Dict[int, array] = {}
+        self.extra_conditions: Dict[int, List[str]] = {}
+        self._owner_ids: Dict[str, int] = {}
+        self._definition_ids: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.damage)
+
+    # ------------------------------------------------------------------
+    # packing
+    # ------------------------------------------------------------------
+    def add(self, card: CardInstance) -> "CardView":
+        """Copy ``card`` into a new row and return its view."""
+
+        card_uid = uid_id(card.uid)
+        if card_uid in self.uid:
+            raise ValueError(f"Card {card.uid} is already stored")
+        card_id = len(self)
+        self.uid.append(card_uid)
+        self.owner.append(self._table_id(self._owner_ids, card.owner_id, self.owners, card.owner_id))
+        self.definition.append(
+            self._table_id(self._definition_ids, id(card.definition), self.definitions, card.definition)
+        )
+        self.damage.append(card.damage)
+        self.conditions.append(0)
+        view = CardView(self, card_id)
+        view.attached_energy = card.attached_energy
+        view.special_conditions = card.special_conditions
+        return view
+
+    def add_all(self, cards: Iterable[CardInstance]) -> List["CardView"]:
+        return [self.add(card) for card in cards]
+
+    def pack_deck(self, deck: Deck) -> Deck:
+        """Fresh deck whose cards are views into this store."""
+
+        return Deck(player_id=deck.player_id, cards=self.add_all(deck.cards))
+
+    @classmethod
+    def pack_state(cls, state: GameState) -> "CardStore":
+        """Move every card of ``state`` into a new store, in place."""
+
+        store = cls()
+        for player in state.players.values():
+            for zone in player.zones.values():
+                zone.cards[:] = store.add_all(zone.cards)
+        return store
+
+    def view(self, uid: str) -> "CardView":
+        try:
+            return CardView(self, self.uid.index(uid_id(uid)))
+        except ValueError:
+            raise KeyError(uid) from None
+
+    def nbytes(self) -> int:
+        """Approximate size of the column data (excluding shared tables)."""
+
+        columns = (self.uid, self.owner, self.definition, self.damage, self.conditions)
+        return (
+            sum(column.itemsize * len(column) for column in columns)
+            + sum(ids.itemsize * len(ids) for ids in self.energy.values())
+        )
+
+    @staticmethod
+    def _table_id(ids: Dict[object, int], key: object, table: list, value: object) -> int:
+        index = ids.get(key)
+        if index is None:
+            index = ids[key] = len(table)
+            table.append(value)
+        return index
+
+
+class _EnergyView(MutableSequence):
+    """List of attached energy uids backed by an ``array`` of uid ids."""
+
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store: CardStore, card_id: int) -> None:
+        self._store = store
+        self._id = card_id
+
+    def _ids(self) -> array:
+        ids = self._store.energy.get(self._id)
+        if ids is None:
+            ids = self._store.energy[self._id] = array("I")
+        return ids
+
+    def __len__(self) -> int:
+        ids = self._store.energy.get(self._id)
+        return len(ids) if ids is not None else 0
+
+    def __getitem__(self, index):
+        ids = self._store.energy.get(self._id, ())
+        if isinstance(index, slice):
+            return [_uids[value] for value in ids[index]]
+        return _uids[ids[index]]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            self._ids()[index] = array("I", [uid_id(uid) for uid in value])
+        else:
+            self._ids()[index] = uid_id(value)
+
+    def __delitem__(self, index) -> None:
+        ids = self._ids()
+        del ids[index]
+        if not ids:
+            del self._store.energy[self._id]
+
+    def insert(self, index: int, value: str) -> None:
+        self._ids().insert(index, uid_id(value))
+
+    def __eq__(self, other: object) -> bool:
+        return list(self) == other if isinstance(other, (list, _EnergyView)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _ConditionView(MutableSequence):
+    """Special conditions backed by a bitmask.
+
+    Conditions behave as a set kept in :data:`SPECIAL_CONDITIONS` order;
+    ``insert`` ignores the position. Unknown condition names fall back to a
+    per-card list.
+    """
+
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store: CardStore, card_id: int) -> None:
+        self._store = store
+        self._id = card_id
+
+    def _names(self) -> List[str]:
+        mask = self._store.conditions[self._id]
+        names = [name for name in SPECIAL_CONDITIONS if mask & _CONDITION_BITS[name]]
+        return names + self._store.extra_conditions.get(self._id, [])
+
+    def __len__(self) -> int:
+        return len(self._names())
+
+    def __getitem__(self, index):
+        return self._names()[index]
+
+    def __contains__(self, name: object) -> bool:
+        bit = _CONDITION_BITS.get(name)  # type: ignore[arg-type]
+        if bit is not None:
+            return bool(self._store.conditions[self._id] & bit)
+        return name in self._store.extra_conditions.get(self._id, ())
+
+    def _assign(self, names: Iterable[str]) -> None:
+        mask = 0
+        extra: List[str] = []
+        for name in names:
+            bit = _CONDITION_BITS.get(name)
+            if bit is not None:
+                mask |= bit
+            elif name not in extra:
+                extra.append(name)
+        self._store.conditions[self._id] = mask
+        if extra:
+            self._store.extra_conditions[self._id] = extra
+        else:
+            self._store.extra_conditions.pop(self._id, None)
+
+    def __setitem__(self, index, value) -> None:
+        names = self._names()
+        names[index] = value
+        self._assign(names)
+
+    def __delitem__(self, index) -> None:
+        names = self._names()
+        del names[index]
+        self._assign(names)
+
+    def insert(self, index: int, value: str) -> None:
+        self._assign(self._names() + [value])
+
+    def __eq__(self, other: object) -> bool:
+        return self._names() == other if isinstance(other, (list, _ConditionView)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._names())
+
+
+class CardView:
+    """``CardInstance``-compatible proxy for one row of a :class:`CardStore`."""
+
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store: CardStore, card_id: int) -> None:
+        self._store = store
+        self._id = card_id
+
+    @property
+    def uid(self) -> str:
+        return _uids[self._store.uid[self._id]]
+
+    @property
+    def owner_id(self) -> str:
+        return self._store.owners[self._store.owner[self._id]]
+
+    @property
+    def definition(self) -> CardDefinition:
+        return self._store.definitions[self._store.definition[self._id]]
+
+    @definition.setter
+    def definition(self, definition: CardDefinition) -> None:
+        store = self._store
+        store.definition[self._id] = store._table_id(
+            store._definition_ids, id(definition), store.definitions, definition
+        )
+
+    @property
+    def damage(self) -> int:
+        return self._store.damage[self._id]
+
+    @damage.setter
+    def damage(self, value: int) -> None:
+        self._store.damage[self._id] = value
+
+    @property
+    def attached_energy(self) -> _EnergyView:
+        return _EnergyView(self._store, self._id)
+
+    @attached_energy.setter
+    def attached_energy(self, uids: Iterable[str]) -> None:
+        ids = array("I", [uid_id(uid) for uid in uids])
+        if ids:
+            self._store.energy[self._id] = ids
+        else:
+            self._store.energy.pop(self._id, None)
+
+    @property
+    def special_conditions(self) -> _ConditionView:
+        return _ConditionView(self._store, self._id)
+
+    @special_conditions.setter
+    def special_conditions(self, names: Iterable[str]) -> None:
+        _ConditionView(self._store, self._id)._assign(list(names))
+
+    @property
+    def hp(self) -> Optional[int]:
+        return self.definition.hp
+
+    @property
+    def is_ko(self) -> bool:
+        if self.hp is None:
+            return False
+        return self.damage >= self.hp
+
+    def clone(self) -> CardInstance:
+        """Materialise an independent :class:`CardInstance` with the same state."""
+
+        return CardInstance(
+            uid=self.uid,
+            owner_id=self.owner_id,
+            definition=self.definition,
+            damage=self.damage,
+            attached_energy=list(self.attached_energy),
+            special_conditions=list(self.special_conditions),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (CardInstance, CardView)):
+            return NotImplemented
+        return (
+            self.uid == other.uid
+            and self.owner_id == other.owner_id
+            and self.definition == other.definition
+            and self.damage == other.damage
+            and list(self.attached_energy) == list(other.attached_energy)
+            and list(self.special_conditions) == list(other.special_conditions)
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.uid)
+
+    def __repr__(self) -> str:
+        return (
+            f"CardView(uid={self.uid!r}, owner_id={self.owner_id!r}, definition={self.definition.name!r}, "
+            f"damage={self.damage}, attached_energy={list(self.attached_energy)!r}, "
+            f"special_conditions={list(self.special_conditions)!r})"
+        )
+
+
+__all__ = ["SPECIAL_CONDITIONS", "CardStore", "CardView", "uid_id"]
@@ -1,12 +1,16 @@
 """Database access helpers for persisting games and logs."""
 from __future__ import annotations
 
+import atexit
 import os
+import time
+import weakref
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .models import CardInstance, GameLogEntry, GameState, Zone
+from .state_delta import Checkpoint, capture_checkpoint, delta_from_changes, diff_checkpoints, rebuild_version
 
 try:  # pragma: no cover - optional dependency
     import psycopg
@@ -36,16 +40,159 @@ def build_postgres_dsn() -> str:
     return f"host={host} port={port} user={user} password={password} dbname={database}"
 
 
+# ``matches.version`` belongs to the optimistic lock of the state sync
+# service and is left alone here; ``snapshot`` keeps the
+# ``GameState.snapshot()`` format but is only rewritten at checkpoints.
+_MATCH_UPSERT = """
+    INSERT INTO matches (match_id, turn_player, turn_number, phase, snapshot, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (match_id) DO UPDATE SET
+        turn_player = EXCLUDED.turn_player,
+        turn_number = EXCLUDED.turn_number,
+        phase = EXCLUDED.phase,
+        snapshot = COALESCE(EXCLUDED.snapshot, matches.snapshot),
+        updated_at = EXCLUDED.updated_at
+"""
+
+_VERSION_INSERT = """
+    INSERT INTO match_state_versions (match_id, version, is_checkpoint, payload)
+    VALUES (%s, %s, %s, %s)
+"""
+
+_VERSIONS_SELECT = """
+    SELECT version, is_checkpoint, payload
+    FROM match_state_versions
+    WHERE match_id = %(match_id)s
+      AND version >= (
+          SELECT COALESCE(MAX(version), 0)
+          FROM match_state_versions
+          WHERE match_id = %(match_id)s
+            AND is_checkpoint
+            AND (%(version)s::int IS NULL OR version <= %(version)s::int)
+      )
+      AND (%(version)s::int IS NULL OR version <= %(version)s::int)
+    ORDER BY version ASC
+"""
+
+_LOG_INSERT = """
+    INSERT INTO match_logs (match_id, actor, action, payload, random_seed, created_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+_LOGS_SELECT = """
+    SELECT match_id, actor, action, payload, random_seed
+    FROM match_logs
+    WHERE match_id = %s
+    ORDER BY created_at ASC, id ASC
+"""
+
+_LOGS_PAGE_SELECT = """
+    SELECT id, match_id, actor, action, payload, random_seed
+    FROM match_logs
+    WHERE match_id = %s AND id > %s
+    ORDER BY id ASC
+    LIMIT %s
+"""
+
+_LOGS_TAIL_SELECT = """
+    SELECT id, match_id, actor, action, payload, random_seed
+    FROM match_logs
+    WHERE match_id = %s AND id > %s
+    ORDER BY id ASC
+"""
+
+
+# (last written version, journal the version was read from, journal clock)
+_Tracked = Tuple[int, Any, int]
+_Row = Tuple[int, bool, Dict[str, object]]
+
+
+def _follows_journal(tracked: Optional[_Tracked], state: GameState) -> bool:
+    return tracked is not None and state._journal is not None and tracked[1] is state._journal
+
+
+def _latest_version(rows: Iterable[_Row]) -> Optional[Tuple[int, Checkpoint]]:
+    rows = list(rows)
+    return rebuild_version(rows) if rows else None
+
+
+def _stage_version(
+    tracked: Optional[_Tracked],
+    latest: Optional[Tuple[int, Checkpoint]],
+    state: GameState,
+    checkpoint_interval: int,
+) -> Tuple[_Tracked, Optional[_Row]]:
+    """Return the tracking entry to keep once written and the version row to write.
+
+    While ``tracked`` follows the journal bound to ``state``, the delta lists
+    the parts the journal saw touched since the tracked version. Otherwise
+    (first persist in this process, another journal, or a failed write)
+    ``latest`` is the newest stored version, rebuilt, and the next version
+    is diffed against it. The row is ``None`` when nothing changed.
+    """
+
+    journal = state._journal
+    clock = journal.clock if journal is not None else 0
+    if _follows_journal(tracked, state):
+        changes = journal.changes_since(tracked[2])
+        if not changes:
+            return tracked, None
+        version = tracked[0] + 1
+        is_checkpoint = version % checkpoint_interval == 0
+        payload = capture_checkpoint(state) if is_checkpoint else delta_from_changes(state, changes)
+    elif latest is None:
+        version, is_checkpoint, payload = 0, True, capture_checkpoint(state)
+    else:
+        checkpoint = capture_checkpoint(state)
+        payload = diff_checkpoints(latest[1], checkpoint)
+        if not payload:
+            return (latest[0], journal, clock), None
+        version = latest[0] + 1
+        is_checkpoint = version % checkpoint_interval == 0
+        if is_checkpoint:
+            payload = checkpoint
+    return (version, journal, clock), (version, is_checkpoint, payload)
+
+
+def _match_row(state: GameState, is_checkpoint: bool) -> Tuple[object, ...]:
+    return (
+        state.match_id,
+        state.turn_player,
+        state.turn_number,
+        state.phase,
+        state.snapshot() if is_checkpoint else None,
+        datetime.utcnow(),
+    )
+
+
+def _log_row(entry: GameLogEntry) -> Tuple[object, ...]:
+    return (
+        entry.match_id,
+        entry.actor,
+        entry.action,
+        entry.payload,
+        entry.random_seed,
+        datetime.utcnow(),
+    )
+
+
 @dataclass
 class InMemoryDatabase:
     """Fallback store used for testing and local development."""
 
     matches: Dict[str, GameState] = field(default_factory=dict)
     logs: Dict[str, List[GameLogEntry]] = field(default_factory=dict)
+    versions: Dict[str, List[_Row]] = field(default_factory=dict)
 
     def write_state(self, state: GameState) -> None:
         self.matches[state.match_id] = state
 
+    def append_version(self, match_id: str, version: int, is_checkpoint: bool, payload: Dict[str, object]) -> None:
+        self.versions.setdefault(match_id, []).append((version, is_checkpoint, payload))
+
+    def iter_versions(self, match_id: str) -> Iterable[_Row]:
+        yield from self.versions.get(match_id, [])
+
     def append_log(self, entry: GameLogEntry) -> None:
         self.logs.setdefault(entry.match_id, []).append(entry)
 
@@ -59,69 +206,139 @@ class DatabaseClient:
     The class is intentionally conservative: if psycopg or a DSN is not
     available we fall back to the in-memory store, ensuring the engine remains
     testable without external infrastructure. When backed by PostgreSQL we
-    store each log entry inside ``match_logs`` and the full state snapshot in
-    ``matches``.
+    store each log entry inside ``match_logs`` and the match state in
+    ``match_state_versions``: a full checkpoint every ``checkpoint_interval``
+    versions and a compact delta (see :mod:`ptcg_ai.state_delta`) otherwise.
+    ``matches.snapshot`` is only rewritten at checkpoints. Version numbers
+    continue from the newest stored version, and the client only moves on
+    to the next number once a write has committed.
+
+    Log entries are buffered and written with a single ``executemany`` when
+    the buffer reaches ``log_batch_size`` rows, when ``log_flush_interval``
+    seconds have passed since the last flush, at every state persist (action
+    boundary), on :meth:`flush_logs` and on :meth:`close` / interpreter exit.
     """
 
-    def __init__(self, dsn: Optional[str] = None, memory_store: Optional[InMemoryDatabase] = None) -> None:
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        memory_store: Optional[InMemoryDatabase] = None,
+        log_batch_size: int = 500,
+        log_flush_interval: float = 1.0,
+        checkpoint_interval: int = 50,
+    ) -> None:
         self._dsn = dsn
         self._memory = memory_store or InMemoryDatabase()
         self._conn = None
+        self._log_batch_size = log_batch_size
+        self._log_flush_interval = log_flush_interval
+        self._log_buffer: List[Tuple[object, ...]] = []
+        self._last_flush = time.monotonic()
+        self._checkpoint_interval = checkpoint_interval
+        self._versions: Dict[str, _Tracked] = {}
         if dsn and psycopg is not None:
             self._conn = psycopg.connect(dsn)  # pragma: no cover - integration path
+            _register_exit_flush(self)  # pragma: no cover - integration path
 
     # ------------------------------------------------------------------
     # persistence helpers
     # ------------------------------------------------------------------
-    def persist_state(self, state: GameState) -> None:
+    def persist_state(self, state: GameState) -> Optional[int]:
+        """Record the current state as a new version.
+
+        Returns the version number, or ``None`` when nothing changed since
+        the previously persisted version.
+        """
+
+        tracked = self._versions.get(state.match_id)
+        latest = None if _follows_journal(tracked, state) else self._load_latest(state.match_id)
+        tracked, row = _stage_version(tracked, latest, state, self._checkpoint_interval)
+        if row is None:
+            self._versions[state.match_id] = tracked
+            return None
+        version, is_checkpoint, payload = row
+
         if self._conn is None:
             self._memory.write_state(state)
-            return
+            self._memory.append_version(state.match_id, version, is_checkpoint, payload)
+            self._versions[state.match_id] = tracked
+            return version
+
+        try:  # pragma: no cover - integration path
+            with self._conn.cursor() as cur:
+                cur.execute(_MATCH_UPSERT, _match_row(state, is_checkpoint))
+                cur.execute(_VERSION_INSERT, (state.match_id, version, is_checkpoint, payload))
+                self._write_buffered_logs(cur)
+                self._conn.commit()
+        except Exception:  # pragma: no cover - integration path
+            # Another writer may own this version; re-read the table next time.
+            self._conn.rollback()
+            self._versions.pop(state.match_id, None)
+            raise
+        self._versions[state.match_id] = tracked
+        self._last_flush = time.monotonic()
+        return version
 
+    def _load_latest(self, match_id: str) -> Optional[Tuple[int, Checkpoint]]:
+        """Newest stored version of ``match_id``, rebuilt (``None`` for a new match)."""
+
+        if self._conn is None:
+            return _latest_version(self._memory.iter_versions(match_id))
         with self._conn.cursor() as cur:  # pragma: no cover - integration path
-            cur.execute(
-                """
-                INSERT INTO matches (match_id, turn_player, turn_number, phase, snapshot, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (match_id) DO UPDATE SET
-                    turn_player = EXCLUDED.turn_player,
-                    turn_number = EXCLUDED.turn_number,
-                    phase = EXCLUDED.phase,
-                    snapshot = EXCLUDED.snapshot,
-                    updated_at = EXCLUDED.updated_at
-                """,
-                (
-                    state.match_id,
-                    state.turn_player,
-                    state.turn_number,
-                    state.phase,
-                    state.snapshot(),
-                    datetime.utcnow(),
-                ),
-            )
-            self._conn.commit()
+            cur.execute(_VERSIONS_SELECT, {"match_id": match_id, "version": None})
+            return _latest_version(cur.fetchall())
 
     def append_log(self, entry: GameLogEntry) -> None:
         if self._conn is None:
             self._memory.append_log(entry)
             return
 
-        with self._conn.cursor() as cur:  # pragma: no cover - integration path
-            cur.execute(
-                """
-                INSERT INTO match_logs (match_id, actor, action, payload, random_seed, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    entry.match_id,
-                    entry.actor,
-                    entry.action,
-                    entry.payload,
-                    entry.random_seed,
-                    datetime.utcnow(),
-                ),
-            )
-            self._conn.commit()
+        self._log_buffer.append(_log_row(entry))
+        if (
+            len(self._log_buffer) >= self._log_batch_size
+            or time.monotonic() - self._last_flush >= self._log_flush_interval
+        ):
+            self.flush_logs()
+
+    def flush_logs(self) -> None:
+        """Write all buffered log entries in one round trip and commit."""
+
+        if self._conn is None or not self._log_buffer:
+            return
+        with self._conn.cursor() as cur:
+            self._write_buffered_logs(cur)
+        self._conn.commit()
+        self._last_flush = time.monotonic()
+
+    def _write_buffered_logs(self, cur) -> None:
+        if not self._log_buffer:
+            return
+        rows = self._log_buffer
+        self._log_buffer = []
+        try:
+            cur.executemany(_LOG_INSERT, rows)
+        except Exception:
+            # Keep the rows so a later flush can retry them.
+            self._log_buffer = rows + self._log_buffer
+            self._conn.rollback()
+            raise
+
+    def close(self) -> None:
+        """Flush pending log entries and close the connection."""
+
+        if self._conn is None:
+            return
+        try:
+            self.flush_logs()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "DatabaseClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def record_zone(self, match_id: str, player_id: str, zone: Zone, cards: Iterable[CardInstance]) -> None:
         """Persist the content of a zone for auditing purposes."""
@@ -143,22 +360,88 @@ class DatabaseClient:
     # ------------------------------------------------------------------
     # read helpers
     # ------------------------------------------------------------------
+    def load_state_version(self, match_id: str, version: Optional[int] = None) -> Tuple[int, Checkpoint]:
+        """Rebuild the state checkpoint for ``version`` (latest if ``None``).
+
+        Only the nearest checkpoint at or before ``version`` and the deltas
+        after it are read.
+        """
+
+        if self._conn is None:
+            return rebuild_version(self._memory.iter_versions(match_id), version)
+
+        with self._conn.cursor() as cur:  # pragma: no cover - integration path
+            cur.execute(_VERSIONS_SELECT, {"match_id": match_id, "version": version})
+            rows = cur.fetchall()
+        return rebuild_version(rows, version)
+
     def get_logs(self, match_id: str) -> List[GameLogEntry]:
         if self._conn is None:
             return list(self._memory.iter_logs(match_id))
 
+        self.flush_logs()
         with self._conn.cursor() as cur:  # pragma: no cover - integration path
-            cur.execute(
-                """
-                SELECT match_id, actor, action, payload, random_seed
-                FROM match_logs
-                WHERE match_id = %s
-                ORDER BY created_at ASC
-                """,
-                (match_id,),
-            )
+            cur.execute(_LOGS_SELECT, (match_id,))
             rows = cur.fetchall()
         return [GameLogEntry(*row) for row in rows]
 
+    def get_logs_page(
+        self, match_id: str, after_id: int = 0, limit: int = 500
+    ) -> Tuple[List[Tuple[int, GameLogEntry]], Optional[int]]:
+        """Return up to ``limit`` ``(id, entry)`` pairs with ``id > after_id``.
+
+        Keyset pagination on ``match_logs.id``: pass the returned cursor back
+        as ``after_id`` to fetch the next page. The cursor is ``None`` when the
+        page came back short, i.e. there is nothing more to read right now.
+        """
+
+        if self._conn is None:
+            entries = self._memory.logs.get(match_id, [])
+            rows = [(index + 1, entry) for index, entry in enumerate(entries[after_id:after_id + limit], start=after_id)]
+        else:
+            self.flush_logs()
+            with self._conn.cursor() as cur:  # pragma: no cover - integration path
+                cur.execute(_LOGS_PAGE_SELECT, (match_id, after_id, limit))
+                rows = [(row[0], GameLogEntry(*row[1:])) for row in cur.fetchall()]
+        next_cursor = rows[-1][0] if len(rows) == limit else None
+        return rows, next_cursor
+
+    def iter_logs(self, match_id: str, after_id: int = 0, batch_size: int = 500) -> Iterator[Tuple[int, GameLogEntry]]:
+        """Stream ``(id, entry)`` pairs without loading the whole log.
+
+        Backed by a server-side (named) cursor, so memory stays bounded by
+        ``batch_size`` regardless of the match length.
+        """
+
+        if self._conn is None:
+            entries = self._memory.logs.get(match_id, [])
+            for index in range(after_id, len(entries)):
+                yield index + 1, entries[index]
+            return
+
+        self.flush_logs()
+        with self._conn.cursor(name=f"match_logs_{match_id}_{after_id}") as cur:  # pragma: no cover - integration path
+            cur.itersize = batch_size
+            cur.execute(_LOGS_TAIL_SELECT, (match_id, after_id))
+            for row in cur:
+                yield row[0], GameLogEntry(*row[1:])
+        self._conn.commit()  # pragma: no cover - integration path
+
+
+def _register_exit_flush(client: DatabaseClient) -> None:
+    """Flush ``client`` at interpreter shutdown without keeping it alive."""
+
+    ref = weakref.ref(client)
+
+    def _flush() -> None:
+        target = ref()
+        if target is not None:
+            try:
+                target.close()
+            except Exception:  # pragma: no cover - best effort at shutdown
+                pass
+
+    atexit.register(_flush)
+
 
 __all__ = ["DatabaseClient", "InMemoryDatabase", "build_postgres_dsn"]
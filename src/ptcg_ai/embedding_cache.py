@@ -0,0 +1,285 @@
+"""Two-level cache in front of an :class:`~ptcg_ai.embeddings.EmbeddingProvider`.
+
+Vectors are keyed by ``(model, sha256(text))``. The first level is an
+in-process LRU of float32 arrays (a 3072-dimension vector costs 12 KiB). The
+second is a persistent :class:`EmbeddingStore` shared by processes and
+restarts, either a PostgreSQL table (``embedding_cache``, created by
+``db/migrations/006_create_embedding_cache.sql``) or a local SQLite file.
+Only texts missed by both levels reach the provider, in a single batch.
+
+The persistent level is meant for texts that recur, such as search queries.
+Callers embedding one-off texts (stored memories) pass ``persist=False`` to
+:meth:`CachedEmbeddingProvider.aembed`. PostgreSQL rows also expire after
+``PTCG_EMBEDDING_CACHE_MAX_AGE_DAYS`` days (default 30) and are pruned.
+
+Values always pass through float32, so a cached vector is identical to the
+one returned on the miss that stored it. Hits and misses per level are
+counted on the cache (:meth:`CachedEmbeddingProvider.stats`) and exported as
+the OpenTelemetry counter ``embedding_cache_lookups`` when it is installed.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .embeddings import Embedding, EmbeddingProvider
+
+try:  # pragma: no cover - optional dependency
+    from opentelemetry.metrics import get_meter
+except Exception:  # pragma: no cover - optional dependency
+    get_meter = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_MAX_AGE_DAYS = 30.0
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore(ABC):
+    """Persistent second level of the cache, keyed by ``(model, text_key)``."""
+
+    @abstractmethod
+    async def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, array]:
+        """Stored vectors of ``model`` for those of ``keys`` that are present."""
+
+    @abstractmethod
+    async def put_many(self, model: str, vectors: Dict[str, array]) -> None:
+        """Store ``vectors`` (keyed by text key) for ``model``."""
+
+
+class SQLiteEmbeddingStore(EmbeddingStore):
+    """Local file store; vectors are kept as raw float32 blobs."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "model TEXT NOT NULL, text_sha256 TEXT NOT NULL, embedding BLOB NOT NULL, "
+                "PRIMARY KEY (model, text_sha256)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    async def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, array]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT text_sha256, embedding FROM embedding_cache WHERE model = ? AND text_sha256 IN ({placeholders})",
+                [model, *keys],
+            ).fetchall()
+        found = {}
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            found[key] = vector
+        return found
+
+    async def put_many(self, model: str, vectors: Dict[str, array]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, text_sha256, embedding) VALUES (?, ?, ?)",
+                [(model, key, vector.tobytes()) for key, vector in vectors.items()],
+            )
+            self._conn.commit()
+
+
+class PostgresEmbeddingStore(EmbeddingStore):
+    """Store in the ``embedding_cache`` table of an asyncpg pool.
+
+    Vectors are ``real[]`` rather than pgvector columns, so models of any
+    dimension share the table. Rows older than ``max_age_days`` are ignored
+    and, at most once per ``prune_interval`` seconds, deleted when new rows
+    are written.
+    """
+
+    def __init__(self, pool, max_age_days: Optional[float] = None, prune_interval: float = 3600.0) -> None:
+        self.pool = pool
+        if max_age_days is None:
+            max_age_days = float(os.getenv("PTCG_EMBEDDING_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        self.max_age_seconds = max_age_days * 86400.0
+        self.prune_interval = prune_interval
+        self._pruned_at = float("-inf")
+
+    async def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, array]:
+        if not keys:
+            return {}
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT text_sha256, embedding FROM embedding_cache
+                WHERE model = $1 AND text_sha256 = ANY($2::text[])
+                  AND created_at > NOW() - make_interval(secs => $3)
+                """,
+                model,
+                list(keys),
+                self.max_age_seconds,
+            )
+        return {row["text_sha256"]: array("f", row["embedding"]) for row in rows}
+
+    async def put_many(self, model: str, vectors: Dict[str, array]) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO embedding_cache (model, text_sha256, embedding)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (model, text_sha256) DO UPDATE SET
+                    embedding = EXCLUDED.embedding,
+                    created_at = NOW()
+                """,
+                [(model, key, vector.tolist()) for key, vector in vectors.items()],
+            )
+            if time.monotonic() - self._pruned_at >= self.prune_interval:
+                self._pruned_at = time.monotonic()
+                await conn.execute(
+                    "DELETE FROM embedding_cache WHERE created_at <= NOW() - make_interval(secs => $1)",
+                    self.max_age_seconds,
+                )
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """``provider`` behind an LRU and an optional persistent store.
+
+    :meth:`embed` (synchronous) uses the LRU only; :meth:`aembed` also
+    consults the store unless ``persist=False``. A failing store is logged
+    and skipped, never fatal.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        store: Optional[EmbeddingStore] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        self.provider = provider
+        self.store = store
+        self.model = provider.model
+        self.dimensions = provider.dimensions
+        self.capacity = capacity if capacity is not None else int(os.getenv("PTCG_EMBEDDING_CACHE_SIZE", DEFAULT_CAPACITY))
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._counter = (
+            get_meter("ptcg_ai.embeddings").create_counter(
+                "embedding_cache_lookups", description="Embedding lookups by cache level (memory, store, miss)"
+            )
+            if get_meter is not None
+            else None
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
+
+    def embed(self, texts: Sequence[str]) -> List[Embedding]:
+        keys, found = self._lookup(texts)
+        missing = self._missing(texts, keys, found)
+        if missing:
+            self._remember(self._computed(missing, self.provider.embed([text for _, text in missing])), found)
+        return [found[key].tolist() for key in keys]
+
+    async def aembed(self, texts: Sequence[str], persist: bool = True) -> List[Embedding]:
+        store = self.store if persist else None
+        keys, found = self._lookup(texts)
+        missing = self._missing(texts, keys, found)
+        if missing and store is not None:
+            try:
+                stored = await store.get_many(self.model, [key for key, _ in missing])
+            except Exception as exc:
+                logger.warning(f"Embedding store lookup failed: {exc}")
+                stored = {}
+            if stored:
+                self._count("store", len(stored))
+                self._remember(stored, found)
+                missing = [(key, text) for key, text in missing if key not in stored]
+        if missing:
+            computed = self._computed(missing, await self.provider.aembed([text for _, text in missing]))
+            self._remember(computed, found)
+            if store is not None:
+                try:
+                    await store.put_many(self.model, computed)
+                except Exception as exc:
+                    logger.warning(f"Embedding store write failed: {exc}")
+        return [found[key].tolist() for key in keys]
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+    def _lookup(self, texts: Sequence[str]) -> Tuple[List[str], Dict[str, array]]:
+        keys = [text_key(text) for text in texts]
+        found: Dict[str, array] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+        self._count("memory", sum(1 for key in keys if key in found))
+        return keys, found
+
+    @staticmethod
+    def _missing(texts: Sequence[str], keys: Sequence[str], found: Dict[str, array]) -> List[Tuple[str, str]]:
+        return list({key: text for key, text in zip(keys, texts) if key not in found}.items())
+
+    def _computed(self, missing: Sequence[Tuple[str, str]], vectors: Iterable[Embedding]) -> Dict[str, array]:
+        computed = {key: array("f", vector) for (key, _), vector in zip(missing, vectors)}
+        self._count("miss", len(computed))
+        return computed
+
+    def _remember(self, vectors: Dict[str, array], found: Dict[str, array]) -> None:
+        found.update(vectors)
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def _count(self, level: str, count: int) -> None:
+        if not count:
+            return
+        if level == "memory":
+            self.memory_hits += count
+        elif level == "store":
+            self.store_hits += count
+        else:
+            self.misses += count
+        if self._counter is not None:
+            self._counter.add(count, {"level": level, "model": self.model})
+
+
+__all__ = [
+    "CachedEmbeddingProvider",
+    "EmbeddingStore",
+    "PostgresEmbeddingStore",
+    "SQLiteEmbeddingStore",
+    "text_key",
+]
@@ -0,0 +1,185 @@
+"""Pluggable text embedding providers for the rule and memory services.
+
+A provider turns a batch of texts into vectors with :meth:`EmbeddingProvider.embed`;
+``model`` names the vector space, so vectors from different providers are
+never compared (re-index stored rules and memories after switching).
+
+* :class:`OpenAIEmbeddingProvider` calls the OpenAI embeddings API. Its
+  :meth:`~EmbeddingProvider.aembed` runs the blocking client in a worker
+  thread so async services keep serving other requests meanwhile.
+* :class:`HashingEmbeddingProvider` runs locally on the CPU without any
+  model files: word tokens (as indexed by :mod:`ptcg_ai.search`) and
+  character trigrams are feature-hashed into a fixed number of dimensions
+  with sublinear term weights and L2-normalised, so cosine distance tracks
+  lexical overlap.
+* :class:`FakeEmbeddingProvider` derives vectors from a hash of the text and
+  records every call, for tests.
+
+:func:`default_embedding_provider` picks one from ``PTCG_EMBEDDINGS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+from .search import tokenize
+
+try:  # pragma: no cover - optional dependency
+    from openai import OpenAI
+except Exception:  # pragma: no cover - optional dependency
+    OpenAI = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Matches the vector(3072) columns of rule_embeddings and memory_embeddings.
+DEFAULT_DIMENSIONS = 3072
+
+Embedding = List[float]
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when no embedding provider can be configured."""
+
+
+class EmbeddingProvider(ABC):
+    """Base class for embedding providers.
+
+    Sub-classes implement :meth:`embed`; :meth:`aembed` runs it in a worker
+    thread unless overridden.
+    """
+
+    model: str = ""
+    dimensions: int = DEFAULT_DIMENSIONS
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> List[Embedding]:
+        """Vectors for ``texts``, in order."""
+
+    async def aembed(self, texts: Sequence[str]) -> List[Embedding]:
+        return await asyncio.to_thread(self.embed, list(texts))
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Remote embeddings from the OpenAI API (one request per batch)."""
+
+    def __init__(self, client=None, model: str = "text-embedding-3-large", dimensions: int = DEFAULT_DIMENSIONS) -> None:
+        if client is None:
+            if OpenAI is None:
+                raise EmbeddingError("openai is required for OpenAI embeddings. Install it with: pip install openai")
+            client = OpenAI()
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed(self, texts: Sequence[str]) -> List[Embedding]:
+        if not texts:
+            return []
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Local, deterministic feature-hashing embeddings (no network, no model files)."""
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, ngram: int = 3) -> None:
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.model = f"local-hashing-{dimensions}-{ngram}"
+
+    def features(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            word = "w:" + token
+            counts[word] = counts.get(word, 0) + 1
+            if token[0] <= "z" and len(token) > self.ngram:
+                padded = f"<{token}>"
+                for start in range(len(padded) - self.ngram + 1):
+                    gram = "c:" + padded[start : start + self.ngram]
+                    counts[gram] = counts.get(gram, 0) + 1
+        return counts
+
+    def embed(self, texts: Sequence[str]) -> List[Embedding]:
+        return [self._embed_one(text) for text in texts]
+
+    async def aembed(self, texts: Sequence[str]) -> List[Embedding]:
+        return self.embed(texts)
+
+    def _embed_one(self, text: str) -> Embedding:
+        vector = [0.0] * self.dimensions
+        for feature, count in self.features(text).items():
+            hashed = _hash64(feature)
+            weight = 1.0 + math.log(count)
+            vector[hashed % self.dimensions] += -weight if hashed >> 63 else weight
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """Deterministic pseudo-random unit vectors keyed by text; records calls."""
+
+    def __init__(self, dimensions: int = 8, model: str = "fake") -> None:
+        self.dimensions = dimensions
+        self.model = model
+        self.calls: List[List[str]] = []
+
+    def embed(self, texts: Sequence[str]) -> List[Embedding]:
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            rng = random.Random(hashlib.sha256(f"{self.model}:{text}".encode("utf-8")).digest())
+            raw = [rng.gauss(0.0, 1.0) for _ in range(self.dimensions)]
+            norm = math.sqrt(sum(value * value for value in raw)) or 1.0
+            vectors.append([value / norm for value in raw])
+        return vectors
+
+    async def aembed(self, texts: Sequence[str]) -> List[Embedding]:
+        return self.embed(texts)
+
+
+def default_embedding_provider(
+    client=None, model: str = "text-embedding-3-large", kind: Optional[str] = None
+) -> EmbeddingProvider:
+    """Provider selected by ``kind`` or ``PTCG_EMBEDDINGS``.
+
+    ``openai``, ``local`` or ``fake``; ``auto`` (the default) uses OpenAI
+    when a client is given, or when the package is installed and
+    ``OPENAI_API_KEY`` is set, and the local hashing provider otherwise.
+    """
+
+    requested = (kind or os.getenv("PTCG_EMBEDDINGS", "auto")).lower()
+    kind = requested
+    if kind == "auto":
+        use_openai = client is not None or (OpenAI is not None and bool(os.getenv("OPENAI_API_KEY")))
+        kind = "openai" if use_openai else "local"
+    if kind == "openai":
+        provider: EmbeddingProvider = OpenAIEmbeddingProvider(client, model=model)
+    elif kind == "local":
+        provider = HashingEmbeddingProvider()
+    elif kind == "fake":
+        provider = FakeEmbeddingProvider(dimensions=DEFAULT_DIMENSIONS)
+    else:
+        raise ValueError(f"Unknown embedding provider: {kind!r}")
+    # Vectors of different models are not comparable, so make the choice visible
+    logger.info(f"Embedding provider: {kind} (model {provider.model}, PTCG_EMBEDDINGS={requested})")
+    return provider
+
+
+__all__ = [
+    "DEFAULT_DIMENSIONS",
+    "EmbeddingError",
+    "EmbeddingProvider",
+    "FakeEmbeddingProvider",
+    "HashingEmbeddingProvider",
+    "OpenAIEmbeddingProvider",
+    "default_embedding_provider",
+]
@@ -3,11 +3,17 @@ from __future__ import annotations
 
 import random
 import secrets
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from .database import DatabaseClient
-from .models import CardInstance, GameLogEntry, GameState, Zone
+from .journal import UndoJournal
+from .models import CardInstance, GameLogEntry, GameState, Zone, ZoneState
+from .rng import MatchRng
+
+
+_IN_PLAY = (Zone.ACTIVE, Zone.BENCH)
 
 
 def _make_seed() -> str:
@@ -34,6 +40,56 @@ class GameTools:
     context: ToolCallContext
     state: GameState
     _rng: Callable[[], str] = field(default=_make_seed, repr=False)
+    _random: random.Random = field(default_factory=random.Random, init=False, repr=False, compare=False)
+    journal: UndoJournal = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.journal = UndoJournal(self.state)
+        self.state._journal = self.journal
+
+    def fork(self) -> "GameTools":
+        """Return tools bound to a copy-on-write fork of the current state.
+
+        Branch operations are logged to a throwaway in-memory database so
+        what-if exploration never reaches the real match log.
+        """
+
+        context = ToolCallContext(
+            match_id=self.context.match_id,
+            referee_id=self.context.referee_id,
+            db=DatabaseClient(),
+        )
+        rng = self._rng.fork() if isinstance(self._rng, MatchRng) else self._rng
+        return GameTools(context=context, state=self.state.fork(), _rng=rng)
+
+    # ------------------------------------------------------------------
+    # undo journal
+    # ------------------------------------------------------------------
+    def begin(self) -> int:
+        """Start journaling mutations; returns a mark for :meth:`commit`/:meth:`rollback`.
+
+        Marks nest, so search code can apply and undo moves inside an open
+        action. Log entries are held until the outermost mark commits.
+        """
+        return self.journal.begin(self._match_rng())
+
+    def commit(self, mark: int) -> None:
+        self.journal.commit(mark, self.context.db.append_log)
+
+    def rollback(self, mark: int) -> None:
+        """Undo every mutation since ``mark`` (including random draws) and drop its logs."""
+        self.journal.rollback(mark, self._match_rng())
+
+    @contextmanager
+    def transaction(self) -> Iterator[int]:
+        """Commit the enclosed mutations, or roll them back if the block raises."""
+        mark = self.begin()
+        try:
+            yield mark
+        except BaseException:
+            self.rollback(mark)
+            raise
+        self.commit(mark)
 
     # ------------------------------------------------------------------
     # deck and card queries
@@ -57,15 +113,19 @@ class GameTools:
     # card movement
     # ------------------------------------------------------------------
     def move_card(self, player_id: str, source: Zone, target: Zone, card: CardInstance, position_hint: Optional[int] = None) -> None:
-        source_zone = self.state.players[player_id].zone(source)
-        target_zone = self.state.players[player_id].zone(target)
-        if card not in source_zone.cards:
+        source_zone = self._zone(player_id, source)
+        target_zone = self._zone(player_id, target)
+        location = self.state.locate(card.uid)
+        if location is None or location.player_id != player_id or location.zone != source:
             raise ValueError(f"Card {card.uid} not found in {source.value}")
-        source_zone.cards.remove(card)
+        del source_zone.cards[location.index]
+        self.state.index_zone(player_id, source, location.index)
         if position_hint is None or position_hint >= len(target_zone.cards):
             target_zone.cards.append(card)
+            self.state.index_zone(player_id, target, len(target_zone.cards) - 1)
         else:
             target_zone.cards.insert(position_hint, card)
+            self.state.index_zone(player_id, target, position_hint)
         self._log(
             actor=self.context.referee_id,
             action="move_card",
@@ -78,10 +138,10 @@ class GameTools:
         )
 
     def shuffle(self, player_id: str, zone: Zone) -> None:
-        zone_state = self.state.players[player_id].zone(zone)
-        seed = self._rng()
-        rng = random.Random(int(seed, 16))
+        zone_state = self._zone(player_id, zone)
+        rng, seed = self._draw_random()
         rng.shuffle(zone_state.cards)  # type: ignore[arg-type]
+        self.state.index_zone(player_id, zone)
         self._log(
             actor=self.context.referee_id,
             action="shuffle",
@@ -90,11 +150,13 @@ class GameTools:
         )
 
     def draw(self, player_id: str, count: int) -> List[CardInstance]:
-        deck = self.state.players[player_id].zone(Zone.DECK)
-        hand = self.state.players[player_id].zone(Zone.HAND)
+        deck = self._zone(player_id, Zone.DECK)
+        hand = self._zone(player_id, Zone.HAND)
         drawn = deck.cards[:count]
         del deck.cards[:count]
+        self.state.index_zone(player_id, Zone.DECK)
         hand.cards.extend(drawn)
+        self.state.index_zone(player_id, Zone.HAND, len(hand.cards) - len(drawn))
         self._log(
             actor=self.context.referee_id,
             action="draw",
@@ -103,12 +165,15 @@ class GameTools:
         return drawn
 
     def discard(self, player_id: str, cards: Iterable[CardInstance], reason: str) -> None:
-        discard_pile = self.state.players[player_id].zone(Zone.DISCARD)
-        hand = self.state.players[player_id].zone(Zone.HAND)
+        discard_pile = self._zone(player_id, Zone.DISCARD)
+        hand = self._zone(player_id, Zone.HAND)
         for card in cards:
-            if card in hand.cards:
-                hand.cards.remove(card)
+            location = self.state.locate(card.uid)
+            if location is not None and location.player_id == player_id and location.zone == Zone.HAND:
+                del hand.cards[location.index]
+                self.state.index_zone(player_id, Zone.HAND, location.index)
             discard_pile.cards.append(card)
+            self.state.index_zone(player_id, Zone.DISCARD, len(discard_pile.cards) - 1)
         self._log(
             actor=self.context.referee_id,
             action="discard",
@@ -120,11 +185,14 @@ class GameTools:
         )
 
     def take_prize(self, player_id: str, count: int = 1) -> List[CardInstance]:
-        prize_zone = self.state.players[player_id].zone(Zone.PRIZE)
-        hand = self.state.players[player_id].zone(Zone.HAND)
+        prize_zone = self._zone(player_id, Zone.PRIZE)
+        hand = self._zone(player_id, Zone.HAND)
         taken = prize_zone.cards[:count]
         del prize_zone.cards[:count]
+        self.state.index_zone(player_id, Zone.PRIZE)
         hand.cards.extend(taken)
+        self.state.index_zone(player_id, Zone.HAND, len(hand.cards) - len(taken))
+        self.journal.touch_player(player_id)
         self.state.players[player_id].prizes_remaining -= len(taken)
         self._log(
             actor=self.context.referee_id,
@@ -134,15 +202,18 @@ class GameTools:
         return taken
 
     def random_discard(self, player_id: str, count: int) -> List[CardInstance]:
-        hand = self.state.players[player_id].zone(Zone.HAND)
+        hand = self._zone(player_id, Zone.HAND)
         if count > len(hand.cards):
             raise ValueError("Cannot discard more cards than available in hand")
-        seed = self._rng()
-        rng = random.Random(int(seed, 16))
+        rng, seed = self._draw_random()
         selected = rng.sample(hand.cards, count)
+        discard_pile = self._zone(player_id, Zone.DISCARD)
+        start = len(discard_pile.cards)
         for card in selected:
             hand.cards.remove(card)
-            self.state.players[player_id].zone(Zone.DISCARD).cards.append(card)
+            discard_pile.cards.append(card)
+        self.state.index_zone(player_id, Zone.HAND)
+        self.state.index_zone(player_id, Zone.DISCARD, start)
         self._log(
             actor=self.context.referee_id,
             action="random_discard",
@@ -177,16 +248,11 @@ class GameTools:
             opponent: If True, swap opponent's active Pokémon instead
         """
         target_player = player_id if not opponent else [p for p in self.state.players.keys() if p != player_id][0]
-        active_zone = self.state.players[target_player].zone(Zone.ACTIVE)
-        bench_zone = self.state.players[target_player].zone(Zone.BENCH)
+        active_zone = self._zone(target_player, Zone.ACTIVE)
+        bench_zone = self._zone(target_player, Zone.BENCH)
         
         # Find bench card
-        bench_card = None
-        for card in bench_zone.cards:
-            if card.uid == bench_card_id:
-                bench_card = card
-                break
-        
+        bench_card = self.state.find_card(bench_card_id, zones=(Zone.BENCH,), player_id=target_player)
         if bench_card is None:
             raise ValueError(f"Bench card {bench_card_id} not found")
         
@@ -198,6 +264,8 @@ class GameTools:
         
         bench_zone.cards.remove(bench_card)
         active_zone.cards.append(bench_card)
+        self.state.index_zone(target_player, Zone.ACTIVE)
+        self.state.index_zone(target_player, Zone.BENCH)
         
         self._log(
             actor=self.context.referee_id,
@@ -211,21 +279,22 @@ class GameTools:
     
     def shuffle_hand_into_deck(self, player_id: str) -> None:
         """Shuffle hand into deck (bottom of deck)."""
-        hand = self.state.players[player_id].zone(Zone.HAND)
-        deck = self.state.players[player_id].zone(Zone.DECK)
+        hand = self._zone(player_id, Zone.HAND)
+        deck = self._zone(player_id, Zone.DECK)
         
         # Move all hand cards to bottom of deck
         deck.cards.extend(hand.cards)
         hand.cards.clear()
         
-        # Shuffle the deck
-        self.shuffle(player_id, Zone.DECK)
-        
+        # Logged before the shuffle so a replay moves the cards first
         self._log(
             actor=self.context.referee_id,
             action="shuffle_hand_into_deck",
             payload={"player_id": player_id},
         )
+        
+        # Shuffle the deck (re-indexes every deck card)
+        self.shuffle(player_id, Zone.DECK)
     
     def evolve_pokemon(self, player_id: str, base_card_id: str, evolution_card_id: str, skip_stage1: bool = False) -> None:
         """Evolve a Pokémon by replacing base with evolution.
@@ -236,39 +305,20 @@ class GameTools:
             evolution_card_id: UID of the evolution card (must be in hand)
             skip_stage1: If True, allows evolving Basic directly to Stage 2 (Rare Candy)
         """
-        hand = self.state.players[player_id].zone(Zone.HAND)
-        active = self.state.players[player_id].zone(Zone.ACTIVE)
-        bench = self.state.players[player_id].zone(Zone.BENCH)
+        hand = self._zone(player_id, Zone.HAND)
         
         # Find evolution card in hand
-        evolution_card = None
-        for card in hand.cards:
-            if card.uid == evolution_card_id:
-                evolution_card = card
-                break
-        
+        evolution_card = self.state.find_card(evolution_card_id, zones=(Zone.HAND,), player_id=player_id)
         if evolution_card is None:
             raise ValueError(f"Evolution card {evolution_card_id} not found in hand")
         
         # Find base card (in active or bench)
-        base_card = None
-        target_zone = None
-        
-        for card in active.cards:
-            if card.uid == base_card_id:
-                base_card = card
-                target_zone = active
-                break
-        
-        if base_card is None:
-            for card in bench.cards:
-                if card.uid == base_card_id:
-                    base_card = card
-                    target_zone = bench
-                    break
-        
+        base_card = self.state.find_card(base_card_id, zones=_IN_PLAY, player_id=player_id)
         if base_card is None:
             raise ValueError(f"Base card {base_card_id} not found in active or bench")
+        base_zone = self.state.card_index[base_card_id].zone
+        target_zone = self._zone(player_id, base_zone)
+        evolution_card = self.state.writable_card(evolution_card_id)
         
         # Transfer damage and energy from base to evolution
         evolution_card.damage = base_card.damage
@@ -279,6 +329,9 @@ class GameTools:
         target_zone.cards.remove(base_card)
         target_zone.cards.append(evolution_card)
         hand.cards.remove(evolution_card)
+        self.state.unindex(base_card_id)
+        self.state.index_zone(player_id, base_zone)
+        self.state.index_zone(player_id, Zone.HAND)
         
         self._log(
             actor=self.context.referee_id,
@@ -302,22 +355,10 @@ class GameTools:
             delta: Amount of damage to add (positive) or remove (negative)
         """
         # Find the Pokémon in active or bench
-        pokemon = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == pokemon_id:
-                    pokemon = card
-                    break
-            if pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == pokemon_id:
-                        pokemon = card
-                        break
-            if pokemon is not None:
-                break
-        
+        pokemon = self.state.find_card(pokemon_id, zones=_IN_PLAY)
         if pokemon is None:
             raise ValueError(f"Pokémon {pokemon_id} not found in active or bench")
+        pokemon = self.state.writable_card(pokemon_id)
         
         old_damage = pokemon.damage
         pokemon.damage = max(0, pokemon.damage + delta)
@@ -340,25 +381,10 @@ class GameTools:
             True if the Pokémon is knocked out, False otherwise
         """
         # Find the Pokémon
-        pokemon = None
-        owner_id = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == pokemon_id:
-                    pokemon = card
-                    owner_id = player_id
-                    break
-            if pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == pokemon_id:
-                        pokemon = card
-                        owner_id = player_id
-                        break
-            if pokemon is not None:
-                break
-        
+        pokemon = self.state.find_card(pokemon_id, zones=_IN_PLAY)
         if pokemon is None:
             raise ValueError(f"Pokémon {pokemon_id} not found")
+        owner_id = self.state.card_index[pokemon_id].player_id
         
         if pokemon.is_ko:
             # Determine opponent (prize taker)
@@ -369,12 +395,15 @@ class GameTools:
                 self.take_prize(opponent_id, 1)
             
             # Move to discard
-            active = self.state.players[owner_id].zone(Zone.ACTIVE)
-            discard = self.state.players[owner_id].zone(Zone.DISCARD)
+            active = self._zone(owner_id, Zone.ACTIVE)
+            discard = self._zone(owner_id, Zone.DISCARD)
             
-            if pokemon in active.cards:
-                active.cards.remove(pokemon)
+            location = self.state.locate(pokemon_id)
+            if location.zone == Zone.ACTIVE:
+                del active.cards[location.index]
+                self.state.index_zone(owner_id, Zone.ACTIVE, location.index)
                 discard.cards.append(pokemon)
+                self.state.index_zone(owner_id, Zone.DISCARD, len(discard.cards) - 1)
             
             self._log(
                 actor=self.context.referee_id,
@@ -401,44 +430,26 @@ class GameTools:
             target_pokemon_id: UID of the target Pokémon (in active or bench)
         """
         # Find energy card in hand
-        energy_card = None
-        owner_id = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.HAND).cards:
-                if card.uid == energy_card_id:
-                    energy_card = card
-                    owner_id = player_id
-                    break
-            if energy_card is not None:
-                break
-        
+        energy_card = self.state.find_card(energy_card_id, zones=(Zone.HAND,))
         if energy_card is None:
             raise ValueError(f"Energy card {energy_card_id} not found in hand")
+        owner_id = self.state.card_index[energy_card_id].player_id
         
         if energy_card.definition.card_type != "Energy":
             raise ValueError(f"Card {energy_card_id} is not an energy card")
         
         # Find target Pokémon
-        target_pokemon = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == target_pokemon_id:
-                    target_pokemon = card
-                    break
-            if target_pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == target_pokemon_id:
-                        target_pokemon = card
-                        break
-            if target_pokemon is not None:
-                break
-        
+        target_pokemon = self.state.find_card(target_pokemon_id, zones=_IN_PLAY)
         if target_pokemon is None:
             raise ValueError(f"Target Pokémon {target_pokemon_id} not found")
         
         # Attach energy
-        hand = self.state.players[owner_id].zone(Zone.HAND)
-        hand.cards.remove(energy_card)
+        hand = self._zone(owner_id, Zone.HAND)
+        index = self.state.card_index[energy_card_id].index
+        del hand.cards[index]
+        self.state.unindex(energy_card_id)
+        self.state.index_zone(owner_id, Zone.HAND, index)
+        target_pokemon = self.state.writable_card(target_pokemon_id)
         target_pokemon.attached_energy.append(energy_card_id)
         
         self._log(
@@ -463,6 +474,7 @@ class GameTools:
             counter_type: Type of usage (e.g., "ability", "attack")
             scope: "turn" for once per turn, "game" for once per game
         """
+        self.journal.touch_player(player_id)
         self.state.players[player_id].track_usage(entity_id, counter_type, scope)
         self._log(
             actor=self.context.referee_id,
@@ -490,28 +502,24 @@ class GameTools:
             card_id: UID of the card to send to Lost Zone
         """
         # Find card in any zone (except Lost Zone)
-        card = None
-        source_zone = None
-        
-        for zone_type in [Zone.HAND, Zone.DECK, Zone.ACTIVE, Zone.BENCH, Zone.DISCARD, Zone.PRIZE]:
-            zone_state = self.state.players[player_id].zone(zone_type)
-            for c in zone_state.cards:
-                if c.uid == card_id:
-                    card = c
-                    source_zone = zone_type
-                    break
-            if card:
-                break
-        
+        card = self.state.find_card(
+            card_id,
+            zones=(Zone.HAND, Zone.DECK, Zone.ACTIVE, Zone.BENCH, Zone.DISCARD, Zone.PRIZE),
+            player_id=player_id,
+        )
         if card is None:
             raise ValueError(f"Card {card_id} not found")
+        location = self.state.card_index[card_id]
+        source_zone = location.zone
         
         # Move to Lost Zone
-        source_zone_state = self.state.players[player_id].zone(source_zone)
-        lost_zone = self.state.players[player_id].zone(Zone.LOST_ZONE)
+        source_zone_state = self._zone(player_id, source_zone)
+        lost_zone = self._zone(player_id, Zone.LOST_ZONE)
         
-        source_zone_state.cards.remove(card)
+        del source_zone_state.cards[location.index]
+        self.state.index_zone(player_id, source_zone, location.index)
         lost_zone.cards.append(card)
+        self.state.index_zone(player_id, Zone.LOST_ZONE, len(lost_zone.cards) - 1)
         
         self._log(
             actor=self.context.referee_id,
@@ -526,6 +534,39 @@ class GameTools:
     # ------------------------------------------------------------------
     # Prize operations
     # ------------------------------------------------------------------
+    def place_prizes(self, player_id: str, count: int = 6) -> List[CardInstance]:
+        """Move the top ``count`` deck cards into the prize zone."""
+        deck = self._zone(player_id, Zone.DECK)
+        prize_zone = self._zone(player_id, Zone.PRIZE)
+        placed = deck.cards[:count]
+        del deck.cards[:count]
+        start = len(prize_zone.cards)
+        prize_zone.cards.extend(placed)
+        self.state.index_zone(player_id, Zone.DECK)
+        self.state.index_zone(player_id, Zone.PRIZE, start)
+        self._log(
+            actor=self.context.referee_id,
+            action="place_prizes",
+            payload={"player_id": player_id, "count": count, "cards": [card.uid for card in placed]},
+        )
+        return placed
+
+    def return_prizes_to_deck(self, player_id: str) -> List[CardInstance]:
+        """Put every prize card back on the bottom of the deck (before a re-shuffle)."""
+        deck = self._zone(player_id, Zone.DECK)
+        prize_zone = self._zone(player_id, Zone.PRIZE)
+        returned = list(prize_zone.cards)
+        start = len(deck.cards)
+        deck.cards.extend(returned)
+        prize_zone.cards.clear()
+        self.state.index_zone(player_id, Zone.DECK, start)
+        self._log(
+            actor=self.context.referee_id,
+            action="return_prizes_to_deck",
+            payload={"player_id": player_id, "cards": [card.uid for card in returned]},
+        )
+        return returned
+
     def reveal_prize(self, player_id: str, count: int) -> List[CardInstance]:
         """Reveal prize cards without taking them.
         
@@ -563,6 +604,7 @@ class GameTools:
         """
         old_count = self.state.players[player_id].prizes_remaining
         new_count = max(0, old_count + delta)
+        self.journal.touch_player(player_id)
         self.state.players[player_id].prizes_remaining = new_count
         
         self._log(
@@ -593,20 +635,7 @@ class GameTools:
             raise ValueError(f"Invalid condition: {condition}. Must be one of {valid_conditions}")
         
         # Find Pokémon
-        pokemon = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == pokemon_id:
-                    pokemon = card
-                    break
-            if pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == pokemon_id:
-                        pokemon = card
-                        break
-            if pokemon:
-                break
-        
+        pokemon = self.state.find_card(pokemon_id, zones=_IN_PLAY)
         if pokemon is None:
             raise ValueError(f"Pokémon {pokemon_id} not found")
         
@@ -615,6 +644,7 @@ class GameTools:
             # Already has this condition
             return
         
+        pokemon = self.state.writable_card(pokemon_id)
         pokemon.special_conditions.append(condition)
         
         self._log(
@@ -634,24 +664,12 @@ class GameTools:
             condition: Condition name to remove
         """
         # Find Pokémon
-        pokemon = None
-        for player_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == pokemon_id:
-                    pokemon = card
-                    break
-            if pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == pokemon_id:
-                        pokemon = card
-                        break
-            if pokemon:
-                break
-        
+        pokemon = self.state.find_card(pokemon_id, zones=_IN_PLAY)
         if pokemon is None:
             raise ValueError(f"Pokémon {pokemon_id} not found")
         
         if condition in pokemon.special_conditions:
+            pokemon = self.state.writable_card(pokemon_id)
             pokemon.special_conditions.remove(condition)
         
         self._log(
@@ -666,6 +684,29 @@ class GameTools:
     # ------------------------------------------------------------------
     # Enhanced energy attachment with source tracking
     # ------------------------------------------------------------------
+    def detach_energy(self, pokemon_id: str, count: int) -> List[str]:
+        """Remove up to ``count`` attached energy uids from a Pokémon (e.g. retreat cost).
+
+        Returns:
+            UIDs of the detached energy cards
+        """
+        pokemon = self.state.find_card(pokemon_id, zones=_IN_PLAY)
+        if pokemon is None:
+            raise ValueError(f"Pokémon {pokemon_id} not found")
+        pokemon = self.state.writable_card(pokemon_id)
+        detached = pokemon.attached_energy[:count]
+        del pokemon.attached_energy[:count]
+        
+        self._log(
+            actor=self.context.referee_id,
+            action="detach_energy",
+            payload={
+                "pokemon_id": pokemon_id,
+                "energy_cards": detached,
+            },
+        )
+        return detached
+
     def attach_energy_from_reveal(
         self,
         player_id: str,
@@ -698,28 +739,19 @@ class GameTools:
         energy_card = energy_cards[0]
         
         # Remove from deck and attach
-        deck = self.state.players[player_id].zone(Zone.DECK)
-        if energy_card in deck.cards:
-            deck.cards.remove(energy_card)
+        deck = self._zone(player_id, Zone.DECK)
+        if self.state.find_card(energy_card.uid, zones=(Zone.DECK,), player_id=player_id) is not None:
+            index = self.state.card_index[energy_card.uid].index
+            del deck.cards[index]
+            self.state.unindex(energy_card.uid)
+            self.state.index_zone(player_id, Zone.DECK, index)
         
         # Find target Pokémon
-        target_pokemon = None
-        for p_id, player_state in self.state.players.items():
-            for card in player_state.zone(Zone.ACTIVE).cards:
-                if card.uid == target_pokemon_id:
-                    target_pokemon = card
-                    break
-            if target_pokemon is None:
-                for card in player_state.zone(Zone.BENCH).cards:
-                    if card.uid == target_pokemon_id:
-                        target_pokemon = card
-                        break
-            if target_pokemon:
-                break
-        
+        target_pokemon = self.state.find_card(target_pokemon_id, zones=_IN_PLAY)
         if target_pokemon is None:
             raise ValueError(f"Target Pokémon {target_pokemon_id} not found")
         
+        target_pokemon = self.state.writable_card(target_pokemon_id)
         target_pokemon.attached_energy.append(energy_card.uid)
         
         self._log(
@@ -822,13 +854,15 @@ class GameTools:
         Args:
             player_id: Owner of the Stadium card to discard
         """
-        stadium_zone = self.state.players[player_id].zone(Zone.STADIUM)
-        discard_zone = self.state.players[player_id].zone(Zone.DISCARD)
+        stadium_zone = self._zone(player_id, Zone.STADIUM)
+        discard_zone = self._zone(player_id, Zone.DISCARD)
         
         if stadium_zone.cards:
             stadium_card = stadium_zone.cards[0]
             stadium_zone.cards.remove(stadium_card)
+            self.state.index_zone(player_id, Zone.STADIUM)
             discard_zone.cards.append(stadium_card)
+            self.state.index_zone(player_id, Zone.DISCARD, len(discard_zone.cards) - 1)
             
             self._log(
                 actor=self.context.referee_id,
@@ -839,9 +873,36 @@ class GameTools:
                 },
             )
 
+    # ------------------------------------------------------------------
+    # randomness
+    # ------------------------------------------------------------------
+    def _draw_random(self) -> Tuple[random.Random, str]:
+        """Reseed the shared generator for one random operation.
+
+        Returns the generator and the value to log as ``random_seed``: the
+        full hex seed, or a ``"#n"`` counter reference when the match runs on
+        a :class:`~ptcg_ai.rng.MatchRng` stream.
+        """
+
+        if isinstance(self._rng, MatchRng):
+            recorded = self._rng.reference()
+            self._random.seed(self._rng.next_int())
+            return self._random, recorded
+        seed = self._rng()
+        self._random.seed(int(seed, 16))
+        return self._random, seed
+
     # ------------------------------------------------------------------
     # logging helpers
     # ------------------------------------------------------------------
+    def _match_rng(self) -> Optional[MatchRng]:
+        return self._rng if isinstance(self._rng, MatchRng) else None
+
+    def _zone(self, player_id: str, zone: Zone) -> ZoneState:
+        """Zone about to be mutated (journaled on first touch)."""
+        self.journal.touch_zone(player_id, zone)
+        return self.state.players[player_id].zone(zone)
+
     def _record_zone(self, player_id: str, zone: Zone) -> None:
         state = self.state.players[player_id].zone(zone)
         self.context.db.record_zone(self.state.match_id, player_id, zone, state.cards)
@@ -854,7 +915,8 @@ class GameTools:
             payload=payload,
             random_seed=random_seed,
         )
-        self.context.db.append_log(entry)
+        if not self.journal.hold_log(entry):
+            self.context.db.append_log(entry)
 
 
 __all__ = ["GameTools", "ToolCallContext"]
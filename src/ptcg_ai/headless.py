@@ -0,0 +1,420 @@
+"""Headless match engine that plays complete games without LLM agents.
+
+The engine drives :class:`~ptcg_ai.referee.RefereeAgent` exclusively through
+``handle_request`` / ``start_turn`` / ``end_turn`` so that rule regressions
+surface exactly as they would in an agent-driven match, but without any model
+latency. Players are plain :class:`~ptcg_ai.player.PlayerAgent` policies.
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from .card_store import CardStore
+from .database import DatabaseClient
+from .models import CardInstance, Deck, Zone
+from .player import PlayerAgent
+from .referee import MAX_BENCH_SIZE, OperationRequest, RefereeAgent
+from .rng import MatchRng
+from .rulebook import RuleKnowledgeBase
+
+PRIZE_COUNT = 6
+OPENING_HAND_SIZE = 7
+
+
+def clone_deck(deck: Deck) -> Deck:
+    """Copy a deck so each match mutates its own card instances."""
+
+    return Deck(player_id=deck.player_id, cards=[card.clone() for card in deck.cards])
+
+
+def is_basic_pokemon(card: CardInstance) -> bool:
+    return card.definition.card_type == "Pokemon" and card.definition.stage == "Basic"
+
+
+def _describe_pokemon(card: CardInstance) -> Dict[str, object]:
+    return {
+        "uid": card.uid,
+        "name": card.definition.name,
+        "stage": card.definition.stage,
+        "hp": card.hp,
+        "damage": card.damage,
+        "attached_energy_count": len(card.attached_energy),
+        "attacks": card.definition.attacks or [],
+        "special_conditions": list(card.special_conditions),
+    }
+
+
+def build_observation(referee: RefereeAgent, player_id: str) -> Dict[str, object]:
+    """Build a compact observation using the same keys as ``src/main.py``."""
+
+    state = referee.state
+    player = state.players[player_id]
+    opponent_id = next(pid for pid in state.players if pid != player_id)
+    opponent = state.players[opponent_id]
+    hand = player.zone(Zone.HAND).cards
+    return {
+        "turn_number": state.turn_number,
+        "phase": state.phase,
+        "hand_size": len(hand),
+        "prizes": player.prizes_remaining,
+        "my_hand_cards": [
+            {
+                "uid": card.uid,
+                "name": card.definition.name,
+                "type": card.definition.card_type,
+                "stage": card.definition.stage,
+                "subtypes": card.definition.subtypes or [],
+            }
+            for card in hand
+        ],
+        "my_active_pokemon": [_describe_pokemon(card) for card in player.zone(Zone.ACTIVE).cards],
+        "my_bench_pokemon": [_describe_pokemon(card) for card in player.zone(Zone.BENCH).cards],
+        "my_deck_size": len(player.zone(Zone.DECK).cards),
+        "opponent_active_pokemon": [_describe_pokemon(card) for card in opponent.zone(Zone.ACTIVE).cards],
+        "opponent_bench_pokemon": [_describe_pokemon(card) for card in opponent.zone(Zone.BENCH).cards],
+        "opponent_prizes": opponent.prizes_remaining,
+        "energy_attached": player.get_usage_count("energy_attachment", "attach_energy") > 0,
+        "supporter_played": player.get_usage_count("supporter", "play_trainer") > 0,
+        "retreated": player.get_usage_count("retreat", "switch_pokemon") > 0,
+        "legal_actions": [
+            {"action": request.action, "payload": request.payload} for request in referee.legal_actions(player_id)
+        ],
+    }
+
+
+def candidate_requests(player_id: str, observation: Mapping[str, object]) -> List[OperationRequest]:
+    """Enumerate plausible requests from an observation.
+
+    The list is intentionally permissive: the referee remains the authority
+    and rejects anything illegal, exactly as it does for LLM players.
+    """
+
+    hand = observation.get("my_hand_cards", [])
+    active = observation.get("my_active_pokemon", [])
+    bench = observation.get("my_bench_pokemon", [])
+    in_play = list(active) + list(bench)
+    requests: List[OperationRequest] = []
+
+    for card in hand:
+        uid = card["uid"]
+        if card["type"] == "Pokemon" and card["stage"] == "Basic" and len(bench) < MAX_BENCH_SIZE:
+            requests.append(OperationRequest(player_id, "move_to_bench", {"card_id": uid}))
+        elif card["type"] == "Pokemon" and card["stage"] in ("Stage 1", "Stage 2"):
+            previous = "Basic" if card["stage"] == "Stage 1" else "Stage 1"
+            for pokemon in in_play:
+                if pokemon["stage"] == previous:
+                    requests.append(
+                        OperationRequest(
+                            player_id,
+                            "evolve_pokemon",
+                            {"base_card_id": pokemon["uid"], "evolution_card_id": uid},
+                        )
+                    )
+        elif card["type"] == "Energy" and not observation.get("energy_attached"):
+            for pokemon in in_play:
+                requests.append(
+                    OperationRequest(player_id, "attach_energy", {"energy_card_id": uid, "pokemon_id": pokemon["uid"]})
+                )
+        elif card["type"] == "Trainer":
+            if "Supporter" in card["subtypes"] and observation.get("supporter_played"):
+                continue
+            requests.append(OperationRequest(player_id, "play_trainer", {"card_id": uid}))
+
+    if active and bench and active[0]["attached_energy_count"] and not observation.get("retreated"):
+        for pokemon in bench:
+            requests.append(OperationRequest(player_id, "switch_pokemon", {"bench_card_id": pokemon["uid"]}))
+
+    targets = observation.get("opponent_active_pokemon", [])
+    if active and targets:
+        attacker = active[0]
+        for attack in attacker["attacks"]:
+            if len(attack.get("cost") or []) <= attacker["attached_energy_count"]:
+                requests.append(
+                    OperationRequest(
+                        player_id,
+                        "use_attack",
+                        {
+                            "card_id": attacker["uid"],
+                            "attack_name": attack.get("name"),
+                            "target_pokemon_id": targets[0]["uid"],
+                        },
+                    )
+                )
+    return requests
+
+
+@dataclass
+class RandomPlayerAgent(PlayerAgent):
+    """Uniformly random policy over the legal actions plus "end turn".
+
+    Falls back to :func:`candidate_requests` for observations without a
+    ``legal_actions`` menu.
+    """
+
+    rng: random.Random = field(default_factory=random.Random)
+
+    def decide(self, observation: Dict[str, object]) -> Optional[OperationRequest]:
+        menu = observation.get("legal_actions")
+        if menu is None:
+            options = candidate_requests(self.player_id, observation)
+        else:
+            options = [OperationRequest(self.player_id, item["action"], dict(item["payload"])) for item in menu]
+        choice = self.rng.randrange(len(options) + 1)
+        return options[choice] if choice < len(options) else None
+
+    def choose_active(self, candidates: List[CardInstance]) -> CardInstance:
+        return self.rng.choice(candidates)
+
+
+@dataclass
+class ScriptedPlayerAgent(PlayerAgent):
+    """Replay a fixed list of requests; ``None`` entries end the current turn."""
+
+    script: List[Optional[OperationRequest]] = field(default_factory=list)
+
+    def decide(self, observation: Dict[str, object]) -> Optional[OperationRequest]:
+        if not self.script:
+            return None
+        return self.script.pop(0)
+
+
+@dataclass
+class MatchResult:
+    """Outcome of a single headless match."""
+
+    match_id: str
+    winner: Optional[str]
+    reason: str
+    turns: int
+    actions: int
+    failed_actions: int
+    wall_time: float
+
+
+@dataclass
+class HeadlessMatch:
+    """Runs one complete match between two player policies."""
+
+    referee: RefereeAgent
+    players: Dict[str, PlayerAgent]
+    max_turns: int = 100
+    max_actions_per_turn: int = 30
+    max_mulligans: int = 50
+    actions: int = 0
+    failed_actions: int = 0
+
+    # ------------------------------------------------------------------
+    # setup
+    # ------------------------------------------------------------------
+    def setup(self) -> Optional[str]:
+        """Shuffle, draw opening hands, resolve mulligans and place Pokémon.
+
+        Returns a reason string if the match cannot start (no Basic Pokémon).
+        """
+
+        state = self.referee.state
+        tools = self.referee.tools
+        self.referee._determine_starting_player()
+
+        for player_id in self.players:
+            if state.players[player_id].zone(Zone.PRIZE).cards:
+                tools.return_prizes_to_deck(player_id)
+            tools.shuffle(player_id, Zone.DECK)
+            tools.draw(player_id, OPENING_HAND_SIZE)
+
+        mulligans = {player_id: 0 for player_id in self.players}
+        while True:
+            missing = [
+                player_id
+                for player_id in self.players
+                if not any(is_basic_pokemon(card) for card in state.players[player_id].zone(Zone.HAND).cards)
+            ]
+            if not missing:
+                break
+            for player_id in missing:
+                mulligans[player_id] += 1
+                if mulligans[player_id] > self.max_mulligans:
+                    return f"no_basic_pokemon:{player_id}"
+                tools.shuffle_hand_into_deck(player_id)
+                tools.draw(player_id, OPENING_HAND_SIZE)
+
+        # Each mulligan the opponent took lets a player draw one extra card.
+        for player_id in self.players:
+            opponent_id = next(pid for pid in self.players if pid != player_id)
+            extra = mulligans[opponent_id] - mulligans[player_id]
+            if extra > 0:
+                tools.draw(player_id, extra)
+
+        for player_id, agent in self.players.items():
+            basics = [card for card in state.players[player_id].zone(Zone.HAND).cards if is_basic_pokemon(card)]
+            chooser = getattr(agent, "choose_active", None)
+            active = chooser(basics) if chooser else basics[0]
+            tools.move_card(player_id, Zone.HAND, Zone.ACTIVE, active)
+            for card in [c for c in basics if c is not active][:MAX_BENCH_SIZE]:
+                tools.move_card(player_id, Zone.HAND, Zone.BENCH, card)
+            tools.place_prizes(player_id, PRIZE_COUNT)
+        return None
+
+    # ------------------------------------------------------------------
+    # main loop
+    # ------------------------------------------------------------------
+    def play(self) -> MatchResult:
+        started = time.perf_counter()
+        state = self.referee.state
+        aborted = self.setup()
+        if aborted is not None:
+            return self._result(None, aborted, started)
+
+        while state.turn_number <= self.max_turns:
+            player_id = state.turn_player
+            if not state.players[player_id].zone(Zone.DECK).cards:
+                opponent_id = next(pid for pid in self.players if pid != player_id)
+                return self._result(opponent_id, "deck_out", started)
+            self.referee.start_turn(player_id)
+
+            winner = self._play_turn(player_id)
+            if winner is not None:
+                return self._result(winner, "win", started)
+            if state.turn_player == player_id:
+                self.referee.end_turn(player_id)
+
+        return self._result(None, "turn_limit", started)
+
+    def _play_turn(self, player_id: str) -> Optional[str]:
+        agent = self.players[player_id]
+        for _ in range(self.max_actions_per_turn):
+            request = agent.decide(build_observation(self.referee, player_id))
+            if request is None:
+                break
+            result = self.referee.handle_request(request)
+            self.actions += 1
+            if not result.success:
+                self.failed_actions += 1
+                continue
+            self._promote_active_pokemon()
+            winner = self.referee.check_win_condition()
+            if winner is not None:
+                return winner
+            if request.action == "use_attack" or self.referee.state.turn_player != player_id:
+                break
+        return None
+
+    def _promote_active_pokemon(self) -> None:
+        """Move a benched Pokémon into an empty Active Spot (e.g. after a KO)."""
+
+        for player_id, agent in self.players.items():
+            player = self.referee.state.players[player_id]
+            bench = player.zone(Zone.BENCH).cards
+            if player.zone(Zone.ACTIVE).cards or not bench:
+                continue
+            chooser = getattr(agent, "choose_active", None)
+            replacement = chooser(list(bench)) if chooser else bench[0]
+            self.referee.tools.swap_active_with_bench(player_id, replacement.uid)
+
+    def _result(self, winner: Optional[str], reason: str, started: float) -> MatchResult:
+        return MatchResult(
+            match_id=self.referee.state.match_id,
+            winner=winner,
+            reason=reason,
+            turns=self.referee.state.turn_number,
+            actions=self.actions,
+            failed_actions=self.failed_actions,
+            wall_time=time.perf_counter() - started,
+        )
+
+
+def run_match(
+    match_id: str,
+    decks: Mapping[str, Deck],
+    players: Optional[Dict[str, PlayerAgent]] = None,
+    seed: Optional[int] = None,
+    knowledge_base: Optional[RuleKnowledgeBase] = None,
+    max_turns: int = 100,
+    compact: bool = False,
+) -> MatchResult:
+    """Play one headless match with fresh copies of ``decks``.
+
+    Without explicit ``players`` both sides use :class:`RandomPlayerAgent`.
+    Passing ``seed`` makes shuffles and random policies reproducible. With
+    ``compact`` the card copies live in a :class:`~ptcg_ai.card_store.CardStore`
+    instead of one ``CardInstance`` object each.
+    """
+
+    rng = random.Random(seed)
+    if players is None:
+        players = {
+            player_id: RandomPlayerAgent(player_id, rng=random.Random(rng.getrandbits(64)))
+            for player_id in decks
+        }
+    if compact:
+        store = CardStore()
+        player_decks = {player_id: store.pack_deck(deck) for player_id, deck in decks.items()}
+    else:
+        player_decks = {player_id: clone_deck(deck) for player_id, deck in decks.items()}
+    referee = RefereeAgent.create(
+        match_id=match_id,
+        player_decks=player_decks,
+        knowledge_base=knowledge_base or RuleKnowledgeBase(),
+        database=DatabaseClient(),
+        rng=None if seed is None else MatchRng(rng.getrandbits(64)),
+    )
+    return HeadlessMatch(referee=referee, players=players, max_turns=max_turns).play()
+
+
+@dataclass
+class HeadlessRunSummary:
+    """Aggregate throughput figures for a batch of headless matches."""
+
+    results: List[MatchResult]
+    wall_time: float
+
+    @property
+    def matches_per_second(self) -> float:
+        return len(self.results) / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def wins(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            key = result.winner or "draw"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    @property
+    def average_turns(self) -> float:
+        return sum(r.turns for r in self.results) / len(self.results) if self.results else 0.0
+
+
+def run_matches(
+    decks: Mapping[str, Deck],
+    count: int,
+    seed: Optional[int] = None,
+    match_ids: Optional[Iterable[str]] = None,
+    max_turns: int = 100,
+) -> HeadlessRunSummary:
+    """Play ``count`` random-policy matches sequentially and report throughput."""
+
+    ids = list(match_ids) if match_ids is not None else [f"headless-{i + 1}" for i in range(count)]
+    started = time.perf_counter()
+    results = [
+        run_match(match_id, decks, seed=None if seed is None else seed + index, max_turns=max_turns)
+        for index, match_id in enumerate(ids[:count])
+    ]
+    return HeadlessRunSummary(results=results, wall_time=time.perf_counter() - started)
+
+
+__all__ = [
+    "HeadlessMatch",
+    "HeadlessRunSummary",
+    "MatchResult",
+    "RandomPlayerAgent",
+    "ScriptedPlayerAgent",
+    "build_observation",
+    "candidate_requests",
+    "clone_deck",
+    "run_match",
+    "run_matches",
+]
@@ -0,0 +1,199 @@
+"""Undo journal for :class:`~ptcg_ai.game_tools.GameTools` mutations.
+
+While a journal frame is open, every mutating tool records the parts of the
+state it is about to change the first time it touches them: a zone's card
+list, a card's mutable fields, a player's prize count and usage trackers, or
+the turn header. Rolling back replays those records in reverse, so undoing an
+action costs O(parts it touched) rather than a copy of the whole state. Log
+entries written inside a frame are held back and only reach the database
+when the outermost frame commits.
+
+Frames nest: a search can open a frame per ply, apply a move and roll it
+back, all inside the frame of the action being considered.
+
+Independently of frames, every touch stamps the part with a logical clock.
+:meth:`UndoJournal.changes_since` lists the parts touched after a given
+clock value, which is how the database layer builds per-action state deltas
+(see :mod:`ptcg_ai.state_delta`) without diffing the whole state.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from .models import CardInstance, GameLogEntry, GameState, Zone
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .rng import MatchRng
+
+_HEADER_FIELDS = ("turn_player", "turn_number", "phase")
+
+
+class JournalError(RuntimeError):
+    """Raised when a journal mark is used out of order."""
+
+
+class UndoJournal:
+    """Nested undo frames over one :class:`GameState`."""
+
+    __slots__ = ("state", "_entries", "_frames", "_logs", "_clock", "_changes")
+
+    def __init__(self, state: GameState) -> None:
+        self.state = state
+        self._entries: List[Tuple[object, ...]] = []
+        # (first entry, first pending log, rng counter, keys touched in this frame)
+        self._frames: List[Tuple[int, int, Optional[int], Set[object]]] = []
+        self._logs: List[GameLogEntry] = []
+        self._clock = 0
+        # part key -> (clock of its latest touch, card for "card" keys)
+        self._changes: Dict[Tuple[object, ...], Tuple[int, Optional[CardInstance]]] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self._frames)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def clock(self) -> int:
+        """Logical time of the latest touch."""
+
+        return self._clock
+
+    def changes_since(self, clock: int) -> List[Tuple[Tuple[object, ...], Optional[CardInstance]]]:
+        """Parts touched after ``clock`` as ``(key, card)`` pairs.
+
+        Keys are ``("header",)``, ``("player", player_id)``,
+        ``("zone", player_id, zone)`` and ``("card", uid)``; ``card`` is the
+        touched instance for card keys and ``None`` otherwise. A part that was
+        touched and then rolled back is still listed.
+        """
+
+        return [(key, card) for key, (stamp, card) in self._changes.items() if stamp > clock]
+
+    # ------------------------------------------------------------------
+    # frames
+    # ------------------------------------------------------------------
+    def begin(self, rng: Optional["MatchRng"] = None) -> int:
+        """Open a frame and return its mark (the nesting depth)."""
+
+        counter = rng.counter if rng is not None else None
+        self._frames.append((len(self._entries), len(self._logs), counter, set()))
+        return len(self._frames) - 1
+
+    def commit(self, mark: int, sink: Callable[[GameLogEntry], None]) -> None:
+        """Close frame ``mark`` (and any frame opened after it), keeping its changes.
+
+        Closing the outermost frame drops the undo records and hands the held
+        log entries to ``sink`` in order.
+        """
+
+        self._check(mark)
+        touched = set().union(*(frame[3] for frame in self._frames[mark:]))
+        del self._frames[mark:]
+        if self._frames:
+            self._frames[-1][3].update(touched)
+            return
+        self._entries.clear()
+        logs, self._logs = self._logs, []
+        for entry in logs:
+            sink(entry)
+
+    def rollback(self, mark: int, rng: Optional["MatchRng"] = None) -> None:
+        """Restore the state as it was when frame ``mark`` was opened and close it."""
+
+        self._check(mark)
+        first_entry, first_log, counter, _ = self._frames[mark]
+        del self._frames[mark:]
+        state = self.state
+        zones: Set[Tuple[str, Zone]] = set()
+        for entry in reversed(self._entries[first_entry:]):
+            kind = entry[0]
+            if kind == "zone":
+                _, player_id, zone, cards = entry
+                state.players[player_id].zone(zone).cards[:] = cards
+                zones.add((player_id, zone))
+            elif kind == "card":
+                _, card, damage, attached_energy, special_conditions = entry
+                card.damage = damage
+                card.attached_energy = attached_energy
+                card.special_conditions = special_conditions
+            elif kind == "owned":
+                state._owned_cards.discard(entry[1])
+            elif kind == "player":
+                _, player_id, prizes_remaining, usage_trackers = entry
+                player = state.players[player_id]
+                player.prizes_remaining = prizes_remaining
+                player.usage_trackers = usage_trackers
+            else:
+                for name, value in zip(_HEADER_FIELDS, entry[1]):
+                    setattr(state, name, value)
+        del self._entries[first_entry:]
+        del self._logs[first_log:]
+        for player_id, zone in zones:
+            state.index_zone(player_id, zone)
+        if rng is not None and counter is not None:
+            rng.counter = counter
+
+    # ------------------------------------------------------------------
+    # recording
+    # ------------------------------------------------------------------
+    def touch_zone(self, player_id: str, zone: Zone) -> None:
+        self._stamp(("zone", player_id, zone))
+        if self._first_touch(("zone", player_id, zone)):
+            cards = self.state.players[player_id].zone(zone).cards
+            self._entries.append(("zone", player_id, zone, list(cards)))
+
+    def touch_card(self, card: CardInstance) -> None:
+        self._stamp(("card", card.uid), card)
+        if self._first_touch(("card", id(card))):
+            self._entries.append(
+                ("card", card, card.damage, list(card.attached_energy), list(card.special_conditions))
+            )
+
+    def touch_owned(self, uid: str) -> None:
+        if self._frames and uid not in self.state._owned_cards:
+            self._entries.append(("owned", uid))
+
+    def touch_player(self, player_id: str) -> None:
+        self._stamp(("player", player_id))
+        if self._first_touch(("player", player_id)):
+            player = self.state.players[player_id]
+            trackers = {entity_id: dict(counters) for entity_id, counters in player.usage_trackers.items()}
+            self._entries.append(("player", player_id, player.prizes_remaining, trackers))
+
+    def touch_header(self) -> None:
+        self._stamp(("header",))
+        if self._first_touch(("header",)):
+            self._entries.append(("header", tuple(getattr(self.state, name) for name in _HEADER_FIELDS)))
+
+    def hold_log(self, entry: GameLogEntry) -> bool:
+        """Keep ``entry`` until the outermost frame commits; ``False`` when no frame is open."""
+
+        if not self._frames:
+            return False
+        self._logs.append(entry)
+        return True
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+    def _stamp(self, key: Tuple[object, ...], card: Optional[CardInstance] = None) -> None:
+        self._clock += 1
+        self._changes[key] = (self._clock, card)
+
+    def _first_touch(self, key: object) -> bool:
+        if not self._frames:
+            return False
+        touched = self._frames[-1][3]
+        if key in touched:
+            return False
+        touched.add(key)
+        return True
+
+    def _check(self, mark: int) -> None:
+        if not 0 <= mark < len(self._frames):
+            raise JournalError(f"Journal frame {mark} is not open")
+
+
+__all__ = ["JournalError", "UndoJournal"]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 
 class Zone(str, Enum):
@@ -19,9 +19,55 @@ class Zone(str, Enum):
     STADIUM = "stadium"
 
 
-@dataclass(slots=True)
+class FrozenDict(dict):
+    """Read-only, hashable ``dict`` for card text blocks (attacks, abilities).
+
+    Still a ``dict`` subclass, so JSON/msgpack encoding and ``.get`` lookups
+    keep working unchanged.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("card data is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenDict":
+        return self
+
+
+def freeze_card_data(value: Any) -> Any:
+    """Recursively turn lists into tuples and dicts into :class:`FrozenDict`."""
+
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze_card_data(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_card_data(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
 class CardDefinition:
-    """Static card information shared by all instances."""
+    """Static card information shared by all instances.
+
+    Immutable and hashable by value: ``subtypes``, ``abilities`` and
+    ``attacks`` are frozen into tuples (of :class:`FrozenDict`) on
+    construction, so a single definition can be shared by every match in
+    the process (see :mod:`ptcg_ai.card_registry`).
+    """
 
     set_code: str
     number: str
@@ -30,9 +76,15 @@ class CardDefinition:
     hp: Optional[int] = None
     stage: Optional[str] = None
     rules_text: Optional[str] = None
-    subtypes: Optional[List[str]] = None
-    abilities: Optional[List[Dict[str, object]]] = None
-    attacks: Optional[List[Dict[str, object]]] = None
+    subtypes: Optional[Tuple[str, ...]] = None
+    abilities: Optional[Tuple[Mapping[str, Any], ...]] = None
+    attacks: Optional[Tuple[Mapping[str, Any], ...]] = None
+
+    def __post_init__(self) -> None:
+        for name in ("subtypes", "abilities", "attacks"):
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, freeze_card_data(value))
 
 
 @dataclass(slots=True)
@@ -61,6 +113,17 @@ class CardInstance:
             return False
         return self.damage >= self.hp
 
+    def clone(self) -> "CardInstance":
+        """Copy the mutable fields while sharing the static definition."""
+        return CardInstance(
+            uid=self.uid,
+            owner_id=self.owner_id,
+            definition=self.definition,
+            damage=self.damage,
+            attached_energy=list(self.attached_energy),
+            special_conditions=list(self.special_conditions),
+        )
+
 
 @dataclass
 class ZoneState:
@@ -104,6 +167,16 @@ class PlayerState:
 
     def zone(self, zone: Zone) -> ZoneState:
         return self.zones.setdefault(zone, ZoneState())
+
+    def fork(self) -> "PlayerState":
+        """Copy zone lists and trackers; card instances stay shared."""
+        return PlayerState(
+            player_id=self.player_id,
+            zones={zone: state.copy() for zone, state in self.zones.items()},
+            prizes_remaining=self.prizes_remaining,
+            memory=list(self.memory),
+            usage_trackers={entity_id: dict(counters) for entity_id, counters in self.usage_trackers.items()},
+        )
     
     def track_usage(self, entity_id: str, counter_type: str, scope: str = "turn") -> None:
         """Track usage of an ability/attack. Scope can be 'turn' or 'game'."""
@@ -129,6 +202,19 @@ class PlayerState:
                 del self.usage_trackers[entity_id]
 
 
+class CardIndexError(RuntimeError):
+    """Raised when the card-location index disagrees with the zone lists."""
+
+
+@dataclass(frozen=True, slots=True)
+class CardLocation:
+    """Position of a card inside the game state."""
+
+    player_id: str
+    zone: Zone
+    index: int
+
+
 @dataclass
 class GameState:
     """Composite state tracked by the referee."""
@@ -138,6 +224,136 @@ class GameState:
     turn_player: Optional[str] = None
     turn_number: int = 0
     phase: str = "init"
+    card_index: Dict[str, CardLocation] = field(default_factory=dict, repr=False, compare=False)
+    _copy_on_write: bool = field(default=False, init=False, repr=False, compare=False)
+    _owned_cards: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Undo journal of the GameTools bound to this state (see ptcg_ai.journal)
+    _journal: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.card_index:
+            self.reindex()
+
+    # ------------------------------------------------------------------
+    # copy-on-write branching
+    # ------------------------------------------------------------------
+    def fork(self) -> "GameState":
+        """Return a cheap branch of this state for search and lookahead.
+
+        Zone lists and usage trackers are copied, while ``CardInstance``
+        objects (and their ``CardDefinition``) are shared until one side writes
+        to them through :meth:`writable_card`. After a fork both the parent and
+        the branch treat every existing card as shared.
+        """
+
+        self._copy_on_write = True
+        self._owned_cards.clear()
+        branch = GameState(
+            match_id=self.match_id,
+            players={player_id: player.fork() for player_id, player in self.players.items()},
+            turn_player=self.turn_player,
+            turn_number=self.turn_number,
+            phase=self.phase,
+            card_index=dict(self.card_index),
+        )
+        branch._copy_on_write = True
+        return branch
+
+    def writable_card(self, uid: str) -> CardInstance:
+        """Return a card whose mutable fields may be changed by this state.
+
+        Shared cards are cloned into their zone slot on first write.
+        """
+
+        location = self.locate(uid)
+        if location is None:
+            raise ValueError(f"Card {uid} not found")
+        cards = self.players[location.player_id].zone(location.zone).cards
+        card = cards[location.index]
+        journal = self._journal
+        if not self._copy_on_write or uid in self._owned_cards:
+            if journal is not None:
+                journal.touch_card(card)
+            return card
+        if journal is not None:
+            journal.touch_zone(location.player_id, location.zone)
+            journal.touch_owned(uid)
+        card = card.clone()
+        cards[location.index] = card
+        self._owned_cards.add(uid)
+        if journal is not None:
+            journal.touch_card(card)
+        return card
+
+    # ------------------------------------------------------------------
+    # card-location index
+    # ------------------------------------------------------------------
+    def reindex(self) -> None:
+        """Rebuild the uid index from scratch.
+
+        Call this after manipulating ``ZoneState.cards`` directly instead of
+        going through :class:`~ptcg_ai.game_tools.GameTools`.
+        """
+
+        self.card_index.clear()
+        for player_id in self.players:
+            for zone in Zone:
+                self.index_zone(player_id, zone)
+
+    def index_zone(self, player_id: str, zone: Zone, start: int = 0) -> None:
+        """(Re)index the cards of a zone from position ``start`` onwards."""
+
+        cards = self.players[player_id].zone(zone).cards
+        for position in range(start, len(cards)):
+            self.card_index[cards[position].uid] = CardLocation(player_id, zone, position)
+
+    def unindex(self, uid: str) -> None:
+        """Forget a card that no longer lives in any zone (e.g. attached energy)."""
+
+        self.card_index.pop(uid, None)
+
+    def locate(self, uid: str) -> Optional[CardLocation]:
+        """Return the current location of ``uid`` or ``None`` if it is unknown.
+
+        :class:`~ptcg_ai.game_tools.GameTools` re-indexes the shifted tail of
+        a zone after every removal, so positions are exact and lookups are
+        constant time. A stale position (after editing ``ZoneState.cards``
+        directly) is repaired by scanning the indexed zone; a card that is
+        missing from the zone it is indexed in raises :class:`CardIndexError`.
+        """
+
+        location = self.card_index.get(uid)
+        if location is None:
+            return None
+        cards = self.players[location.player_id].zone(location.zone).cards
+        if location.index < len(cards) and cards[location.index].uid == uid:
+            return location
+        for position, card in enumerate(cards):
+            if card.uid == uid:
+                location = CardLocation(location.player_id, location.zone, position)
+                self.card_index[uid] = location
+                return location
+        raise CardIndexError(
+            f"Card index out of sync: {uid} is indexed in "
+            f"{location.player_id}/{location.zone.value} but is not in that zone"
+        )
+
+    def find_card(
+        self,
+        uid: str,
+        zones: Optional[Iterable[Zone]] = None,
+        player_id: Optional[str] = None,
+    ) -> Optional[CardInstance]:
+        """Return the card with ``uid`` if it is in one of ``zones`` (all zones by default)."""
+
+        location = self.locate(uid)
+        if location is None:
+            return None
+        if player_id is not None and location.player_id != player_id:
+            return None
+        if zones is not None and location.zone not in zones:
+            return None
+        return self.players[location.player_id].zone(location.zone).cards[location.index]
 
     def snapshot(self) -> Dict[str, Dict[str, List[str]]]:
         """Produce a serialisable snapshot for audit and tooling."""
@@ -164,11 +380,15 @@ class GameLogEntry:
 
 __all__ = [
     "CardDefinition",
+    "CardIndexError",
+    "CardLocation",
     "CardInstance",
     "Deck",
+    "FrozenDict",
     "PlayerState",
     "GameState",
     "Zone",
     "ZoneState",
     "GameLogEntry",
+    "freeze_card_data",
 ]
@@ -0,0 +1,163 @@
+"""Monte Carlo analysis of opening hands, mulligans and prize cards.
+
+:func:`analyze_opening` plays only the setup phase (shuffle, draw 7, Basic
+check, mulligan loop, Active/Bench placement, prizes) of many games with the
+lockstep :class:`~ptcg_ai.batch.BatchEngine`. Games are split into chunks of
+seeds and spread over a process pool exactly like
+:mod:`ptcg_ai.tournament`; game ``i`` uses the seed ``seed + i``, so a report
+does not depend on the number of workers.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .batch import BatchEngine
+from .models import Zone
+from .simulation import build_deck
+from .tournament import _WORKER_DECKS, DeckLoader, _init_worker
+
+PLAYER_ID = "playerA"
+OPPONENT_ID = "playerB"
+
+_OPENING_ZONES = (Zone.HAND, Zone.ACTIVE, Zone.BENCH)
+
+
+@dataclass
+class OpeningReport:
+    """Aggregated setup statistics for one deck.
+
+    ``mulligans`` maps a mulligan count to the number of games that needed
+    it. ``openers`` counts the games in which a card name was in the opening
+    hand (including the Pokémon put into play), and ``prizes`` maps each card
+    name to a ``{copies prized: games}`` histogram.
+    """
+
+    games: int = 0
+    aborted: int = 0
+    mulligans: Dict[int, int] = field(default_factory=dict)
+    openers: Dict[str, int] = field(default_factory=dict)
+    prizes: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    def merge(self, other: "OpeningReport") -> None:
+        self.games += other.games
+        self.aborted += other.aborted
+        for count, games in other.mulligans.items():
+            self.mulligans[count] = self.mulligans.get(count, 0) + games
+        for name, games in other.openers.items():
+            self.openers[name] = self.openers.get(name, 0) + games
+        for name, histogram in other.prizes.items():
+            merged = self.prizes.setdefault(name, {})
+            for copies, games in histogram.items():
+                merged[copies] = merged.get(copies, 0) + games
+
+    @property
+    def mulligan_rate(self) -> float:
+        """Share of games that needed at least one mulligan."""
+
+        return 1 - self.mulligans.get(0, 0) / self.games if self.games else 0.0
+
+    @property
+    def average_mulligans(self) -> float:
+        total = sum(count * games for count, games in self.mulligans.items())
+        return total / self.games if self.games else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.wall_time if self.wall_time else 0.0
+
+    def opener_probability(self, name: str) -> float:
+        started = self.games - self.aborted
+        return self.openers.get(name, 0) / started if started else 0.0
+
+    def prize_distribution(self, name: str) -> Dict[int, float]:
+        """Probability of having each number of copies of ``name`` prized."""
+
+        histogram = self.prizes.get(name, {})
+        started = self.games - self.aborted
+        return {copies: games / started for copies, games in sorted(histogram.items())} if started else {}
+
+
+def _analyze_chunk(first_seed: int, count: int, max_mulligans: int) -> OpeningReport:
+    decks = {PLAYER_ID: _WORKER_DECKS[PLAYER_ID]}
+    if OPPONENT_ID in _WORKER_DECKS:
+        decks[OPPONENT_ID] = _WORKER_DECKS[OPPONENT_ID]
+    engine = BatchEngine(decks, range(first_seed, first_seed + count))
+    reasons = engine.setup(max_mulligans=max_mulligans)
+
+    names = sorted({card.definition.name for card in decks[PLAYER_ID].cards})
+    name_ids = {name: index for index, name in enumerate(names)}
+    card_names = [name_ids[card.definition.name] for card in decks[PLAYER_ID].cards]
+    openers = [0] * len(names)
+    prizes: List[Dict[int, int]] = [{} for _ in names]
+    report = OpeningReport(games=count)
+
+    for row, reason in enumerate(reasons):
+        mulligans = engine.mulligans[PLAYER_ID][row]
+        report.mulligans[mulligans] = report.mulligans.get(mulligans, 0) + 1
+        if reason is not None:
+            report.aborted += 1
+            continue
+        opening = {card_names[card] for zone in _OPENING_ZONES for card in engine.zone(PLAYER_ID, zone, row)}
+        for name_id in opening:
+            openers[name_id] += 1
+        prized = [0] * len(names)
+        for card in engine.zone(PLAYER_ID, Zone.PRIZE, row):
+            prized[card_names[card]] += 1
+        for name_id, copies in enumerate(prized):
+            prizes[name_id][copies] = prizes[name_id].get(copies, 0) + 1
+
+    report.openers = {name: openers[index] for index, name in enumerate(names)}
+    report.prizes = {name: prizes[index] for index, name in enumerate(names)}
+    return report
+
+
+def analyze_opening(
+    deck_file: str,
+    games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    opponent_deck_file: Optional[str] = None,
+    chunk_size: int = 5000,
+    max_mulligans: int = 50,
+    deck_loader: DeckLoader = build_deck,
+) -> OpeningReport:
+    """Estimate mulligan rate, opener odds and prize distribution for a deck.
+
+    Without ``opponent_deck_file`` the deck is set up alone; with one, the
+    opponent's mulligans grant extra draws as in a real match. ``deck_loader``
+    follows the :func:`~ptcg_ai.tournament.iter_tournament` contract.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    deck_files = {PLAYER_ID: deck_file}
+    if opponent_deck_file is not None:
+        deck_files[OPPONENT_ID] = opponent_deck_file
+    chunks = [(seed + start, min(chunk_size, games - start)) for start in range(0, games, chunk_size)]
+
+    report = OpeningReport()
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(deck_loader, deck_files)
+        for first_seed, count in chunks:
+            report.merge(_analyze_chunk(first_seed, count, max_mulligans))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(deck_loader, deck_files),
+        ) as executor:
+            futures = [
+                executor.submit(_analyze_chunk, first_seed, count, max_mulligans) for first_seed, count in chunks
+            ]
+            for future in as_completed(futures):
+                report.merge(future.result())
+    report.wall_time = time.perf_counter() - started
+    return report
+
+
+__all__ = ["OpeningReport", "analyze_opening"]
@@ -0,0 +1,185 @@
+"""Process-wide cache of card execution plans for the referee hot path.
+
+Plans are keyed by ``(card_id, effect_name, version, status)`` exactly like
+the arguments of ``load_plan_from_db``; a cached ``None`` records that no
+plan exists, so a card without a plan costs one lookup per TTL instead of
+one database round trip per play. Entries expire after ``ttl`` seconds
+(``PTCG_PLAN_CACHE_TTL``, default 300) and are dropped as soon as a plan
+for the card is saved in this process (:meth:`PlanCache.invalidate`).
+
+A loader that raises caches nothing. Loaders run through
+:meth:`PlanCache.attempt`, which remembers a failure for ``backoff`` seconds
+(``PTCG_PLAN_DB_BACKOFF``, default 30) and raises
+:class:`PlanStoreUnavailable` meanwhile, so an unreachable database costs
+one connection attempt per back-off rather than one per match or play.
+
+The loaders themselves live next to the plan table in
+``agents.rule_analyst.db_access``.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from .models import CardDefinition
+
+PlanKey = Tuple[str, Optional[str], Optional[int], Optional[str]]
+Lookup = Tuple[str, Optional[str]]
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def card_plan_id(definition: CardDefinition) -> str:
+    """Plan table id of a card (``set_code-number``)."""
+
+    return f"{definition.set_code}-{definition.number}"
+
+
+def plan_lookups(definitions: Iterable[CardDefinition]) -> List[Tuple[str, Optional[str]]]:
+    """``(card_id, effect_name)`` pairs the referee may look up for these cards.
+
+    Trainers are looked up without an effect name; abilities and attacks by
+    their names.
+    """
+
+    lookups: Set[Tuple[str, Optional[str]]] = set()
+    for definition in definitions:
+        card_id = card_plan_id(definition)
+        lookups.add((card_id, None))
+        for effect in (definition.abilities or ()) + (definition.attacks or ()):
+            if effect.get("name"):
+                lookups.add((card_id, effect["name"]))
+    return sorted(lookups, key=lambda lookup: (lookup[0], lookup[1] or ""))
+
+
+def latest_plans(plans: Iterable[object], lookups: Iterable[Lookup]) -> Dict[Lookup, Optional[object]]:
+    """Map each ``(card_id, effect_name)`` lookup to its newest plan, or ``None``.
+
+    ``plans`` must come newest first. A lookup without an effect name takes
+    the newest plan of the card, like ``load_plan_from_db``.
+    """
+
+    newest: Dict[Lookup, object] = {}
+    for plan in plans:
+        newest.setdefault((plan.card_id, None), plan)
+        if plan.effect_name:
+            newest.setdefault((plan.card_id, plan.effect_name), plan)
+    return {lookup: newest.get(lookup) for lookup in lookups}
+
+
+class PlanStoreUnavailable(RuntimeError):
+    """Raised while the plan store is backing off after a failed load."""
+
+
+class PlanCache:
+    """Thread-safe TTL cache of plans (or of their absence)."""
+
+    def __init__(
+        self, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic, backoff: float = 30.0
+    ) -> None:
+        self.ttl = ttl
+        self.backoff = backoff
+        self._clock = clock
+        self._retry_at = float("-inf")
+        self._entries: Dict[PlanKey, Tuple[object, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: PlanKey) -> object:
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry[1] >= self.ttl:
+            return _MISSING
+        return entry[0]
+
+    def fresh(self, key: PlanKey) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def put(self, key: PlanKey, plan: object) -> None:
+        with self._lock:
+            self._entries[key] = (plan, self._clock())
+
+    def get(self, key: PlanKey, load: Callable[[], object]) -> object:
+        """Return the cached plan for ``key``, calling ``load()`` on a miss.
+
+        Nothing is cached when ``load()`` raises.
+        """
+
+        plan = self._lookup(key)
+        if plan is not _MISSING:
+            self.hits += 1
+            return plan
+        self.misses += 1
+        plan = load()
+        self.put(key, plan)
+        return plan
+
+    def preload(
+        self,
+        lookups: Iterable[Lookup],
+        status: Optional[str],
+        load_many: Callable[[List[Lookup]], Dict[Lookup, Optional[object]]],
+    ) -> int:
+        """Cache the latest plan of every lookup that is not fresh yet.
+
+        ``load_many`` receives the missing lookups and returns a plan (or
+        ``None``) for each; returns the number of keys stored.
+        """
+
+        missing = [lookup for lookup in lookups if not self.fresh((lookup[0], lookup[1], None, status))]
+        if not missing:
+            return 0
+        plans = load_many(missing)
+        for (card_id, effect_name), plan in plans.items():
+            self.put((card_id, effect_name, None, status), plan)
+        return len(plans)
+
+    def attempt(self, load: Callable[[], T]) -> T:
+        """Run ``load`` unless it failed less than ``backoff`` seconds ago.
+
+        Raises :class:`PlanStoreUnavailable` while backing off; an exception
+        from ``load`` starts a new back-off and propagates.
+        """
+
+        if self._clock() < self._retry_at:
+            raise PlanStoreUnavailable("Plan store unavailable, backing off after a failed load")
+        try:
+            return load()
+        except Exception:
+            self._retry_at = self._clock() + self.backoff
+            raise
+
+    def invalidate(self, card_id: Optional[str] = None) -> None:
+        """Drop every entry of ``card_id`` (all entries when ``None``)."""
+
+        with self._lock:
+            if card_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == card_id]:
+                    del self._entries[key]
+
+
+plan_cache = PlanCache(
+    ttl=float(os.getenv("PTCG_PLAN_CACHE_TTL", "300")),
+    backoff=float(os.getenv("PTCG_PLAN_DB_BACKOFF", "30")),
+)
+
+
+__all__ = [
+    "Lookup",
+    "PlanCache",
+    "PlanKey",
+    "PlanStoreUnavailable",
+    "card_plan_id",
+    "latest_plans",
+    "plan_cache",
+    "plan_lookups",
+]
@@ -2,13 +2,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
 
-from .card_effects import EffectContext, EffectExecutor
+from .card_effects import EffectContext, EffectExecutor, ability_unavailable
 from .database import DatabaseClient
 from .game_tools import GameTools, ToolCallContext
 from .models import CardInstance, Deck, GameState, PlayerState, Zone
+from .plan_cache import card_plan_id
+from .rng import MatchRng
 from .rulebook import RuleKnowledgeBase
+from .snapshot import state_to_dict
+
+MAX_BENCH_SIZE = 5
+
+
+@lru_cache(maxsize=None)
+def _plan_access():
+    """The plan loaders in ``agents.rule_analyst.db_access``, or ``None`` when unavailable."""
+    try:
+        from agents.rule_analyst import db_access
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.debug(f"Card execution plans unavailable: {e}")
+        return None
+    return db_access
 
 
 @dataclass
@@ -54,7 +73,14 @@ class RefereeAgent:
     # match setup
     # ------------------------------------------------------------------
     @classmethod
-    def create(cls, match_id: str, player_decks: Dict[str, Deck], knowledge_base: RuleKnowledgeBase, database: Optional[DatabaseClient] = None) -> "RefereeAgent":
+    def create(
+        cls,
+        match_id: str,
+        player_decks: Dict[str, Deck],
+        knowledge_base: RuleKnowledgeBase,
+        database: Optional[DatabaseClient] = None,
+        rng: Optional[Callable[[], str]] = None,
+    ) -> "RefereeAgent":
         for deck in player_decks.values():
             deck.validate()
         players = {
@@ -69,19 +95,69 @@ class RefereeAgent:
             database=db,
             state=state,
         )
+        if rng is not None:
+            referee.tools._rng = rng
+            if isinstance(rng, MatchRng):
+                referee.tools._log(
+                    actor=referee.referee_id,
+                    action="rng_init",
+                    payload={"master_seed": rng.master_seed, "counter": rng.counter},
+                )
+        referee._preload_plans(player_decks)
         referee._initialise_decks(player_decks)
         return referee
 
+    def _preload_plans(self, player_decks: Dict[str, Deck]) -> None:
+        """Warm the plan cache for every card in play so effects never wait on the database."""
+        db_access = _plan_access()
+        if db_access is None:
+            return
+        definitions = {card.definition for deck in player_decks.values() for card in deck.cards}
+        try:
+            db_access.preload_plans(definitions)
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.debug(f"Could not preload plans: {e}")
+
+    def _load_plan(self, card: CardInstance, effect_name: Optional[str] = None):
+        """Cached CardExecutionPlan for ``card`` (``None`` falls back to text-based execution)."""
+        db_access = _plan_access()
+        if db_access is None:
+            return None
+        card_id = card_plan_id(card.definition)
+        try:
+            return db_access.load_plan_cached(card_id, effect_name=effect_name, status="approved")
+        except Exception as e:
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.debug(f"Could not load plan for {card_id} ({effect_name}): {e}")
+            return None
+
     def _initialise_decks(self, player_decks: Dict[str, Deck]) -> None:
         for player_id, deck in player_decks.items():
             zone = self.state.players[player_id].zone(Zone.DECK)
             zone.cards[:] = list(deck.cards)
+            self.state.index_zone(player_id, Zone.DECK)
+        # The unshuffled decks (with card definitions) are the base state for log replay
+        self.tools._log(actor=self.referee_id, action="match_init", payload=state_to_dict(self.state))
+        for player_id in player_decks:
             self.tools.shuffle(player_id, Zone.DECK)
-            prize_zone = self.state.players[player_id].zone(Zone.PRIZE)
-            prize_zone.cards[:] = zone.cards[:6]
-            del zone.cards[:6]
+            self.tools.place_prizes(player_id, 6)
             self.database.persist_state(self.state)
 
+    def fork(self) -> "RefereeAgent":
+        """Branch the match for lookahead without touching the real database."""
+        branch = RefereeAgent(
+            referee_id=self.referee_id,
+            knowledge_base=self.knowledge_base,
+            database=DatabaseClient(),
+            state=self.state.fork(),
+        )
+        rng = self.tools._rng
+        branch.tools._rng = rng.fork() if isinstance(rng, MatchRng) else rng
+        return branch
+
     # ------------------------------------------------------------------
     # public API
     # ------------------------------------------------------------------
@@ -90,12 +166,20 @@ class RefereeAgent:
         handler = getattr(self, handler_name, None)
         if handler is None:
             return OperationResult(False, f"Unknown action: {request.action}")
+        # Journal the action so a failure part-way through leaves no trace
+        mark = self.tools.begin()
         try:
             # Ensure payload is a dict, not None
             payload = request.payload if request.payload is not None else {}
             result = handler(request.actor_id, **payload)
         except Exception as exc:  # noqa: BLE001 - we surface user facing errors
+            self.tools.rollback(mark)
             return OperationResult(False, str(exc))
+        if isinstance(result, dict) and result.get("success") is False:
+            # Effects report failed steps in their result instead of raising
+            self.tools.rollback(mark)
+            return OperationResult(False, str(result.get("message", "Action failed")), data=result)
+        self.tools.commit(mark)
         self.database.persist_state(self.state)
         return OperationResult(True, "ok", data=result)
 
@@ -297,16 +381,7 @@ class RefereeAgent:
             raise ValueError("use_ability requires 'ability_name' parameter. Provide the name of the ability to use.")
         
         # Find card
-        card = None
-        for zone in [Zone.ACTIVE, Zone.BENCH]:
-            zone_state = self.state.players[actor_id].zone(zone)
-            for c in zone_state.cards:
-                if c.uid == card_id:
-                    card = c
-                    break
-            if card:
-                break
-        
+        card = self.state.find_card(card_id, zones=(Zone.ACTIVE, Zone.BENCH), player_id=actor_id)
         if card is None:
             raise ValueError(f"Card {card_id} not found in active or bench")
         
@@ -324,22 +399,7 @@ class RefereeAgent:
             raise ValueError(f"Ability {ability_name} not found on card {card_id}")
         
         # Check if this is a passive ability (cannot be activated)
-        ability_text = str(ability.get("text", "")).lower()
-        
-        # Passive ability indicators:
-        # - "Prevent" (e.g., "Prevent all damage")
-        # - "As long as" (e.g., "As long as this Pokémon is in the Active Spot")
-        # - "Whenever" (e.g., "Whenever...")
-        # - No activation keywords like "Once during your turn", "You may"
-        is_passive = (
-            "prevent" in ability_text or
-            "as long as" in ability_text or
-            "whenever" in ability_text or
-            ("once during your turn" not in ability_text and "you may" not in ability_text and 
-             "search" not in ability_text and "draw" not in ability_text and "discard" not in ability_text)
-        )
-        
-        if is_passive:
+        if self._is_passive_ability(ability):
             raise ValueError(
                 f"Ability '{ability_name}' is a passive ability that is always active. "
                 f"It does not need to be activated and cannot be used with 'use_ability'. "
@@ -347,16 +407,8 @@ class RefereeAgent:
             )
         
         # Try to load CardExecutionPlan from database
-        plan = None
-        try:
-            from agents.rule_analyst.db_access import load_plan_from_db
-            card_id = f"{card.definition.set_code}-{card.definition.number}"
-            # 通过 effect_name 加载特定的能力预案
-            plan = load_plan_from_db(card_id, effect_name=ability_name, status="approved")
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.debug(f"Could not load plan for ability {ability_name}: {e}")
+        # 通过 effect_name 加载特定的能力预案
+        plan = self._load_plan(card, ability_name)
         
         context = EffectContext(
             game_state=self.state,
@@ -389,13 +441,7 @@ class RefereeAgent:
             raise ValueError("The first player cannot attack on their first turn")
         
         # Find attacking card
-        active = self.state.players[actor_id].zone(Zone.ACTIVE)
-        card = None
-        for c in active.cards:
-            if c.uid == card_id:
-                card = c
-                break
-        
+        card = self.state.find_card(card_id, zones=(Zone.ACTIVE,), player_id=actor_id)
         if card is None:
             raise ValueError(f"Card {card_id} not found in active spot")
         
@@ -417,16 +463,8 @@ class RefereeAgent:
             raise ValueError(f"Energy requirements not met for attack {attack_name}")
         
         # Try to load CardExecutionPlan from database
-        plan = None
-        try:
-            from agents.rule_analyst.db_access import load_plan_from_db
-            card_id = f"{card.definition.set_code}-{card.definition.number}"
-            # 通过 effect_name 加载特定的攻击预案
-            plan = load_plan_from_db(card_id, effect_name=attack_name, status="approved")
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.debug(f"Could not load plan for attack {attack_name}: {e}")
+        # 通过 effect_name 加载特定的攻击预案
+        plan = self._load_plan(card, attack_name)
         
         context = EffectContext(
             game_state=self.state,
@@ -502,12 +540,7 @@ class RefereeAgent:
         
         # Find card in hand
         hand = self.state.players[actor_id].zone(Zone.HAND)
-        card = None
-        for c in hand.cards:
-            if c.uid == card_id:
-                card = c
-                break
-        
+        card = self.state.find_card(card_id, zones=(Zone.HAND,), player_id=actor_id)
         if card is None:
             # Check if they used card name instead of UID
             card_names = [c.definition.name for c in hand.cards]
@@ -553,16 +586,7 @@ class RefereeAgent:
                     raise ValueError(f"Stadium card {card.definition.name} is already in play")
         
         # Try to load CardExecutionPlan from database
-        plan = None
-        try:
-            from agents.rule_analyst.db_access import load_plan_from_db
-            card_id = f"{card.definition.set_code}-{card.definition.number}"
-            plan = load_plan_from_db(card_id, status="approved")
-        except Exception as e:
-            # If plan loading fails, fall back to text-based execution
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.debug(f"Could not load plan for {card_id}: {e}")
+        plan = self._load_plan(card)
         
         context = EffectContext(
             game_state=self.state,
@@ -631,18 +655,10 @@ class RefereeAgent:
             raise ValueError(f"Not enough energy attached. Retreat cost is {retreat_cost}, but only {len(active_pokemon.attached_energy)} energy attached")
         
         # Discard energy cards (retreat cost)
+        # Note: In a full implementation, we would find the actual energy card instances
+        # and move them to discard. For now, we just remove them from attached_energy.
         if retreat_cost > 0:
-            energy_to_discard_uids = active_pokemon.attached_energy[:retreat_cost]
-            
-            # Remove energy from attached list
-            for energy_uid in energy_to_discard_uids:
-                if energy_uid in active_pokemon.attached_energy:
-                    active_pokemon.attached_energy.remove(energy_uid)
-            
-            # Log the energy discard
-            # Note: In a full implementation, we would find the actual energy card instances
-            # and move them to discard. For now, we just remove from attached_energy list.
-            self.tools.discard(actor_id, [], f"Retreat cost: {retreat_cost} energy discarded")
+            self.tools.detach_energy(active_pokemon.uid, retreat_cost)
         
         # Track retreat usage
         self.tools.track_usage(actor_id, "retreat", "switch_pokemon", scope="turn")
@@ -669,32 +685,12 @@ class RefereeAgent:
             raise ValueError("evolve_pokemon requires 'evolution_card_id' parameter. Provide the UID of the evolution card in your hand.")
         
         # Find base card (in active or bench)
-        base_card = None
-        active = self.state.players[actor_id].zone(Zone.ACTIVE)
-        bench = self.state.players[actor_id].zone(Zone.BENCH)
-        
-        for card in active.cards:
-            if card.uid == base_card_id:
-                base_card = card
-                break
-        
-        if base_card is None:
-            for card in bench.cards:
-                if card.uid == base_card_id:
-                    base_card = card
-                    break
-        
+        base_card = self.state.find_card(base_card_id, zones=(Zone.ACTIVE, Zone.BENCH), player_id=actor_id)
         if base_card is None:
             raise ValueError(f"Base card {base_card_id} not found in active or bench")
         
         # Find evolution card in hand
-        hand = self.state.players[actor_id].zone(Zone.HAND)
-        evolution_card = None
-        for card in hand.cards:
-            if card.uid == evolution_card_id:
-                evolution_card = card
-                break
-        
+        evolution_card = self.state.find_card(evolution_card_id, zones=(Zone.HAND,), player_id=actor_id)
         if evolution_card is None:
             raise ValueError(f"Evolution card {evolution_card_id} not found in hand")
         
@@ -768,6 +764,112 @@ class RefereeAgent:
         
         return {"success": True, "message": f"Energy attached to Pokémon {pokemon_id}"}
 
+    # ------------------------------------------------------------------
+    # legal action generation
+    # ------------------------------------------------------------------
+    def legal_actions(self, player_id: str) -> List[OperationRequest]:
+        """List the requests ``player_id`` can legally make right now.
+
+        Applies the same checks as the ``_handle_*`` methods (turn order,
+        once-per-turn limits, first-turn restrictions, evolution stages,
+        retreat cost, attack energy, and the ability limits of
+        :func:`~ptcg_ai.card_effects.ability_unavailable`) directly on the
+        indexed state, without mutating it or touching the database. Where a handler is lax the game
+        rules apply (only Basic Pokémon go to a non-full Bench). Trainer
+        effects are not simulated, so a listed ``play_trainer`` can still fail
+        inside its effect. Bookkeeping actions (``draw``, ``take_prize`` …)
+        are not listed.
+        """
+        state = self.state
+        player_ids = list(state.players.keys())
+        # Before the first action the starting player is not determined yet;
+        # _ensure_turn would pick the first player on turn 1.
+        turn_player = state.turn_player or player_ids[0]
+        turn_number = state.turn_number if state.turn_player is not None else 1
+        if player_id != turn_player:
+            return []
+        first_turn_first_player = turn_number == 1 and player_id == player_ids[0]
+
+        player = state.players[player_id]
+        hand = player.zone(Zone.HAND).cards
+        active = player.zone(Zone.ACTIVE).cards
+        bench = player.zone(Zone.BENCH).cards
+        in_play = list(active) + list(bench)
+        opponent_id = next((pid for pid in player_ids if pid != player_id), None)
+        opponent_active = state.players[opponent_id].zone(Zone.ACTIVE).cards if opponent_id else []
+
+        energy_attached = player.get_usage_count("energy_attachment", "attach_energy") > 0
+        supporter_played = player.get_usage_count("supporter", "play_trainer") > 0
+        stadium_played = player.get_usage_count("stadium", "play_trainer") > 0
+        stadiums_in_play = {card.definition.name for card in player.zone(Zone.STADIUM).cards}
+
+        actions: List[OperationRequest] = []
+        bench_space = len(bench) < MAX_BENCH_SIZE
+        for card in hand:
+            definition = card.definition
+            if definition.card_type == "Pokemon":
+                if definition.stage == "Basic":
+                    if bench_space:
+                        actions.append(OperationRequest(player_id, "move_to_bench", {"card_id": card.uid}))
+                elif not first_turn_first_player:
+                    base_stage = {"Stage 1": "Basic", "Stage 2": "Stage 1"}.get(definition.stage)
+                    for pokemon in in_play:
+                        # A Basic placed on turn 1 cannot evolve yet (see _handle_evolve_pokemon)
+                        if pokemon.definition.stage == base_stage and not (turn_number == 1 and base_stage == "Basic"):
+                            actions.append(
+                                OperationRequest(
+                                    player_id,
+                                    "evolve_pokemon",
+                                    {"base_card_id": pokemon.uid, "evolution_card_id": card.uid},
+                                )
+                            )
+            elif definition.card_type == "Energy":
+                if not energy_attached:
+                    for pokemon in in_play:
+                        actions.append(
+                            OperationRequest(
+                                player_id, "attach_energy", {"energy_card_id": card.uid, "pokemon_id": pokemon.uid}
+                            )
+                        )
+            elif definition.card_type == "Trainer":
+                subtypes = definition.subtypes or []
+                if "Supporter" in subtypes and (supporter_played or first_turn_first_player):
+                    continue
+                if "Stadium" in subtypes and (stadium_played or definition.name in stadiums_in_play):
+                    continue
+                actions.append(OperationRequest(player_id, "play_trainer", {"card_id": card.uid}))
+
+        for pokemon in in_play:
+            for ability in pokemon.definition.abilities or []:
+                if self._is_passive_ability(ability) or ability_unavailable(state, player_id, pokemon, ability):
+                    continue
+                actions.append(
+                    OperationRequest(
+                        player_id, "use_ability", {"card_id": pokemon.uid, "ability_name": ability.get("name")}
+                    )
+                )
+
+        if active and bench and player.get_usage_count("retreat", "switch_pokemon") == 0:
+            retreating = active[0]
+            conditions = retreating.special_conditions
+            if (
+                "Asleep" not in conditions
+                and "Paralyzed" not in conditions
+                and len(retreating.attached_energy) >= self._get_retreat_cost(retreating)
+            ):
+                for pokemon in bench:
+                    actions.append(OperationRequest(player_id, "switch_pokemon", {"bench_card_id": pokemon.uid}))
+
+        if active and not first_turn_first_player:
+            attacker = active[0]
+            for attack in attacker.definition.attacks or []:
+                if self._check_energy_requirements(attacker, attack):
+                    payload = {"card_id": attacker.uid, "attack_name": attack.get("name")}
+                    if opponent_active:
+                        payload["target_pokemon_id"] = opponent_active[0].uid
+                    actions.append(OperationRequest(player_id, "use_attack", payload))
+        return actions
+
     # ------------------------------------------------------------------
     # helper functions
     # ------------------------------------------------------------------
@@ -784,9 +886,11 @@ class RefereeAgent:
         # Simple: use first player in players dict
         # In a real game, this would be determined by coin flip
         player_ids = list(self.state.players.keys())
+        self.tools.journal.touch_header()
         self.state.turn_player = player_ids[0]
         self.state.turn_number = 1
         self.state.phase = "draw"
+        self._log_turn("determine_starting_player")
     
     def start_turn(self, player_id: str) -> Dict[str, object]:
         """Start a new turn for a player.
@@ -799,13 +903,17 @@ class RefereeAgent:
         if self.state.turn_player != player_id:
             raise RuntimeError(f"Cannot start turn for {player_id} (current turn: {self.state.turn_player})")
         
+        self._log_turn("start_turn")
+        
         # Draw card at start of turn
         drawn = self.tools.draw(player_id, 1)
         
         # Reset turn-scoped usage trackers
+        self.tools.journal.touch_player(player_id)
         self.state.players[player_id].reset_turn_usage()
         
         # Set phase to main
+        self.tools.journal.touch_header()
         self.state.phase = "main"
         
         return {
@@ -825,11 +933,14 @@ class RefereeAgent:
         next_index = (current_index + 1) % len(player_ids)
         next_player = player_ids[next_index]
         
+        self.tools.journal.touch_header()
         self.state.turn_player = next_player
         if next_index == 0:  # Wrapped around - new round
             self.state.turn_number += 1
         
         self.state.phase = "draw"
+        self._log_turn("end_turn")
+        self.database.flush_logs()
         
         return {
             "success": True,
@@ -868,13 +979,26 @@ class RefereeAgent:
         
         return None
 
+    def _log_turn(self, action: str) -> None:
+        """Record turn bookkeeping so replays can rebuild the turn header and seek by turn."""
+        self.tools._log(
+            actor=self.referee_id,
+            action=action,
+            payload={
+                "turn_player": self.state.turn_player,
+                "turn_number": self.state.turn_number,
+                "phase": self.state.phase,
+            },
+        )
+
     def _locate_cards(self, player_id: str, zone: Zone, card_ids: Iterable[str]) -> List[CardInstance]:
-        zone_state = self.state.players[player_id].zone(zone)
-        lookup = {card.uid: card for card in zone_state.cards}
-        try:
-            return [lookup[card_id] for card_id in card_ids]
-        except KeyError as exc:
-            raise ValueError(f"Card {exc.args[0]} not present in {zone.value}") from exc
+        cards: List[CardInstance] = []
+        for card_id in card_ids:
+            card = self.state.find_card(card_id, zones=(zone,), player_id=player_id)
+            if card is None:
+                raise ValueError(f"Card {card_id} not present in {zone.value}")
+            cards.append(card)
+        return cards
     
     def _is_first_turn_first_player(self, player_id: str) -> bool:
         """Check if this is the first turn of the first player.
@@ -891,6 +1015,24 @@ class RefereeAgent:
         player_ids = list(self.state.players.keys())
         return player_id == player_ids[0]
     
+    @staticmethod
+    def _is_passive_ability(ability: Dict[str, object]) -> bool:
+        """Guess from its text whether an ability is always on rather than activated."""
+        ability_text = str(ability.get("text", "")).lower()
+        
+        # Passive ability indicators:
+        # - "Prevent" (e.g., "Prevent all damage")
+        # - "As long as" (e.g., "As long as this Pokémon is in the Active Spot")
+        # - "Whenever" (e.g., "Whenever...")
+        # - No activation keywords like "Once during your turn", "You may"
+        return (
+            "prevent" in ability_text or
+            "as long as" in ability_text or
+            "whenever" in ability_text or
+            ("once during your turn" not in ability_text and "you may" not in ability_text and 
+             "search" not in ability_text and "draw" not in ability_text and "discard" not in ability_text)
+        )
+    
     def _check_energy_requirements(self, pokemon: CardInstance, attack: Dict[str, object]) -> bool:
         """Check if Pokémon has enough energy attached to use the attack.
         
@@ -914,7 +1056,7 @@ class RefereeAgent:
         # A full implementation would check energy types
         # Cost is typically a list like ["Fire", "Colorless", "Colorless"]
         # where Colorless means any energy type
-        if isinstance(cost, list):
+        if isinstance(cost, (list, tuple)):
             required_count = len(cost)
             return attached_count >= required_count
         elif isinstance(cost, (int, str)):
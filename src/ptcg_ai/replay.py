@@ -0,0 +1,359 @@
+"""Rebuild a match from its ``match_logs`` entries.
+
+The referee logs a ``match_init`` entry holding the unshuffled decks (see
+:func:`ptcg_ai.snapshot.state_to_dict`), every atomic :class:`GameTools`
+operation and the turn bookkeeping (``start_turn`` / ``end_turn``). Replaying
+re-applies those entries through a fresh :class:`GameTools`, feeding recorded
+seeds back into ``shuffle`` and ``random_discard``. Draws and prize takes are
+checked against the logged uids so a divergent replay fails loudly.
+
+Encoded snapshots are kept every ``checkpoint_interval`` entries so seeking
+backwards (or to a later turn) does not restart from the first entry.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .database import DatabaseClient
+from .game_tools import GameTools, ToolCallContext
+from .models import CardInstance, GameLogEntry, GameState, Zone
+from .rng import MatchRng
+from .snapshot import decode_state, encode_state, state_from_dict
+
+
+class ReplayError(RuntimeError):
+    """Raised when the log cannot be replayed faithfully."""
+
+
+@dataclass
+class ReplayFrame:
+    """State after applying the entry at ``position`` (``-1`` = base state)."""
+
+    position: int
+    entry: Optional[GameLogEntry]
+    state: GameState
+
+
+# Entries that do not change the state.
+_NO_OP_ACTIONS = frozenset({"match_init", "rng_init", "zone_snapshot", "reveal_prize"})
+
+
+class ReplayEngine:
+    """Deterministically re-applies a match log."""
+
+    def __init__(self, logs: Sequence[GameLogEntry], checkpoint_interval: int = 100) -> None:
+        self.logs = list(logs)
+        self.checkpoint_interval = checkpoint_interval
+        init = next((entry for entry in self.logs if entry.action == "match_init"), None)
+        if init is None:
+            raise ReplayError("Log has no match_init entry; the match predates log replay support")
+        rng_init = next((entry for entry in self.logs if entry.action == "rng_init"), None)
+        self._match_rng = MatchRng(rng_init.payload["master_seed"]) if rng_init else None
+        self._base = init.payload
+        self._checkpoints: Dict[int, bytes] = {}
+        self._checkpoint_positions: List[int] = []
+        self._turn_starts = [
+            (position, entry.payload["turn_number"], entry.payload["turn_player"])
+            for position, entry in enumerate(self.logs)
+            if entry.action == "start_turn"
+        ]
+        self._handlers: Dict[str, Callable[[GameLogEntry], None]] = {
+            "shuffle": self._shuffle,
+            "draw": self._draw,
+            "move_card": self._move_card,
+            "discard": self._discard,
+            "take_prize": self._take_prize,
+            "random_discard": self._random_discard,
+            "swap_active_with_bench": self._swap_active_with_bench,
+            "shuffle_hand_into_deck": self._shuffle_hand_into_deck,
+            "evolve_pokemon": self._evolve_pokemon,
+            "update_damage": self._update_damage,
+            "check_ko": self._check_ko,
+            "attach_energy": self._attach_energy,
+            "detach_energy": self._detach_energy,
+            "track_usage": self._track_usage,
+            "send_to_lost_zone": self._send_to_lost_zone,
+            "modify_prize_delta": self._modify_prize_delta,
+            "set_special_condition": self._set_special_condition,
+            "remove_special_condition": self._remove_special_condition,
+            "attach_energy_from_reveal": self._attach_energy_from_reveal,
+            "discard_stadium": self._discard_stadium,
+            "place_prizes": self._place_prizes,
+            "return_prizes_to_deck": self._return_prizes_to_deck,
+            "determine_starting_player": self._turn_header,
+            "start_turn": self._start_turn,
+            "end_turn": self._turn_header,
+        }
+        self._reset(state_from_dict(self._base), position=-1)
+        self._cards: Dict[str, CardInstance] = self._collect_cards(self.state)
+
+    # ------------------------------------------------------------------
+    # navigation
+    # ------------------------------------------------------------------
+    @property
+    def state(self) -> GameState:
+        return self.tools.state
+
+    def step(self) -> Optional[GameLogEntry]:
+        """Apply the next log entry; returns ``None`` at the end of the log."""
+
+        next_position = self.position + 1
+        if next_position >= len(self.logs):
+            return None
+        entry = self.logs[next_position]
+        if entry.action not in _NO_OP_ACTIONS:
+            handler = self._handlers.get(entry.action)
+            if handler is None:
+                raise ReplayError(f"Cannot replay log entry {next_position}: unknown action {entry.action!r}")
+            try:
+                handler(entry)
+            except ReplayError:
+                raise
+            except Exception as exc:
+                raise ReplayError(f"Replay diverged at entry {next_position} ({entry.action}): {exc}") from exc
+        self.position = next_position
+        if next_position % self.checkpoint_interval == 0 and next_position not in self._checkpoints:
+            self._checkpoints[next_position] = encode_state(self.state)
+            self._checkpoint_positions.insert(bisect_right(self._checkpoint_positions, next_position), next_position)
+        return entry
+
+    def seek(self, position: int) -> GameState:
+        """Return the state after the entry at ``position`` (``-1`` = before any entry)."""
+
+        if position >= len(self.logs):
+            raise ValueError(f"Position {position} is past the end of the log ({len(self.logs)} entries)")
+        if position < self.position:
+            index = bisect_right(self._checkpoint_positions, position) - 1
+            if index >= 0:
+                checkpoint = self._checkpoint_positions[index]
+                self._reset(decode_state(self._checkpoints[checkpoint]), checkpoint)
+            else:
+                self._reset(state_from_dict(self._base), position=-1)
+            self._cards.update(self._collect_cards(self.state))
+        while self.position < position:
+            self.step()
+        return self.state
+
+    def seek_turn(self, turn_number: int, player_id: Optional[str] = None) -> GameState:
+        """Return the state at the start of a turn, before its draw.
+
+        With two players each ``turn_number`` has two turns; ``player_id``
+        selects one (the first by default).
+        """
+
+        for position, number, turn_player in self._turn_starts:
+            if number == turn_number and (player_id is None or turn_player == player_id):
+                return self.seek(position - 1)
+        raise ValueError(f"Turn {turn_number} not found in log")
+
+    def iter_frames(self, from_turn: Optional[int] = None, to_turn: Optional[int] = None) -> Iterator[ReplayFrame]:
+        """Stream the state after every entry within the turn range.
+
+        The yielded ``state`` is the live replay state; copy or encode it
+        before advancing if it must be kept.
+        """
+
+        start = -1
+        if from_turn is not None:
+            starts = [position for position, number, _ in self._turn_starts if number >= from_turn]
+            if not starts:
+                return
+            start = starts[0] - 1
+        stop = len(self.logs) - 1
+        if to_turn is not None:
+            later = [position for position, number, _ in self._turn_starts if number > to_turn]
+            if later:
+                stop = later[0] - 1
+        self.seek(start)
+        yield ReplayFrame(self.position, self.logs[start] if start >= 0 else None, self.state)
+        while self.position < stop:
+            entry = self.step()
+            yield ReplayFrame(self.position, entry, self.state)
+
+    def iter_turns(self, from_turn: Optional[int] = None, to_turn: Optional[int] = None) -> Iterator[ReplayFrame]:
+        """Stream the state at the start of every turn within the range.
+
+        As with :meth:`iter_frames`, ``state`` is the live replay state.
+        """
+
+        for position, number, _ in self._turn_starts:
+            if (from_turn is not None and number < from_turn) or (to_turn is not None and number > to_turn):
+                continue
+            state = self.seek(position - 1)
+            yield ReplayFrame(position - 1, self.logs[position - 1] if position else None, state)
+
+    # ------------------------------------------------------------------
+    # internals
+    # ------------------------------------------------------------------
+    def _reset(self, state: GameState, position: int) -> None:
+        self.tools = GameTools(
+            context=ToolCallContext(match_id=state.match_id, referee_id="replay", db=DatabaseClient()),
+            state=state,
+        )
+        self.position = position
+
+    @staticmethod
+    def _collect_cards(state: GameState) -> Dict[str, CardInstance]:
+        return {
+            card.uid: card
+            for player in state.players.values()
+            for zone in player.zones.values()
+            for card in zone.cards
+        }
+
+    def _card(self, uid: str) -> CardInstance:
+        card = self.state.find_card(uid)
+        if card is not None:
+            return card
+        try:
+            return self._cards[uid]
+        except KeyError:
+            raise ReplayError(f"Unknown card {uid}") from None
+
+    def _with_seed(self, entry: GameLogEntry) -> None:
+        recorded = entry.random_seed
+        if isinstance(recorded, (bytes, memoryview)):
+            recorded = bytes(recorded).decode("ascii")
+        if recorded is None:
+            raise ReplayError(f"{entry.action} entry has no random seed")
+        if recorded.startswith("#"):
+            if self._match_rng is None:
+                raise ReplayError("Counter seed reference without an rng_init entry")
+            seed = f"{self._match_rng.resolve(recorded):032x}"
+        else:
+            seed = recorded
+        self.tools._rng = lambda: seed
+
+    @staticmethod
+    def _expect(entry: GameLogEntry, cards: Sequence[CardInstance]) -> None:
+        expected = entry.payload.get("cards")
+        actual = [card.uid for card in cards]
+        if expected is not None and list(expected) != actual:
+            raise ReplayError(f"{entry.action} produced {actual}, log recorded {list(expected)}")
+
+    # handlers -----------------------------------------------------------
+    def _shuffle(self, entry: GameLogEntry) -> None:
+        self._with_seed(entry)
+        self.tools.shuffle(entry.payload["player_id"], Zone(entry.payload["zone"]))
+
+    def _random_discard(self, entry: GameLogEntry) -> None:
+        self._with_seed(entry)
+        self._expect(entry, self.tools.random_discard(entry.payload["player_id"], entry.payload["count"]))
+
+    def _draw(self, entry: GameLogEntry) -> None:
+        self._expect(entry, self.tools.draw(entry.payload["player_id"], entry.payload["count"]))
+
+    def _take_prize(self, entry: GameLogEntry) -> None:
+        self._expect(entry, self.tools.take_prize(entry.payload["player_id"], entry.payload["count"]))
+
+    def _place_prizes(self, entry: GameLogEntry) -> None:
+        self._expect(entry, self.tools.place_prizes(entry.payload["player_id"], entry.payload["count"]))
+
+    def _return_prizes_to_deck(self, entry: GameLogEntry) -> None:
+        self._expect(entry, self.tools.return_prizes_to_deck(entry.payload["player_id"]))
+
+    def _move_card(self, entry: GameLogEntry) -> None:
+        payload = entry.payload
+        location = self.state.locate(payload["card"])
+        if location is None:
+            raise ReplayError(f"Card {payload['card']} is not in any zone")
+        card = self.state.players[location.player_id].zone(location.zone).cards[location.index]
+        self.tools.move_card(
+            location.player_id, Zone(payload["source"]), Zone(payload["target"]), card, payload.get("position_hint")
+        )
+
+    def _discard(self, entry: GameLogEntry) -> None:
+        payload = entry.payload
+        self.tools.discard(payload["player_id"], [self._card(uid) for uid in payload["cards"]], payload["reason"])
+
+    def _swap_active_with_bench(self, entry: GameLogEntry) -> None:
+        # The payload names the player whose Pokémon were swapped.
+        self.tools.swap_active_with_bench(entry.payload["player_id"], entry.payload["bench_card"])
+
+    def _shuffle_hand_into_deck(self, entry: GameLogEntry) -> None:
+        # The shuffle itself follows as its own entry.
+        player_id = entry.payload["player_id"]
+        player = self.state.players[player_id]
+        deck = player.zone(Zone.DECK)
+        start = len(deck.cards)
+        deck.cards.extend(player.zone(Zone.HAND).cards)
+        player.zone(Zone.HAND).cards.clear()
+        self.state.index_zone(player_id, Zone.DECK, start)
+
+    def _evolve_pokemon(self, entry: GameLogEntry) -> None:
+        payload = entry.payload
+        self.tools.evolve_pokemon(
+            payload["player_id"], payload["base_card"], payload["evolution_card"], payload.get("skip_stage1", False)
+        )
+
+    def _update_damage(self, entry: GameLogEntry) -> None:
+        self.tools.update_damage(entry.payload["pokemon_id"], entry.payload["delta"])
+
+    def _check_ko(self, entry: GameLogEntry) -> None:
+        # The prize was logged as its own take_prize entry; only the discard remains.
+        uid = entry.payload["pokemon_id"]
+        location = self.state.locate(uid)
+        if location is None or location.zone != Zone.ACTIVE:
+            return
+        owner = self.state.players[location.player_id]
+        card = owner.zone(Zone.ACTIVE).cards.pop(location.index)
+        discard = owner.zone(Zone.DISCARD)
+        discard.cards.append(card)
+        self.state.index_zone(location.player_id, Zone.ACTIVE)
+        self.state.index_zone(location.player_id, Zone.DISCARD, len(discard.cards) - 1)
+
+    def _attach_energy(self, entry: GameLogEntry) -> None:
+        self.tools.attach_energy(entry.payload["energy_card"], entry.payload["target_pokemon"])
+
+    def _detach_energy(self, entry: GameLogEntry) -> None:
+        detached = self.tools.detach_energy(entry.payload["pokemon_id"], len(entry.payload["energy_cards"]))
+        if detached != list(entry.payload["energy_cards"]):
+            raise ReplayError(f"detach_energy removed {detached}, log recorded {entry.payload['energy_cards']}")
+
+    def _track_usage(self, entry: GameLogEntry) -> None:
+        payload = entry.payload
+        self.tools.track_usage(payload["player_id"], payload["entity_id"], payload["counter_type"], payload["scope"])
+
+    def _send_to_lost_zone(self, entry: GameLogEntry) -> None:
+        self.tools.send_to_lost_zone(entry.payload["player_id"], entry.payload["card_id"])
+
+    def _modify_prize_delta(self, entry: GameLogEntry) -> None:
+        self.tools.modify_prize_delta(entry.payload["player_id"], entry.payload["delta"])
+
+    def _set_special_condition(self, entry: GameLogEntry) -> None:
+        self.tools.set_special_condition(entry.payload["pokemon_id"], entry.payload["condition"])
+
+    def _remove_special_condition(self, entry: GameLogEntry) -> None:
+        self.tools.remove_special_condition(entry.payload["pokemon_id"], entry.payload["condition"])
+
+    def _attach_energy_from_reveal(self, entry: GameLogEntry) -> None:
+        payload = entry.payload
+        self.tools.attach_energy_from_reveal(
+            payload["player_id"], [self._card(payload["energy_card"])], payload["target_pokemon"]
+        )
+
+    def _discard_stadium(self, entry: GameLogEntry) -> None:
+        self.tools.discard_stadium(entry.payload["player_id"])
+
+    def _turn_header(self, entry: GameLogEntry) -> None:
+        self.state.turn_player = entry.payload["turn_player"]
+        self.state.turn_number = entry.payload["turn_number"]
+        self.state.phase = entry.payload["phase"]
+
+    def _start_turn(self, entry: GameLogEntry) -> None:
+        self._turn_header(entry)
+        self.state.players[entry.payload["turn_player"]].reset_turn_usage()
+        self.state.phase = "main"
+
+
+def replay_match(logs: Sequence[GameLogEntry], checkpoint_interval: int = 100) -> Tuple[ReplayEngine, GameState]:
+    """Replay an entire log and return the engine plus the final state."""
+
+    engine = ReplayEngine(logs, checkpoint_interval=checkpoint_interval)
+    engine.seek(len(engine.logs) - 1)
+    return engine, engine.state
+
+
+__all__ = ["ReplayEngine", "ReplayError", "ReplayFrame", "replay_match"]
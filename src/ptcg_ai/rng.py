@@ -0,0 +1,66 @@
+"""Deterministic, counter-based random streams for reproducible matches."""
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional
+
+_COUNTER_REF = re.compile(r"^#(\d+)$")
+
+
+class MatchRng:
+    """Counter-based seed stream derived from a single master seed.
+
+    Draw ``n`` is ``blake2b(n, key=master_seed)``, so any draw can be
+    recomputed from ``(master_seed, n)`` without replaying earlier ones. An
+    instance is a drop-in ``GameTools._rng`` (calling it returns a 128-bit
+    hex seed), and :class:`~ptcg_ai.game_tools.GameTools` recognises it and
+    logs the short counter reference ``"#n"`` instead of the full seed.
+    """
+
+    __slots__ = ("master_seed", "counter", "_key")
+
+    def __init__(self, master_seed: int, counter: int = 0) -> None:
+        if master_seed < 0:
+            raise ValueError("master_seed must be non-negative")
+        self.master_seed = master_seed
+        self.counter = counter
+        self._key = master_seed.to_bytes(max(8, (master_seed.bit_length() + 7) // 8), "big")[-64:]
+
+    def seed_int(self, counter: int) -> int:
+        """Return the 128-bit seed of draw ``counter`` without advancing."""
+
+        digest = hashlib.blake2b(counter.to_bytes(8, "big"), key=self._key, digest_size=16).digest()
+        return int.from_bytes(digest, "big")
+
+    def next_int(self) -> int:
+        value = self.seed_int(self.counter)
+        self.counter += 1
+        return value
+
+    def __call__(self) -> str:
+        return f"{self.next_int():032x}"
+
+    def reference(self, counter: Optional[int] = None) -> str:
+        """Compact log reference for draw ``counter`` (the next draw by default)."""
+
+        return f"#{self.counter if counter is None else counter}"
+
+    def resolve(self, recorded: str) -> int:
+        """Turn a logged ``random_seed`` (``"#n"`` or hex) back into its integer seed."""
+
+        match = _COUNTER_REF.match(recorded)
+        if match:
+            return self.seed_int(int(match.group(1)))
+        return int(recorded, 16)
+
+    def fork(self) -> "MatchRng":
+        """Independent copy positioned at the same draw."""
+
+        return MatchRng(self.master_seed, self.counter)
+
+    def __repr__(self) -> str:
+        return f"MatchRng(master_seed={self.master_seed}, counter={self.counter})"
+
+
+__all__ = ["MatchRng"]
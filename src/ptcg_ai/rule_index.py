@@ -0,0 +1,204 @@
+"""Compiled on-disk rule index.
+
+Creating a match used to read ``doc/rulebook_extracted.txt``, regex-parse it
+into sections and build the BM25 index every time. The compiled artifact
+stores the parsed rule entries and the index postings as plain JSON data, so
+loading never imports or executes anything from the file.
+
+A fixed-size header records the artifact schema version, the SHA-256 of the
+source text and a hash of the code and parameters that build the index (the
+tokenizer and scorer in :mod:`ptcg_ai.search`, the rulebook parser and the
+BM25 defaults). The artifact is rebuilt when any of them differs, and written
+to a temporary file that is swapped in atomically like the card cache.
+
+:func:`default_rule_index` keeps one knowledge base per source file and
+process, so every match in a process shares it. Knowledge bases are
+read-only after construction, which makes sharing safe.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from . import rulebook, search
+from .rulebook import RuleEntry, RuleKnowledgeBase
+from .search import BM25Index
+
+RULE_INDEX_SCHEMA_VERSION = 2
+
+DEFAULT_INDEX_DIR = Path.home() / ".cache" / "ptcg_ai"
+
+_MAGIC = b"PTCGRULE"
+# magic, schema version (4 ASCII digits), source SHA-256 and build hash (64 hex digits each)
+_HEADER_SIZE = len(_MAGIC) + 4 + 64 + 64
+
+
+class RuleIndexError(RuntimeError):
+    """Raised when a rule index artifact cannot be read."""
+
+
+def rule_source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def index_build_hash() -> str:
+    """Hash of the code and parameters that turn rulebook text into an index."""
+
+    defaults = BM25Index()
+    digest = hashlib.sha256(f"k1={defaults.k1};b={defaults.b};".encode("utf-8"))
+    for source in (search, rulebook.RuleKnowledgeBase.from_text, rulebook.RuleKnowledgeBase.reindex):
+        try:
+            digest.update(inspect.getsource(source).encode("utf-8"))
+        except (OSError, TypeError):  # pragma: no cover - sources not shipped
+            code = getattr(source, "__code__", None)
+            digest.update(repr(code.co_code if code else source).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_rulebook_source(path: str | Path) -> str:
+    """Rulebook text exactly as :func:`~ptcg_ai.simulation.load_rulebook_text` reads it."""
+
+    return Path(path).read_text(encoding="utf-8", errors="ignore")
+
+
+def write_rule_index(path: str | Path, knowledge_base: RuleKnowledgeBase, source_hash: str) -> Path:
+    """Compile ``knowledge_base`` into an artifact at ``path``."""
+
+    if len(knowledge_base._index) != len(knowledge_base.rules):
+        knowledge_base.reindex()
+    payload = {
+        "rules": [[entry.section, entry.text] for entry in knowledge_base.rules.values()],
+        "index": knowledge_base._index.to_data(),
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(_MAGIC)
+        handle.write(f"{RULE_INDEX_SCHEMA_VERSION:04d}".encode("ascii"))
+        handle.write(source_hash.encode("ascii"))
+        handle.write(index_build_hash().encode("ascii"))
+        handle.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(header: bytes) -> Tuple[int, str, str]:
+    if len(header) < _HEADER_SIZE or header[: len(_MAGIC)] != _MAGIC:
+        raise RuleIndexError("Not a rule index artifact")
+    offset = len(_MAGIC)
+    version = int(header[offset : offset + 4])
+    source_hash = header[offset + 4 : offset + 68].decode("ascii")
+    return version, source_hash, header[offset + 68 : _HEADER_SIZE].decode("ascii")
+
+
+def read_rule_index(path: str | Path, source_hash: Optional[str] = None) -> Optional[RuleKnowledgeBase]:
+    """Load the artifact at ``path``.
+
+    Returns ``None`` when the file is missing, was written by another
+    schema version or other index-building code, or (if ``source_hash`` is
+    given) was built from other source text.
+    """
+
+    path = Path(path)
+    if not path.is_file():
+        return None
+    data = path.read_bytes()
+    try:
+        version, built_from, built_by = _read_header(data[:_HEADER_SIZE])
+    except ValueError as exc:
+        raise RuleIndexError(f"Corrupt rule index {path}: {exc}") from exc
+    if (
+        version != RULE_INDEX_SCHEMA_VERSION
+        or built_by != index_build_hash()
+        or (source_hash is not None and built_from != source_hash)
+    ):
+        return None
+    try:
+        payload = json.loads(data[_HEADER_SIZE:])
+        rules = {section: RuleEntry(section=section, text=text) for section, text in payload["rules"]}
+        index = BM25Index.from_data(payload["index"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise RuleIndexError(f"Corrupt rule index {path}: {exc}") from exc
+    if index.doc_ids != list(rules):
+        raise RuleIndexError(f"Corrupt rule index {path}: index does not match the rules")
+    return RuleKnowledgeBase.with_index(rules, index)
+
+
+def default_index_path(source_path: str | Path) -> Path:
+    """Artifact location for ``source_path`` (``PTCG_RULE_INDEX_DIR`` overrides the directory)."""
+
+    source_path = Path(source_path).resolve()
+    directory = Path(os.getenv("PTCG_RULE_INDEX_DIR", str(DEFAULT_INDEX_DIR)))
+    tag = hashlib.sha256(str(source_path).encode("utf-8")).hexdigest()[:12]
+    return directory / f"{source_path.stem}-{tag}.rules"
+
+
+def open_rule_index(source_path: str | Path, path: Optional[str | Path] = None) -> RuleKnowledgeBase:
+    """Load the knowledge base for ``source_path``, compiling the artifact if it is stale.
+
+    A corrupt or unwritable artifact is not fatal: the rulebook is parsed
+    from source and the artifact is rewritten when possible.
+    """
+
+    text = read_rulebook_source(source_path)
+    source_hash = rule_source_hash(text)
+    path = Path(path) if path is not None else default_index_path(source_path)
+    try:
+        knowledge_base = read_rule_index(path, source_hash)
+    except (RuleIndexError, OSError):
+        knowledge_base = None
+    if knowledge_base is None:
+        knowledge_base = RuleKnowledgeBase.from_text(text)
+        try:
+            write_rule_index(path, knowledge_base, source_hash)
+        except OSError:
+            pass
+    return knowledge_base
+
+
+_default_indexes: Dict[Tuple[int, Path], Tuple[Tuple[int, int], RuleKnowledgeBase]] = {}
+_default_lock = threading.Lock()
+
+
+def default_rule_index(source_path: str | Path) -> RuleKnowledgeBase:
+    """Process-wide knowledge base for ``source_path``, shared by every match.
+
+    The source is only re-read when its size or modification time changes.
+    Set ``PTCG_RULE_INDEX_DIR=off`` to parse the source without reading or
+    writing an artifact.
+    """
+
+    source_path = Path(source_path).resolve()
+    stat = source_path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (os.getpid(), source_path)
+    with _default_lock:
+        cached = _default_indexes.get(key)
+        if cached is None or cached[0] != version:
+            if os.getenv("PTCG_RULE_INDEX_DIR", "").lower() in {"0", "off", "false", "no"}:
+                knowledge_base = RuleKnowledgeBase.from_text(read_rulebook_source(source_path))
+            else:
+                knowledge_base = open_rule_index(source_path)
+            cached = _default_indexes[key] = (version, knowledge_base)
+    return cached[1]
+
+
+__all__ = [
+    "RULE_INDEX_SCHEMA_VERSION",
+    "RuleIndexError",
+    "default_index_path",
+    "default_rule_index",
+    "index_build_hash",
+    "open_rule_index",
+    "read_rule_index",
+    "rule_source_hash",
+    "write_rule_index",
+]
@@ -7,6 +7,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
+from .search import BM25Index
+
 
 @dataclass
 class RuleEntry:
@@ -23,9 +25,32 @@ class RuleKnowledgeBase:
     The class can ingest both structured JSON exports and plain text files. For
     the sake of the prototype we extract numbered sections from the official
     rulebook PDF that has been pre-processed into text elsewhere.
+
+    A BM25 index over the rule texts is built on construction and rebuilt
+    lazily if ``rules`` changes size; call :meth:`reindex` after editing an
+    entry in place.
     """
 
     rules: Dict[str, RuleEntry] = field(default_factory=dict)
+    _index: BM25Index = field(default_factory=BM25Index, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.reindex()
+
+    @classmethod
+    def with_index(cls, rules: Dict[str, RuleEntry], index: BM25Index) -> "RuleKnowledgeBase":
+        """Knowledge base over ``rules`` reusing ``index``, built from their texts in order."""
+
+        knowledge_base = cls()
+        knowledge_base.rules = rules
+        knowledge_base._index = index
+        return knowledge_base
+
+    def reindex(self) -> None:
+        index = BM25Index()
+        for section, entry in self.rules.items():
+            index.add(section, entry.text)
+        self._index = index
 
     # ------------------------------------------------------------------
     # ingestion helpers
@@ -52,15 +77,25 @@ class RuleKnowledgeBase:
     # query helpers
     # ------------------------------------------------------------------
     def find(self, query: str, limit: int = 5) -> List[RuleEntry]:
-        """Perform a naive substring search."""
-
+        """Return the ``limit`` rules most relevant to ``query`` (BM25-ranked).
+
+        Double-quoted parts of the query must appear as phrases. When nothing
+        matches a whole token (e.g. a word prefix), the substring scan used
+        before the index existed is tried instead.
+        """
+
+        if len(self._index) != len(self.rules):
+            self.reindex()
+        hits = self._index.search(query, limit=limit)
+        if hits:
+            return [self.rules[section] for _, section in hits]
         query_lower = query.lower()
         matches: List[RuleEntry] = []
         for entry in self.rules.values():
-            if query_lower in entry.text.lower():
-                matches.append(entry)
             if len(matches) >= limit:
                 break
+            if query_lower in entry.text.lower():
+                matches.append(entry)
         return matches
 
     def get(self, section: str) -> Optional[RuleEntry]:
@@ -0,0 +1,137 @@
+"""Inverted-index BM25 search used by :class:`~ptcg_ai.rulebook.RuleKnowledgeBase`.
+
+Text is case-folded and stripped of accents ("Pokémon" matches "pokemon").
+Latin words and numbers become one token each; runs of CJK characters are
+split into overlapping bigrams, so Chinese queries match without a word
+segmenter. Every posting keeps token positions, which lets a query mark
+phrases with double quotes (``retreat "active pokemon"``): documents must
+contain each phrase contiguously, and all terms contribute to the BM25
+score. The best ``limit`` documents are picked with a heap, ties broken by
+insertion order.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import unicodedata
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+_TOKEN = re.compile(r"[0-9a-z]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into search tokens (see the module docstring)."""
+
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    tokens: List[str] = []
+    for match in _TOKEN.finditer(folded):
+        word = match.group()
+        if word[0] <= "z" or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Return the scoring terms of ``query`` and its quoted phrases."""
+
+    phrases = [tokens for tokens in map(tokenize, _PHRASE.findall(query)) if len(tokens) > 1]
+    return tokenize(query.replace('"', " ")), phrases
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index with positional postings."""
+
+    __slots__ = ("k1", "b", "doc_ids", "doc_lengths", "postings", "_total_length")
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[Hashable] = []
+        self.doc_lengths: List[int] = []
+        # token -> {document number: positions of the token in that document}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def to_data(self) -> Dict[str, Any]:
+        """Plain (JSON-serialisable) form of the index; postings as ``[doc, positions]`` pairs."""
+
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_ids": list(self.doc_ids),
+            "doc_lengths": list(self.doc_lengths),
+            "postings": {
+                token: [[doc, positions] for doc, positions in docs.items()]
+                for token, docs in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "BM25Index":
+        """Rebuild an index from :meth:`to_data` output."""
+
+        index = cls(k1=data["k1"], b=data["b"])
+        index.doc_ids = list(data["doc_ids"])
+        index.doc_lengths = list(data["doc_lengths"])
+        index.postings = {
+            token: {doc: positions for doc, positions in docs} for token, docs in data["postings"].items()
+        }
+        index._total_length = sum(index.doc_lengths)
+        return index
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        doc = len(self.doc_ids)
+        tokens = tokenize(text)
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        for position, token in enumerate(tokens):
+            self.postings.setdefault(token, {}).setdefault(doc, []).append(position)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, Hashable]]:
+        """Return up to ``limit`` ``(score, doc_id)`` pairs, best first."""
+
+        terms, phrases = parse_query(query)
+        if not terms or limit <= 0:
+            return []
+        count = len(self.doc_ids)
+        average_length = self._total_length / count if count else 0.0
+        k1, b = self.k1, self.b
+        lengths = self.doc_lengths
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            frequency = len(postings)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for doc, positions in postings.items():
+                tf = len(positions)
+                norm = k1 * (1 - b + b * lengths[doc] / average_length) if average_length else k1
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        if phrases:
+            scores = {doc: score for doc, score in scores.items() if all(self._has_phrase(doc, p) for p in phrases)}
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, self.doc_ids[doc]) for doc, score in best]
+
+    def _has_phrase(self, doc: int, phrase: Sequence[str]) -> bool:
+        starts = set(self.postings.get(phrase[0], {}).get(doc, ()))
+        for offset, token in enumerate(phrase[1:], start=1):
+            if not starts:
+                return False
+            positions = self.postings.get(token, {}).get(doc)
+            if not positions:
+                return False
+            starts.intersection_update(position - offset for position in positions)
+        return bool(starts)
+
+
+__all__ = ["BM25Index", "parse_query", "tokenize"]
@@ -1,14 +1,18 @@
 """Utility helpers to wire together agents for a simple simulation."""
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from .card_cache import CardCache, default_card_cache
 from .card_loader import _map_card_fields
+from .card_registry import intern_definition
 from .database import build_postgres_dsn
 from .models import CardDefinition, CardInstance, Deck, Zone
 from .player import PlayerAgent
 from .referee import RefereeAgent
+from .rule_index import default_rule_index
 from .rulebook import RuleKnowledgeBase
 
 try:  # pragma: no cover - optional dependency
@@ -17,15 +21,24 @@ except Exception:  # pragma: no cover - optional dependency
     psycopg = None  # type: ignore
 
 
-def build_deck(owner_id: str, deck_file: str | Path, dsn: Optional[str] = None) -> Deck:
+def build_deck(
+    owner_id: str,
+    deck_file: str | Path,
+    dsn: Optional[str] = None,
+    card_cache: Optional[CardCache] = None,
+) -> Deck:
     """Build a 60-card deck for ``owner_id`` using a text list similar to ``deck1.txt``.
     
-    Card data is loaded from PostgreSQL ptcg_cards table using set_code (ptcgo_code) and number.
+    Card data is looked up by set_code (ptcgo_code) and number in the local card
+    cache (see :mod:`ptcg_ai.card_cache`), which mirrors the PostgreSQL ptcg_cards
+    table. With the cache disabled (``PTCG_CARD_CACHE=off``) cards are queried from
+    PostgreSQL directly.
     
     Args:
         owner_id: Identifier for the deck owner.
         deck_file: Path to the deck file.
         dsn: Optional PostgreSQL connection string. If not provided, uses build_postgres_dsn().
+        card_cache: Optional card cache. Defaults to the process-wide cache.
     
     Returns:
         A validated Deck instance with 60 cards.
@@ -36,20 +49,10 @@ def build_deck(owner_id: str, deck_file: str | Path, dsn: Optional[str] = None)
         RuntimeError: If database connection fails or psycopg is not available.
     """
 
-    if psycopg is None:
-        raise RuntimeError(
-            "psycopg is required to load card data from PostgreSQL. "
-            "Install it with: pip install 'psycopg[binary]'"
-        )
-
     path = Path(deck_file)
     if not path.is_file():
         raise FileNotFoundError(f"Deck file not found: {path}")
 
-    # Build connection string
-    if dsn is None:
-        dsn = build_postgres_dsn()
-
     # Parse deck file to collect card requirements
     # (count, set_code, number, card_name, line_number, original_line)
     card_requirements: List[tuple[int, str, str, str, int, str]] = []
@@ -87,144 +90,207 @@ def build_deck(owner_id: str, deck_file: str | Path, dsn: Optional[str] = None)
         card_name = " ".join(parts[1:-2]) if len(parts) > 3 else "Unknown"
         card_requirements.append((count, set_code, number, card_name, line_num, line))
 
-    # Connect to database and query cards
-    try:
-        conn = psycopg.connect(dsn)
-    except Exception as exc:
-        raise RuntimeError(f"Failed to connect to PostgreSQL: {exc}") from exc
-
     cards: List[CardInstance] = []
-    card_definitions: Dict[tuple[str, str], CardDefinition] = {}
     failed_cards: List[Dict[str, object]] = []
-    
+    keys = [(set_code, number) for _, set_code, number, _, _, _ in card_requirements]
+
+    if card_cache is None:
+        card_cache = default_card_cache(dsn)
+
+    # Resolve every distinct card up front: one cache lookup, or one bulk
+    # query plus one set-join fallback query for misses when uncached.
+    conn = None
     try:
+        if card_cache is not None:
+            card_definitions = card_cache.get_many(keys)
+            find_similar = card_cache.similar
+        else:
+            conn = _connect_postgres(dsn)
+            card_definitions = _fetch_postgres_definitions(conn, keys)
+            find_similar = partial(_postgres_similar_cards, conn)
+        # Share one immutable definition per card across every deck and match
+        card_definitions = {key: intern_definition(definition) for key, definition in card_definitions.items()}
 
-        with conn.cursor() as cur:
-            for count, set_code, number, card_name, line_num, original_line in card_requirements:
-                # Check cache first
-                key = (set_code, number)
-                if key not in card_definitions:
-                    # Try direct query first (backward compatible)
-                    cur.execute(
-                        """
-                        SELECT name, supertype, subtypes, hp, rules, set_ptcgo_code, number,
-                               abilities, attacks
-                        FROM ptcg_cards
-                        WHERE set_ptcgo_code = %s AND number = %s
-                        LIMIT 1
-                        """,
-                        (set_code, number),
-                    )
-                    row = cur.fetchone()
-
-                    # Fallback: if direct query fails, try joining with ptcg_sets table
-                    # This handles cases where set_ptcgo_code is NULL in ptcg_cards
-                    if row is None:
-                        cur.execute(
-                            """
-                            SELECT c.name, c.supertype, c.subtypes, c.hp, c.rules,
-                                   COALESCE(c.set_ptcgo_code, s.ptcgo_code) as set_ptcgo_code,
-                                   c.number, c.abilities, c.attacks
-                            FROM ptcg_cards c
-                            LEFT JOIN ptcg_sets s ON c.set_id = s.id
-                            WHERE s.ptcgo_code = %s AND c.number = %s
-                            LIMIT 1
-                            """,
-                            (set_code, number),
-                        )
-                        row = cur.fetchone()
-
-                    if row is None:
-                        error_info = {
-                            "card_name": card_name,
-                            "set_code": set_code,
-                            "number": number,
-                            "count": count,
-                            "line_number": line_num,
-                            "original_line": original_line,
-                            "error": "Card not found in database"
-                        }
-                        failed_cards.append(error_info)
-                        # Try to find similar cards for better error message
-                        cur.execute(
-                            """
-                            SELECT name, set_ptcgo_code, number
-                            FROM ptcg_cards
-                            WHERE number = %s
-                            LIMIT 5
-                            """,
-                            (number,),
-                        )
-                        similar_cards = cur.fetchall()
-                        
-                        error_msg = (
-                            f"Card not found in database:\n"
-                            f"  Location: @{path.name} ({line_num})\n"
-                            f"  Card name (from deck file): {card_name}\n"
-                            f"  Set code: {set_code}\n"
-                            f"  Number: {number}\n"
-                            f"  Count requested: {count}\n"
-                            f"  Original line: {original_line}"
-                        )
-                        if similar_cards:
-                            error_msg += f"\n  Similar cards found with number {number}:"
-                            for sim_name, sim_set, sim_num in similar_cards:
-                                error_msg += f"\n    - {sim_name} ({sim_set} {sim_num})"
-                        else:
-                            cur.execute(
-                                """
-                                SELECT name, set_ptcgo_code, number
-                                FROM ptcg_cards
-                                WHERE set_ptcgo_code = %s
-                                LIMIT 5
-                                """,
-                                (set_code,),
-                            )
-                            same_set_cards = cur.fetchall()
-                            if same_set_cards:
-                                error_msg += f"\n  Cards found in set {set_code}:"
-                                for sim_name, sim_set, sim_num in same_set_cards:
-                                    error_msg += f"\n    - {sim_name} ({sim_set} {sim_num})"
-                        
-                        parse_errors.append(error_msg)
-                        raise ValueError(error_msg)
-
-                    (
-                        db_name,
-                        db_supertype,
-                        db_subtypes,
-                        db_hp,
-                        db_rules,
-                        db_set_code,
-                        db_number,
-                        db_abilities,
-                        db_attacks,
-                    ) = row
-
-                    # Use helper function to map all fields
-                    definition = _map_card_fields(
-                        db_name=db_name,
-                        db_supertype=db_supertype,
-                        db_subtypes=db_subtypes,
-                        db_hp=db_hp,
-                        db_rules=db_rules,
-                        db_set_code=db_set_code or set_code,
-                        db_number=db_number or number,
-                        db_abilities=db_abilities,
-                        db_attacks=db_attacks,
-                    )
-                    card_definitions[key] = definition
-
-                definition = card_definitions[key]
-
-                # Create card instances
-                for _ in range(count):
-                    uid = f"{owner_id}-deck-{len(cards) + 1:03d}"
-                    cards.append(CardInstance(uid=uid, owner_id=owner_id, definition=definition))
+        for count, set_code, number, card_name, line_num, original_line in card_requirements:
+            definition = card_definitions.get((set_code, number))
+            if definition is None:
+                failed_cards.append(
+                    {
+                        "card_name": card_name,
+                        "set_code": set_code,
+                        "number": number,
+                        "count": count,
+                        "line_number": line_num,
+                        "original_line": original_line,
+                        "error": "Card not found in database",
+                    }
+                )
+                # Try to find similar cards for better error message
+                similar_cards = find_similar(set_code, number)
+                error_msg = _card_not_found_message(path, card_name, set_code, number, count, line_num, original_line)
+                if similar_cards and similar_cards[0][2] == number:
+                    error_msg += f"\n  Similar cards found with number {number}:"
+                elif similar_cards:
+                    error_msg += f"\n  Cards found in set {set_code}:"
+                for sim_name, sim_set, sim_num in similar_cards:
+                    error_msg += f"\n    - {sim_name} ({sim_set} {sim_num})"
+                parse_errors.append(error_msg)
+                raise ValueError(error_msg)
 
+            # Create card instances
+            for _ in range(count):
+                uid = f"{owner_id}-deck-{len(cards) + 1:03d}"
+                cards.append(CardInstance(uid=uid, owner_id=owner_id, definition=definition))
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
+
+    return _validated_deck(owner_id, path, card_requirements, cards, failed_cards, parse_errors)
+
+
+def _card_not_found_message(
+    path: Path, card_name: str, set_code: str, number: str, count: int, line_num: int, original_line: str
+) -> str:
+    return (
+        f"Card not found in database:\n"
+        f"  Location: @{path.name} ({line_num})\n"
+        f"  Card name (from deck file): {card_name}\n"
+        f"  Set code: {set_code}\n"
+        f"  Number: {number}\n"
+        f"  Count requested: {count}\n"
+        f"  Original line: {original_line}"
+    )
 
+
+_CARD_COLUMNS = "name, supertype, subtypes, hp, rules, set_ptcgo_code, number, abilities, attacks"
+
+
+def _connect_postgres(dsn: Optional[str]):
+    if psycopg is None:
+        raise RuntimeError(
+            "psycopg is required to load card data from PostgreSQL. "
+            "Install it with: pip install 'psycopg[binary]'"
+        )
+
+    # Build connection string
+    if dsn is None:
+        dsn = build_postgres_dsn()
+
+    try:
+        return psycopg.connect(dsn)
+    except Exception as exc:
+        raise RuntimeError(f"Failed to connect to PostgreSQL: {exc}") from exc
+
+
+def _fetch_postgres_definitions(conn, keys: List[tuple[str, str]]) -> Dict[tuple[str, str], CardDefinition]:
+    """Resolve ``(set_code, number)`` keys in at most two queries.
+
+    The first matches ``ptcg_cards.set_ptcgo_code`` directly; the second
+    retries the misses through ``ptcg_sets`` for rows whose
+    ``set_ptcgo_code`` is NULL. ``DISTINCT ON`` keeps one row per key, like
+    the ``LIMIT 1`` per-line lookups it replaces.
+    """
+
+    definitions: Dict[tuple[str, str], CardDefinition] = {}
+    wanted = list(dict.fromkeys(keys))
+    with conn.cursor() as cur:
+        if wanted:
+            cur.execute(
+                f"""
+                SELECT DISTINCT ON (set_ptcgo_code, number)
+                       set_ptcgo_code, number, {_CARD_COLUMNS}
+                FROM ptcg_cards
+                WHERE (set_ptcgo_code, number) IN ({", ".join(["(%s, %s)"] * len(wanted))})
+                """,
+                [value for key in wanted for value in key],
+            )
+            for requested_set, requested_number, *row in cur.fetchall():
+                definitions[(requested_set, requested_number)] = _definition_from_row(row, requested_set, requested_number)
+
+        # Fallback: join with ptcg_sets for cards whose set_ptcgo_code is NULL
+        missing = [key for key in wanted if key not in definitions]
+        if missing:
+            cur.execute(
+                f"""
+                SELECT DISTINCT ON (s.ptcgo_code, c.number)
+                       s.ptcgo_code, c.number,
+                       c.name, c.supertype, c.subtypes, c.hp, c.rules,
+                       COALESCE(c.set_ptcgo_code, s.ptcgo_code) AS set_ptcgo_code,
+                       c.number, c.abilities, c.attacks
+                FROM ptcg_cards c
+                LEFT JOIN ptcg_sets s ON c.set_id = s.id
+                WHERE (s.ptcgo_code, c.number) IN ({", ".join(["(%s, %s)"] * len(missing))})
+                """,
+                [value for key in missing for value in key],
+            )
+            for requested_set, requested_number, *row in cur.fetchall():
+                definitions[(requested_set, requested_number)] = _definition_from_row(row, requested_set, requested_number)
+    return definitions
+
+
+def _definition_from_row(row, set_code: str, number: str) -> CardDefinition:
+    (
+        db_name,
+        db_supertype,
+        db_subtypes,
+        db_hp,
+        db_rules,
+        db_set_code,
+        db_number,
+        db_abilities,
+        db_attacks,
+    ) = row
+
+    # Use helper function to map all fields
+    return _map_card_fields(
+        db_name=db_name,
+        db_supertype=db_supertype,
+        db_subtypes=db_subtypes,
+        db_hp=db_hp,
+        db_rules=db_rules,
+        db_set_code=db_set_code or set_code,
+        db_number=db_number or number,
+        db_abilities=db_abilities,
+        db_attacks=db_attacks,
+    )
+
+
+def _postgres_similar_cards(conn, set_code: str, number: str) -> List[tuple[str, str, str]]:  # pragma: no cover
+    """Cards sharing ``number``, otherwise cards from ``set_code`` (error hints only)."""
+
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT name, set_ptcgo_code, number
+            FROM ptcg_cards
+            WHERE number = %s
+            LIMIT 5
+            """,
+            (number,),
+        )
+        similar_cards = cur.fetchall()
+        if not similar_cards:
+            cur.execute(
+                """
+                SELECT name, set_ptcgo_code, number
+                FROM ptcg_cards
+                WHERE set_ptcgo_code = %s
+                LIMIT 5
+                """,
+                (set_code,),
+            )
+            similar_cards = cur.fetchall()
+    return similar_cards
+
+
+def _validated_deck(
+    owner_id: str,
+    path: Path,
+    card_requirements: List[tuple[int, str, str, str, int, str]],
+    cards: List[CardInstance],
+    failed_cards: List[Dict[str, object]],
+    parse_errors: List[str],
+) -> Deck:
     # Collect statistics before validation
     total_requested = sum(count for count, _, _, _, _, _ in card_requirements)
     total_loaded = len(cards)
@@ -303,8 +369,9 @@ def build_deck(owner_id: str, deck_file: str | Path, dsn: Optional[str] = None)
 
 
 def load_rulebook_text(path: Path) -> RuleKnowledgeBase:
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    return RuleKnowledgeBase.from_text(text)
+    """Process-wide knowledge base for ``path``, backed by the compiled rule index."""
+
+    return default_rule_index(path)
 
 
 def run_turn(referee: RefereeAgent, players: Dict[str, PlayerAgent]) -> None:
@@ -0,0 +1,189 @@
+"""Versioned binary snapshot/restore for :class:`~ptcg_ai.models.GameState`.
+
+Unlike :meth:`GameState.snapshot`, which only lists uids per zone, the format
+here round-trips everything the referee needs to resume a match: card damage,
+attached energy, special conditions, prizes, player memory, usage trackers and
+the turn header. Each distinct :class:`CardDefinition` is stored once in a
+table and referenced by index from its instances.
+
+Layout: ``MAGIC | format version (1 byte) | codec (1 byte) | body``. The body
+is msgpack when available and zlib-compressed compact JSON otherwise; both
+decode on any install that has the codec used to write them.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Dict, List, Optional
+
+from .card_registry import intern_definition
+from .models import CardDefinition, CardInstance, GameState, PlayerState, Zone, ZoneState
+
+try:  # pragma: no cover - optional dependency
+    import msgpack
+except Exception:  # pragma: no cover - optional dependency
+    msgpack = None  # type: ignore
+
+MAGIC = b"PTCGS"
+SNAPSHOT_VERSION = 1
+
+CODEC_JSON_ZLIB = 1
+CODEC_MSGPACK = 2
+
+_DEFINITION_FIELDS = (
+    "set_code",
+    "number",
+    "name",
+    "card_type",
+    "hp",
+    "stage",
+    "rules_text",
+    "subtypes",
+    "abilities",
+    "attacks",
+)
+
+
+class SnapshotError(ValueError):
+    """Raised when snapshot bytes cannot be decoded."""
+
+
+def state_to_dict(state: GameState) -> Dict[str, object]:
+    """Convert ``state`` into plain lists/dicts with an interned definition table.
+
+    Mutable per-card and per-player containers are copied, so the result stays
+    valid after the state moves on. Definition fields are shared.
+    """
+
+    definitions: List[List[object]] = []
+    definition_ids: Dict[int, int] = {}
+
+    def intern(definition: CardDefinition) -> int:
+        key = id(definition)
+        index = definition_ids.get(key)
+        if index is None:
+            index = definition_ids[key] = len(definitions)
+            definitions.append([getattr(definition, name) for name in _DEFINITION_FIELDS])
+        return index
+
+    players = []
+    for player_id, player in state.players.items():
+        zones = []
+        for zone, zone_state in player.zones.items():
+            zones.append(
+                [
+                    zone.value,
+                    [
+                        [
+                            card.uid,
+                            card.owner_id,
+                            intern(card.definition),
+                            card.damage,
+                            list(card.attached_energy),
+                            list(card.special_conditions),
+                        ]
+                        for card in zone_state.cards
+                    ],
+                ]
+            )
+        usage_trackers = {entity_id: dict(counters) for entity_id, counters in player.usage_trackers.items()}
+        players.append([player_id, player.prizes_remaining, list(player.memory), usage_trackers, zones])
+
+    return {
+        "match_id": state.match_id,
+        "turn_player": state.turn_player,
+        "turn_number": state.turn_number,
+        "phase": state.phase,
+        "definitions": definitions,
+        "players": players,
+    }
+
+
+def state_from_dict(data: Dict[str, object]) -> GameState:
+    """Inverse of :func:`state_to_dict`; definitions come back interned."""
+
+    definitions = [
+        intern_definition(CardDefinition(**dict(zip(_DEFINITION_FIELDS, row))))  # type: ignore[arg-type]
+        for row in data["definitions"]  # type: ignore[union-attr]
+    ]
+    players: Dict[str, PlayerState] = {}
+    for player_id, prizes_remaining, memory, usage_trackers, zones in data["players"]:  # type: ignore[union-attr]
+        player = PlayerState(
+            player_id=player_id,
+            zones={},
+            prizes_remaining=prizes_remaining,
+            memory=list(memory),
+            usage_trackers={entity_id: dict(counters) for entity_id, counters in usage_trackers.items()},
+        )
+        for zone_value, cards in zones:
+            player.zones[Zone(zone_value)] = ZoneState(
+                cards=[
+                    CardInstance(
+                        uid=uid,
+                        owner_id=owner_id,
+                        definition=definitions[definition_index],
+                        damage=damage,
+                        attached_energy=list(attached_energy),
+                        special_conditions=list(special_conditions),
+                    )
+                    for uid, owner_id, definition_index, damage, attached_energy, special_conditions in cards
+                ]
+            )
+        players[player_id] = player
+    return GameState(
+        match_id=data["match_id"],  # type: ignore[arg-type]
+        players=players,
+        turn_player=data["turn_player"],  # type: ignore[arg-type]
+        turn_number=data["turn_number"],  # type: ignore[arg-type]
+        phase=data["phase"],  # type: ignore[arg-type]
+    )
+
+
+def encode_state(state: GameState, codec: Optional[int] = None) -> bytes:
+    """Serialise ``state`` to bytes (msgpack if installed, else JSON+zlib)."""
+
+    if codec is None:
+        codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON_ZLIB
+    data = state_to_dict(state)
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for CODEC_MSGPACK. Install it with: pip install msgpack")
+        body = msgpack.packb(data, use_bin_type=True)
+    elif codec == CODEC_JSON_ZLIB:
+        body = zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    else:
+        raise ValueError(f"Unknown snapshot codec: {codec}")
+    return MAGIC + bytes((SNAPSHOT_VERSION, codec)) + body
+
+
+def decode_state(payload: bytes) -> GameState:
+    """Restore a :class:`GameState` written by :func:`encode_state`."""
+
+    header = len(MAGIC) + 2
+    if len(payload) < header or payload[: len(MAGIC)] != MAGIC:
+        raise SnapshotError("Not a game state snapshot")
+    version, codec = payload[len(MAGIC)], payload[len(MAGIC) + 1]
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+    body = payload[header:]
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack is required to decode this snapshot. Install it with: pip install msgpack")
+        data = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    elif codec == CODEC_JSON_ZLIB:
+        data = json.loads(zlib.decompress(body).decode("utf-8"))
+    else:
+        raise SnapshotError(f"Unknown snapshot codec: {codec}")
+    return state_from_dict(data)
+
+
+__all__ = [
+    "CODEC_JSON_ZLIB",
+    "CODEC_MSGPACK",
+    "SNAPSHOT_VERSION",
+    "SnapshotError",
+    "decode_state",
+    "encode_state",
+    "state_from_dict",
+    "state_to_dict",
+]
@@ -0,0 +1,206 @@
+"""Compact per-action state deltas with periodic full checkpoints.
+
+A *checkpoint* is a JSON-serialisable dict describing everything that changes
+during a match: turn header, prize counts and usage trackers, the uid order of
+every zone and the mutable fields (damage, attached energy, special
+conditions) of every card that is not in its pristine state. A *delta* lists
+only the parts of a checkpoint that an action wrote, so a typical action
+stores a handful of zone lists instead of the whole board.
+
+:func:`delta_from_changes` builds a delta from the parts the
+:class:`~ptcg_ai.journal.UndoJournal` saw touched since the previous version;
+:func:`diff_checkpoints` compares two full checkpoints and is used when no
+journal history is available (e.g. after a restart).
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import CardInstance, GameState, Zone
+
+Checkpoint = Dict[str, object]
+Delta = Dict[str, object]
+
+_HEADER_FIELDS = ("turn_player", "turn_number", "phase")
+
+
+def _card_fields(card: CardInstance) -> Optional[Dict[str, object]]:
+    if not (card.damage or card.attached_energy or card.special_conditions):
+        return None
+    return {
+        "damage": card.damage,
+        "attached_energy": list(card.attached_energy),
+        "special_conditions": list(card.special_conditions),
+    }
+
+
+def _trackers(trackers: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    return {entity_id: dict(counters) for entity_id, counters in trackers.items()}
+
+
+def capture_checkpoint(state: GameState) -> Checkpoint:
+    """Return a full, serialisable description of ``state``."""
+
+    players: Dict[str, object] = {}
+    cards: Dict[str, Dict[str, object]] = {}
+    for player_id, player in state.players.items():
+        zones: Dict[str, List[str]] = {}
+        for zone in Zone:
+            zone_cards = player.zone(zone).cards
+            zones[zone.value] = [card.uid for card in zone_cards]
+            for card in zone_cards:
+                fields = _card_fields(card)
+                if fields is not None:
+                    cards[card.uid] = fields
+        players[player_id] = {
+            "prizes_remaining": player.prizes_remaining,
+            "usage_trackers": _trackers(player.usage_trackers),
+            "zones": zones,
+        }
+    checkpoint: Checkpoint = {name: getattr(state, name) for name in _HEADER_FIELDS}
+    checkpoint["players"] = players
+    checkpoint["cards"] = cards
+    return checkpoint
+
+
+def delta_from_changes(
+    state: GameState, changes: Iterable[Tuple[Tuple[object, ...], Optional[CardInstance]]]
+) -> Delta:
+    """Delta holding the current value of every part listed in ``changes``.
+
+    ``changes`` comes from :meth:`~ptcg_ai.journal.UndoJournal.changes_since`.
+    """
+
+    delta: Delta = {}
+    players: Dict[str, Dict[str, object]] = {}
+    cards: Dict[str, Optional[Dict[str, object]]] = {}
+    for key, card in changes:
+        kind = key[0]
+        if kind == "header":
+            delta.update((name, getattr(state, name)) for name in _HEADER_FIELDS)
+        elif kind == "player":
+            player = state.players[key[1]]
+            changed = players.setdefault(key[1], {})
+            changed["prizes_remaining"] = player.prizes_remaining
+            changed["usage_trackers"] = _trackers(player.usage_trackers)
+        elif kind == "zone":
+            _, player_id, zone = key
+            zones = players.setdefault(player_id, {}).setdefault("zones", {})
+            zones[zone.value] = [entry.uid for entry in state.players[player_id].zone(zone).cards]
+        elif kind == "card":
+            cards[key[1]] = _card_fields(card)
+    if players:
+        delta["players"] = players
+    if cards:
+        delta["cards"] = cards
+    return delta
+
+
+def diff_checkpoints(previous: Checkpoint, current: Checkpoint) -> Delta:
+    """Describe how to turn ``previous`` into ``current``.
+
+    Cards that went back to their pristine state are recorded as ``None``.
+    An empty dict means nothing changed.
+    """
+
+    delta: Delta = {}
+    for name in _HEADER_FIELDS:
+        if previous.get(name) != current.get(name):
+            delta[name] = current.get(name)
+
+    players: Dict[str, Dict[str, object]] = {}
+    for player_id, player in current["players"].items():  # type: ignore[union-attr]
+        before = previous["players"].get(player_id, {"prizes_remaining": None, "zones": {}})  # type: ignore[union-attr]
+        changes: Dict[str, object] = {}
+        for name in ("prizes_remaining", "usage_trackers"):
+            if before.get(name) != player.get(name):
+                changes[name] = player.get(name)
+        zones = {
+            zone: uids
+            for zone, uids in player["zones"].items()
+            if before["zones"].get(zone) != uids
+        }
+        if zones:
+            changes["zones"] = zones
+        if changes:
+            players[player_id] = changes
+    if players:
+        delta["players"] = players
+
+    old_cards = previous["cards"]
+    new_cards = current["cards"]
+    cards = {uid: fields for uid, fields in new_cards.items() if old_cards.get(uid) != fields}  # type: ignore[union-attr]
+    cards.update({uid: None for uid in old_cards if uid not in new_cards})  # type: ignore[union-attr]
+    if cards:
+        delta["cards"] = cards
+    return delta
+
+
+def apply_delta(checkpoint: Checkpoint, delta: Delta) -> Checkpoint:
+    """Return a new checkpoint with ``delta`` applied; ``checkpoint`` is untouched."""
+
+    result: Checkpoint = {name: checkpoint.get(name) for name in _HEADER_FIELDS}
+    for name in _HEADER_FIELDS:
+        if name in delta:
+            result[name] = delta[name]
+
+    players = {
+        player_id: dict(player, zones=dict(player["zones"]))
+        for player_id, player in checkpoint["players"].items()  # type: ignore[union-attr]
+    }
+    for player_id, changes in delta.get("players", {}).items():  # type: ignore[union-attr]
+        player = players.setdefault(player_id, {"prizes_remaining": None, "usage_trackers": {}, "zones": {}})
+        for name in ("prizes_remaining", "usage_trackers"):
+            if name in changes:
+                player[name] = changes[name]
+        player["zones"].update(changes.get("zones", {}))
+    result["players"] = players
+
+    cards = dict(checkpoint["cards"])  # type: ignore[arg-type]
+    for uid, fields in delta.get("cards", {}).items():  # type: ignore[union-attr]
+        if fields is None:
+            cards.pop(uid, None)
+        else:
+            cards[uid] = fields
+    result["cards"] = cards
+    return result
+
+
+def rebuild_version(
+    versions: Iterable[Tuple[int, bool, Dict[str, object]]],
+    version: Optional[int] = None,
+) -> Tuple[int, Checkpoint]:
+    """Rebuild the checkpoint for ``version`` (latest if ``None``).
+
+    ``versions`` yields ``(version, is_checkpoint, payload)`` rows in ascending
+    version order, starting at (or before) the nearest checkpoint.
+    """
+
+    current: Optional[Checkpoint] = None
+    reached = -1
+    for number, is_checkpoint, payload in versions:
+        if version is not None and number > version:
+            break
+        if is_checkpoint:
+            current = payload
+        elif current is None:
+            continue
+        else:
+            current = apply_delta(current, payload)
+        reached = number
+    if current is None:
+        raise ValueError("No checkpoint found for the requested version")
+    if version is not None and reached != version:
+        raise ValueError(f"Version {version} is not recorded (latest available: {reached})")
+    return reached, current
+
+
+__all__ = [
+    "Checkpoint",
+    "Delta",
+    "apply_delta",
+    "capture_checkpoint",
+    "delta_from_changes",
+    "diff_checkpoints",
+    "rebuild_version",
+]
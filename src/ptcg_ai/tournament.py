@@ -0,0 +1,200 @@
+"""Process-pool tournament driver for mass headless self-play.
+
+Matches are sharded across a :class:`~concurrent.futures.ProcessPoolExecutor`.
+Every worker builds the decks once in its initializer and reuses them for all
+matches it plays; each match gets the seed ``seed + match_index`` so a
+tournament is reproducible regardless of how matches are scheduled.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+from .headless import MatchResult, run_match
+from .models import Deck
+from .simulation import build_deck
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow
+    import pyarrow.parquet
+except Exception:  # pragma: no cover - optional dependency
+    pyarrow = None  # type: ignore
+
+DeckLoader = Callable[[str, str], Deck]
+
+RESULT_FIELDS = ["match_id", "winner", "reason", "turns", "actions", "failed_actions", "wall_time"]
+
+_WORKER_DECKS: Dict[str, Deck] = {}
+
+
+def _init_worker(deck_loader: DeckLoader, deck_files: Mapping[str, str]) -> None:
+    """Load card definitions once per worker process."""
+
+    _WORKER_DECKS.clear()
+    for player_id, deck_file in deck_files.items():
+        _WORKER_DECKS[player_id] = deck_loader(player_id, deck_file)
+
+
+def _play(match_id: str, seed: int, max_turns: int) -> MatchResult:
+    return run_match(match_id, _WORKER_DECKS, seed=seed, max_turns=max_turns)
+
+
+class ResultWriter:
+    """Append match results to CSV, JSONL or Parquet, chosen by file suffix.
+
+    CSV and JSONL rows are written as soon as a result arrives. Parquet needs
+    ``pyarrow`` and is written as a single table on :meth:`close`.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.format = self.path.suffix.lower().lstrip(".")
+        if self.format not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Unsupported result format: {self.path.suffix!r} (expected .csv, .jsonl or .parquet)")
+        if self.format == "parquet" and pyarrow is None:
+            raise RuntimeError(
+                "pyarrow is required to write Parquet results. "
+                "Install it with: pip install pyarrow"
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._rows: List[Dict[str, object]] = []
+        self._handle = None
+        self._csv = None
+        if self.format != "parquet":
+            self._handle = self.path.open("w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                self._csv = csv.DictWriter(self._handle, fieldnames=RESULT_FIELDS)
+                self._csv.writeheader()
+
+    def write(self, result: MatchResult) -> None:
+        row = asdict(result)
+        if self.format == "parquet":
+            self._rows.append(row)
+        elif self._csv is not None:
+            self._csv.writerow(row)
+            self._handle.flush()
+        else:
+            self._handle.write(json.dumps(row) + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self.format == "parquet":
+            table = pyarrow.Table.from_pylist(self._rows)
+            pyarrow.parquet.write_table(table, self.path)
+        elif self._handle is not None:
+            self._handle.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@dataclass
+class TournamentSummary:
+    """Aggregated outcome of a tournament run."""
+
+    matches: int = 0
+    wins: Dict[str, int] = field(default_factory=dict)
+    total_turns: int = 0
+    total_actions: int = 0
+    wall_time: float = 0.0
+
+    def add(self, result: MatchResult) -> None:
+        self.matches += 1
+        key = result.winner or "draw"
+        self.wins[key] = self.wins.get(key, 0) + 1
+        self.total_turns += result.turns
+        self.total_actions += result.actions
+
+    @property
+    def matches_per_second(self) -> float:
+        return self.matches / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def average_turns(self) -> float:
+        return self.total_turns / self.matches if self.matches else 0.0
+
+
+def iter_tournament(
+    deck_files: Mapping[str, str],
+    matches: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    max_turns: int = 100,
+    deck_loader: DeckLoader = build_deck,
+    match_prefix: str = "tournament",
+) -> Iterator[MatchResult]:
+    """Yield match results as they complete (completion order, not index order).
+
+    ``deck_loader`` must be picklable (a module-level function) and is called
+    as ``deck_loader(player_id, deck_file)`` once per worker. With
+    ``workers=1`` matches run in the calling process.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    deck_files = dict(deck_files)
+    jobs = [(f"{match_prefix}-{index + 1}", seed + index) for index in range(matches)]
+
+    if workers == 1:
+        _init_worker(deck_loader, deck_files)
+        for match_id, match_seed in jobs:
+            yield _play(match_id, match_seed, max_turns)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(deck_loader, deck_files),
+    ) as executor:
+        futures = [executor.submit(_play, match_id, match_seed, max_turns) for match_id, match_seed in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_tournament(
+    deck_files: Mapping[str, str],
+    matches: int,
+    output: Optional[str | Path] = None,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    max_turns: int = 100,
+    deck_loader: DeckLoader = build_deck,
+) -> TournamentSummary:
+    """Run ``matches`` seeded matches and stream each result to ``output``."""
+
+    summary = TournamentSummary()
+    writer = ResultWriter(output) if output is not None else None
+    started = time.perf_counter()
+    try:
+        for result in iter_tournament(
+            deck_files,
+            matches,
+            seed=seed,
+            workers=workers,
+            max_turns=max_turns,
+            deck_loader=deck_loader,
+        ):
+            summary.add(result)
+            if writer is not None:
+                writer.write(result)
+    finally:
+        if writer is not None:
+            writer.close()
+    summary.wall_time = time.perf_counter() - started
+    return summary
+
+
+__all__ = [
+    "ResultWriter",
+    "TournamentSummary",
+    "iter_tournament",
+    "run_tournament",
+]
@@ -2,9 +2,139 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 for path in (SRC, ROOT):
     if str(path) not in sys.path:
         sys.path.insert(0, str(path))
+
+from ptcg_ai.database import DatabaseClient, InMemoryDatabase  # noqa: E402
+from ptcg_ai.game_tools import GameTools, ToolCallContext  # noqa: E402
+from ptcg_ai.models import CardDefinition, CardInstance, Deck, GameState, PlayerState, Zone  # noqa: E402
+
+
+def build_test_deck(player_id: str) -> Deck:
+    """60 cards alternating a Basic Pokémon with a one-Energy attack and Basic Energy."""
+
+    pokemon = CardDefinition(
+        set_code="TST",
+        number="1",
+        name="Test Mon",
+        card_type="Pokemon",
+        hp=60,
+        stage="Basic",
+        attacks=[{"name": "Tackle", "cost": ["Colorless"], "damage": "30", "text": ""}],
+    )
+    energy = CardDefinition(set_code="TST", number="2", name="Basic Energy", card_type="Energy")
+    cards = [
+        CardInstance(uid=f"{player_id}-{i}", owner_id=player_id, definition=pokemon if i % 2 == 0 else energy)
+        for i in range(60)
+    ]
+    return Deck(player_id=player_id, cards=cards)
+
+
+def build_thin_deck(player_id: str) -> Deck:
+    """Four Basics in 60 cards, so mulligans are common."""
+
+    pokemon = CardDefinition(set_code="TST", number="1", name="Test Mon", card_type="Pokemon", hp=60, stage="Basic")
+    energy = CardDefinition(set_code="TST", number="2", name="Basic Energy", card_type="Energy")
+    cards = [
+        CardInstance(uid=f"{player_id}-{i}", owner_id=player_id, definition=pokemon if i % 15 == 0 else energy)
+        for i in range(60)
+    ]
+    return Deck(player_id=player_id, cards=cards)
+
+
+def load_thin_deck(player_id: str, deck_file: str) -> Deck:
+    """Picklable ``deck_loader`` returning :func:`build_thin_deck` decks; ignores ``deck_file``."""
+
+    return build_thin_deck(player_id)
+
+
+def load_test_deck(player_id: str, deck_file: str) -> Deck:
+    """Module-level (picklable) ``deck_loader`` for worker pools; ignores ``deck_file``."""
+
+    return build_test_deck(player_id)
+
+
+def build_test_tools() -> GameTools:
+    """Tools over a fresh ``index-match``: 20-card decks alternating a Basic Pokémon and Energy."""
+
+    pokemon = CardDefinition(set_code="TEST", number="001", name="Test Mon", card_type="Pokemon", hp=60, stage="Basic")
+    energy = CardDefinition(set_code="TEST", number="002", name="Test Energy", card_type="Energy", subtypes=["Basic"])
+    players = {player_id: PlayerState(player_id=player_id) for player_id in ("playerA", "playerB")}
+    for player_id, player in players.items():
+        player.zone(Zone.DECK).cards = [
+            CardInstance(uid=f"{player_id}-deck-{i:03d}", owner_id=player_id, definition=energy if i % 2 else pokemon)
+            for i in range(1, 21)
+        ]
+    state = GameState(match_id="index-match", players=players)
+    db = DatabaseClient(memory_store=InMemoryDatabase())
+    return GameTools(context=ToolCallContext(match_id="index-match", referee_id="referee", db=db), state=state)
+
+
+def check_index_consistent(state: GameState) -> None:
+    """Assert that ``state.card_index`` matches every zone list exactly."""
+
+    seen = set()
+    for player_id, player in state.players.items():
+        for zone in Zone:
+            for position, card in enumerate(player.zone(zone).cards):
+                location = state.locate(card.uid)
+                assert (location.player_id, location.zone, location.index) == (player_id, zone, position)
+                seen.add(card.uid)
+    assert seen == set(state.card_index)
+
+
+@pytest.fixture
+def make_tools() -> Callable[[], GameTools]:
+    """Factory for :func:`build_test_tools`."""
+
+    return build_test_tools
+
+
+@pytest.fixture
+def assert_index_consistent() -> Callable[[GameState], None]:
+    return check_index_consistent
+
+
+@pytest.fixture
+def make_deck() -> Callable[[str], Deck]:
+    """Factory for :func:`build_test_deck` decks."""
+
+    return build_test_deck
+
+
+@pytest.fixture
+def make_decks() -> Callable[[], Dict[str, Deck]]:
+    """Factory for a fresh pair of test decks keyed by ``playerA``/``playerB``."""
+
+    def decks() -> Dict[str, Deck]:
+        return {"playerA": build_test_deck("playerA"), "playerB": build_test_deck("playerB")}
+
+    return decks
+
+
+@pytest.fixture
+def make_thin_deck() -> Callable[[str], Deck]:
+    """Factory for :func:`build_thin_deck` decks."""
+
+    return build_thin_deck
+
+
+@pytest.fixture
+def thin_deck_loader() -> Callable[[str, str], Deck]:
+    """Picklable loader returning thin decks, for ``analyze_opening``."""
+
+    return load_thin_deck
+
+
+@pytest.fixture
+def deck_loader() -> Callable[[str, str], Deck]:
+    """Picklable loader returning test decks, for ``run_tournament`` and friends."""
+
+    return load_test_deck
@@ -0,0 +1,74 @@
+"""Integration tests for the batched rule indexing pipeline."""
+import asyncio
+import contextlib
+
+import pytest
+
+from src.ptcg_ai.embeddings import FakeEmbeddingProvider
+from src.ptcg_ai.rulebook import RuleKnowledgeBase
+
+pytest.importorskip("fastapi")  # services.rule_kb imports its FastAPI app
+
+from services.rule_kb.vector_search import VectorRuleSearch  # noqa: E402
+
+
+class FakeConn:
+    """Just enough of an asyncpg connection to record the indexing statements."""
+
+    def __init__(self, table):
+        self.table = table
+        self.statements = []
+        self.copied = []
+
+    async def execute(self, sql, *args):
+        self.statements.append(" ".join(sql.split()))
+        if sql.lstrip().startswith("INSERT INTO rule_embeddings"):
+            for section, _, digest, model, embedding in self.copied:
+                self.table[section] = {
+                    "section": section,
+                    "text_sha256": digest,
+                    "embedding_model": model,
+                    "embedding": embedding,
+                }
+
+    async def fetch(self, sql, *args):
+        return list(self.table.values())
+
+    async def fetchval(self, sql, *args):
+        return len(self.table)
+
+    async def copy_records_to_table(self, name, records, columns):
+        self.copied = list(records)
+
+    def transaction(self):
+        return contextlib.AsyncExitStack()
+
+
+class FakePool:
+    def __init__(self):
+        self.table = {}
+        self.conn = FakeConn(self.table)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def test_index_rules_batches_and_skips_unchanged_rules():
+    pool = FakePool()
+    embedder = FakeEmbeddingProvider(dimensions=4)
+    search = VectorRuleSearch(pool=pool, embedder=embedder)
+    kb = RuleKnowledgeBase.from_text("\n".join(f"{i} rule number {i}" for i in range(1, 11)))
+
+    assert asyncio.run(search.index_rules(kb, batch_size=4, concurrency=2)) == 10
+    assert sorted(len(batch) for batch in embedder.calls) == [2, 4, 4]
+    assert len(pool.table) == 10
+    statements = [statement.split(" (")[0] for statement in pool.conn.statements]
+    assert statements.index("INSERT INTO rule_embeddings") < statements.index(
+        "CREATE INDEX IF NOT EXISTS idx_rule_embeddings_vector ON rule_embeddings USING ivfflat"
+    )
+
+    assert asyncio.run(search.index_rules(kb)) == 0
+    kb.rules["3"].text = "changed"
+    assert asyncio.run(search.index_rules(kb)) == 1
+    assert embedder.calls[-1] == ["changed"]
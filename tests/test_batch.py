@@ -0,0 +1,85 @@
+from ptcg_ai.batch import BatchEngine
+from ptcg_ai.headless import HeadlessMatch, ScriptedPlayerAgent, clone_deck
+from ptcg_ai.models import Zone
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.rng import MatchRng
+from ptcg_ai.rulebook import RuleKnowledgeBase
+
+ZONES = (Zone.DECK, Zone.HAND, Zone.ACTIVE, Zone.BENCH, Zone.PRIZE, Zone.DISCARD)
+
+
+def _scalar_matches(decks, seeds, max_mulligans=50):
+    for seed in seeds:
+        referee = RefereeAgent.create(
+            match_id=f"scalar-{seed}",
+            player_decks={player_id: clone_deck(deck) for player_id, deck in decks.items()},
+            knowledge_base=RuleKnowledgeBase(),
+            rng=MatchRng(seed),
+        )
+        players = {player_id: ScriptedPlayerAgent(player_id) for player_id in decks}
+        reason = HeadlessMatch(referee=referee, players=players, max_mulligans=max_mulligans).setup()
+        yield referee, reason
+
+
+def _assert_rows_match(engine, decks, seeds, scalars):
+    index = {card.uid: i for deck in decks.values() for i, card in enumerate(deck.cards)}
+    for row, (referee, _) in enumerate(scalars):
+        state = referee.state
+        for player_id in decks:
+            player = state.players[player_id]
+            for zone in ZONES:
+                expected = [index[card.uid] for card in player.zone(zone).cards]
+                assert engine.zone(player_id, zone, row) == expected, (seeds[row], player_id, zone)
+            for card in player.zone(Zone.DISCARD).cards + player.zone(Zone.ACTIVE).cards:
+                assert engine.damage(player_id, index[card.uid], row) == card.damage
+            assert engine.prizes_remaining(player_id)[row] == player.prizes_remaining
+
+
+def test_setup_matches_scalar_engine_row_for_row(make_deck, make_thin_deck):
+    decks = {"playerA": make_thin_deck("playerA"), "playerB": make_deck("playerB")}
+    seeds = list(range(40))
+    engine = BatchEngine(decks, seeds)
+    engine.initialise()
+    reasons = engine.setup(max_mulligans=3)
+
+    scalars = list(_scalar_matches(decks, seeds, max_mulligans=3))
+    assert reasons == [reason for _, reason in scalars]
+    assert any(reason is not None for reason in reasons)
+    _assert_rows_match(engine, decks, seeds, scalars)
+
+
+def test_damage_and_knockouts_match_scalar_engine(make_decks):
+    decks = make_decks()
+    seeds = list(range(100, 120))
+    engine = BatchEngine(decks, seeds)
+    engine.initialise()
+    assert engine.setup() == [None] * len(seeds)
+
+    scalars = list(_scalar_matches(decks, seeds))
+    # Knock out B's Active, heal A's, then take a prize and reshuffle A's hand.
+    engine.update_damage("playerB", 70)
+    engine.update_damage("playerA", 20)
+    engine.update_damage("playerA", -50)
+    knocked_out = engine.check_ko("playerB")
+    assert engine.check_ko("playerA") == [False] * len(seeds)
+    engine.take_prize("playerB", 2, rows=range(0, len(seeds), 2))
+    engine.shuffle_hand_into_deck("playerA", rows=range(1, len(seeds), 2))
+    engine.draw("playerA", 3)
+
+    for row, (referee, _) in enumerate(scalars):
+        tools, state = referee.tools, referee.state
+        active_b = state.players["playerB"].zone(Zone.ACTIVE).cards[0].uid
+        active_a = state.players["playerA"].zone(Zone.ACTIVE).cards[0].uid
+        tools.update_damage(active_b, 70)
+        tools.update_damage(active_a, 20)
+        tools.update_damage(active_a, -50)
+        assert tools.check_ko(active_b) is knocked_out[row] is True
+        assert tools.check_ko(active_a) is False
+        if row % 2 == 0:
+            tools.take_prize("playerB", 2)
+        else:
+            tools.shuffle_hand_into_deck("playerA")
+        tools.draw("playerA", 3)
+
+    _assert_rows_match(engine, decks, seeds, scalars)
+    assert engine.prizes_remaining("playerA") == [5] * len(seeds)
@@ -0,0 +1,189 @@
+import json
+
+import pytest
+
+from ptcg_ai.card_cache import CardCache, json_source_hash, open_card_cache
+from ptcg_ai.simulation import build_deck
+
+
+def _write_sources(root, pikachu_hp="60"):
+    cards_dir = root / "cards"
+    cards_dir.mkdir(exist_ok=True)
+    set_file = root / "setdata.json"
+    set_file.write_text(
+        json.dumps({"data": [{"id": "tst1", "ptcgoCode": "TST"}, {"id": "tst1c", "ptcgoCode": "TST"}]}),
+        encoding="utf-8",
+    )
+    (cards_dir / "tst1.json").write_text(
+        json.dumps(
+            [
+                {
+                    "name": "Pikachu",
+                    "supertype": "Pokémon",
+                    "subtypes": ["Basic"],
+                    "hp": pikachu_hp,
+                    "number": "1",
+                    "attacks": [{"name": "Gnaw", "cost": ["Colorless"], "damage": "10", "text": ""}],
+                },
+                {"name": "Lightning Energy", "supertype": "Energy", "subtypes": ["Basic"], "number": "2"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    (cards_dir / "tst1c.json").write_text(
+        json.dumps([{"name": "Classic Pikachu", "supertype": "Pokémon", "subtypes": ["Basic"], "number": "1"}]),
+        encoding="utf-8",
+    )
+    return cards_dir, set_file
+
+
+def test_json_cache_maps_cards_and_keeps_first_set_for_shared_codes(tmp_path):
+    cards_dir, set_file = _write_sources(tmp_path)
+    cache = open_card_cache(tmp_path / "cards.sqlite3", source="json", cards_dir=cards_dir, set_file=set_file)
+
+    pikachu = cache.get("TST", "1")
+    assert pikachu.name == "Pikachu"
+    assert (pikachu.card_type, pikachu.stage, pikachu.hp) == ("Pokemon", "Basic", 60)
+    assert pikachu.attacks[0]["name"] == "Gnaw"
+    assert cache.get("TST", "99") is None
+    assert cache.similar("TST", "99") == [("Pikachu", "TST", "1"), ("Lightning Energy", "TST", "2")]
+
+
+def test_cache_is_rebuilt_only_when_source_hash_changes(tmp_path):
+    cards_dir, set_file = _write_sources(tmp_path)
+    path = tmp_path / "cards.sqlite3"
+    first = open_card_cache(path, source="json", cards_dir=cards_dir, set_file=set_file)
+    mtime = path.stat().st_mtime_ns
+    first.close()
+
+    open_card_cache(path, source="json", cards_dir=cards_dir, set_file=set_file).close()
+    assert path.stat().st_mtime_ns == mtime
+
+    _write_sources(tmp_path, pikachu_hp="70")
+    refreshed = open_card_cache(path, source="json", cards_dir=cards_dir, set_file=set_file)
+    assert refreshed.source_hash == json_source_hash(cards_dir, set_file)
+    assert refreshed.get("TST", "1").hp == 70
+
+
+def test_auto_falls_back_when_postgres_is_unreachable(tmp_path, monkeypatch):
+    import ptcg_ai.card_cache as card_cache
+
+    attempts = []
+
+    class _UnreachablePsycopg:
+        @staticmethod
+        def connect(dsn):
+            attempts.append(dsn)
+            raise OSError("connection refused")
+
+    monkeypatch.setattr(card_cache, "psycopg", _UnreachablePsycopg)
+    cards_dir, set_file = _write_sources(tmp_path)
+    path = tmp_path / "cards.sqlite3"
+
+    built = open_card_cache(path, dsn="pg", cards_dir=cards_dir, set_file=set_file)
+    assert built.source == "json" and built.get("TST", "1").name == "Pikachu"
+    assert attempts == ["pg"]
+
+    # The PostgreSQL check failed again, so the existing file is kept as is.
+    _write_sources(tmp_path, pikachu_hp="70")
+    assert open_card_cache(path, dsn="pg", cards_dir=cards_dir, set_file=set_file).get("TST", "1").hp == 60
+    assert attempts == ["pg", "pg"]
+
+
+def test_auto_rebuilds_when_the_source_changes(tmp_path, monkeypatch):
+    import ptcg_ai.card_cache as card_cache
+
+    monkeypatch.setattr(card_cache, "psycopg", None)
+    cards_dir, set_file = _write_sources(tmp_path)
+    path = tmp_path / "cards.sqlite3"
+
+    assert open_card_cache(path, cards_dir=cards_dir, set_file=set_file).get("TST", "1").hp == 60
+
+    _write_sources(tmp_path, pikachu_hp="70")
+    refreshed = open_card_cache(path, cards_dir=cards_dir, set_file=set_file)
+    assert refreshed.source_hash == json_source_hash(cards_dir, set_file)
+    assert refreshed.get("TST", "1").hp == 70
+
+
+def test_build_deck_resolves_from_cache(tmp_path):
+    cards_dir, set_file = _write_sources(tmp_path)
+    cache = open_card_cache(tmp_path / "cards.sqlite3", source="json", cards_dir=cards_dir, set_file=set_file)
+    deck_file = tmp_path / "deck.txt"
+    deck_file.write_text("Pokémon: 20\n20 Pikachu TST 1\n\nEnergy: 40\n40 Lightning Energy TST 2\n", encoding="utf-8")
+
+    deck = build_deck("playerA", deck_file, card_cache=cache)
+    assert len(deck.cards) == 60
+    assert deck.cards[0].definition is deck.cards[19].definition
+    assert deck.cards[-1].definition.card_type == "Energy"
+
+    deck_file.write_text("Pokémon: 60\n60 Raichu TST 3\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Cards found in set TST"):
+        build_deck("playerA", deck_file, card_cache=cache)
+
+
+def test_missing_cache_file_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        CardCache(tmp_path / "missing.sqlite3")
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.queries.append((sql, params))
+        pairs = set(zip(params[0::2], params[1::2]))
+        table = self.conn.direct if len(self.conn.queries) == 1 else self.conn.joined
+        self._rows = [row for key, row in table.items() if key in pairs]
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeConnection:
+    def __init__(self, direct, joined):
+        self.direct, self.joined = direct, joined
+        self.queries = []
+        self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+def _pg_row(set_code, number, name, supertype, set_column):
+    return (set_code, number, name, supertype, ["Basic"], 60, None, set_column, number, None, None)
+
+
+def test_uncached_build_deck_resolves_all_lines_in_two_queries(tmp_path, monkeypatch):
+    import ptcg_ai.simulation as simulation
+
+    conn = _FakeConnection(
+        direct={("TST", "1"): _pg_row("TST", "1", "Pikachu", "Pokémon", "TST")},
+        joined={("TST", "2"): _pg_row("TST", "2", "Lightning Energy", "Energy", None)},
+    )
+    monkeypatch.setattr(simulation, "_connect_postgres", lambda dsn: conn)
+    monkeypatch.setenv("PTCG_CARD_CACHE", "off")
+    deck_file = tmp_path / "deck.txt"
+    deck_file.write_text(
+        "Pokémon: 20\n10 Pikachu TST 1\n10 Pikachu TST 1\n\nEnergy: 40\n40 Lightning Energy TST 2\n",
+        encoding="utf-8",
+    )
+
+    deck = build_deck("playerA", deck_file)
+
+    assert len(conn.queries) == 2
+    assert conn.queries[0][1] == ["TST", "1", "TST", "2"]
+    assert conn.queries[1][1] == ["TST", "2"]
+    assert conn.closed
+    assert deck.cards[0].definition.card_type == "Pokemon"
+    assert deck.cards[-1].definition.set_code == "TST"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from ptcg_ai.models import CardIndexError, CardLocation, Zone
+
+
+def test_index_tracks_game_tools_mutations(make_tools, assert_index_consistent) -> None:
+    tools = make_tools()
+    state = tools.state
+
+    tools.shuffle("playerA", Zone.DECK)
+    tools.draw("playerA", 7)
+    pokemon = next(c for c in state.players["playerA"].zone(Zone.HAND).cards if c.definition.card_type == "Pokemon")
+    energy = next(c for c in state.players["playerA"].zone(Zone.HAND).cards if c.definition.card_type == "Energy")
+    tools.move_card("playerA", Zone.HAND, Zone.ACTIVE, pokemon)
+    tools.attach_energy(energy.uid, pokemon.uid)
+    tools.update_damage(pokemon.uid, 60)
+    assert tools.check_ko(pokemon.uid)
+
+    assert state.locate(energy.uid) is None
+    assert state.locate(pokemon.uid).zone == Zone.DISCARD
+    assert_index_consistent(state)
+
+
+def test_lookup_by_uid_respects_zone_filter(make_tools) -> None:
+    tools = make_tools()
+    state = tools.state
+    top = state.players["playerB"].zone(Zone.DECK).cards[0]
+
+    assert state.find_card(top.uid) is top
+    assert state.find_card(top.uid, zones=(Zone.HAND,)) is None
+    assert state.find_card(top.uid, player_id="playerA") is None
+    assert state.find_card("missing-uid") is None
+
+
+def test_index_mismatch_raises(make_tools) -> None:
+    tools = make_tools()
+    deck = tools.state.players["playerA"].zone(Zone.DECK)
+    stray = deck.cards.pop()
+
+    with pytest.raises(CardIndexError):
+        tools.state.locate(stray.uid)
+
+
+def test_removals_keep_position_hints_exact(make_tools) -> None:
+    tools = make_tools()
+    state = tools.state
+
+    tools.place_prizes("playerA", 6)
+    tools.draw("playerA", 7)
+    hand = state.players["playerA"].zone(Zone.HAND).cards
+    pokemon = next(c for c in hand if c.definition.card_type == "Pokemon")
+    energy = next(c for c in hand if c.definition.card_type == "Energy")
+    tools.move_card("playerA", Zone.HAND, Zone.ACTIVE, pokemon)
+    tools.attach_energy(energy.uid, pokemon.uid)
+    tools.discard("playerA", [hand[0]], reason="test")
+    tools.take_prize("playerA", 2)
+    tools.send_to_lost_zone("playerA", state.players["playerA"].zone(Zone.DECK).cards[3].uid)
+
+    # Raw index entries, without the repair scan in locate()
+    for player_id, player in state.players.items():
+        for zone in Zone:
+            for position, card in enumerate(player.zone(zone).cards):
+                assert state.card_index[card.uid] == CardLocation(player_id, zone, position)
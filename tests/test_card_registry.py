@@ -0,0 +1,47 @@
+import copy
+import pickle
+
+import pytest
+
+from ptcg_ai.card_registry import CardRegistry
+from ptcg_ai.models import CardDefinition, FrozenDict
+
+
+def _definition(name="Pikachu"):
+    return CardDefinition(
+        set_code="TST",
+        number="1",
+        name=name,
+        card_type="Pokemon",
+        hp=60,
+        subtypes=["Basic"],
+        attacks=[{"name": "Gnaw", "cost": ["Colorless"], "damage": "10"}],
+    )
+
+
+def test_definitions_are_frozen_and_hashable_by_value():
+    definition = _definition()
+
+    assert definition.subtypes == ("Basic",)
+    assert isinstance(definition.attacks[0], FrozenDict)
+    assert definition.attacks[0]["cost"] == ("Colorless",)
+    assert hash(definition) == hash(_definition())
+    with pytest.raises(AttributeError):
+        definition.hp = 70
+    with pytest.raises(TypeError):
+        definition.attacks[0]["damage"] = "90"
+    assert pickle.loads(pickle.dumps(definition)) == definition
+    assert copy.deepcopy(definition) == definition
+
+
+def test_registry_returns_one_canonical_instance_per_value():
+    registry = CardRegistry()
+
+    first = registry.intern(_definition())
+    second = registry.intern(_definition())
+    other = registry.intern(_definition("Raichu"))
+
+    assert first is second
+    assert other is not first
+    assert len(registry) == 2
+    assert first.attacks[0]["name"] is second.attacks[0]["name"]
@@ -0,0 +1,73 @@
+import tracemalloc
+
+from ptcg_ai.card_store import CardStore, CardView
+from ptcg_ai.headless import clone_deck, run_match
+from ptcg_ai.models import CardInstance
+
+
+def test_views_expose_the_card_instance_api(make_deck):
+    deck = make_deck("playerA")
+    store = CardStore()
+    packed = store.pack_deck(deck)
+    mon, energy = packed.cards[0], packed.cards[1]
+
+    assert isinstance(mon, CardView)
+    assert (mon.uid, mon.owner_id, mon.definition) == (deck.cards[0].uid, "playerA", deck.cards[0].definition)
+
+    mon.damage += 30
+    mon.attached_energy.append(energy.uid)
+    mon.attached_energy.append("foreign-energy")
+    mon.special_conditions.append("Poisoned")
+    mon.special_conditions.append("Asleep")
+    assert mon.damage == 30
+    assert mon.attached_energy == [energy.uid, "foreign-energy"]
+    assert mon.special_conditions == ["Asleep", "Poisoned"]
+    assert "Asleep" in mon.special_conditions
+
+    detached = mon.attached_energy[:1]
+    del mon.attached_energy[:1]
+    mon.special_conditions.remove("Asleep")
+    assert detached == [energy.uid]
+    assert list(mon.attached_energy) == ["foreign-energy"]
+    assert list(mon.special_conditions) == ["Poisoned"]
+    assert not mon.is_ko
+
+    clone = mon.clone()
+    assert isinstance(clone, CardInstance)
+    assert clone == mon and mon == clone
+    clone.damage = 0
+    assert mon.damage == 30
+
+
+def test_compact_match_plays_identically_to_object_backed_match(make_decks):
+    decks = make_decks()
+
+    baseline = run_match("store-match", decks, seed=11, max_turns=30)
+    compact = run_match("store-match", decks, seed=11, max_turns=30, compact=True)
+
+    assert (compact.winner, compact.reason, compact.turns, compact.actions) == (
+        baseline.winner,
+        baseline.reason,
+        baseline.turns,
+        baseline.actions,
+    )
+
+
+def test_store_uses_less_memory_than_card_instances(make_decks):
+    decks = make_decks()
+
+    def allocated(build):
+        tracemalloc.start()
+        kept = [build() for _ in range(50)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert kept
+        return size
+
+    objects = allocated(lambda: [clone_deck(deck) for deck in decks.values()])
+
+    def packed():
+        store = CardStore()
+        return [store.pack_deck(deck) for deck in decks.values()]
+
+    assert allocated(packed) < objects / 2
@@ -0,0 +1,202 @@
+from ptcg_ai.database import DatabaseClient
+from ptcg_ai.models import GameLogEntry
+
+
+class _RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.calls.append(("execute", sql, params))
+
+    def executemany(self, sql, rows):
+        self.conn.calls.append(("executemany", sql, list(rows)))
+
+
+class _RecordingConnection:
+    def __init__(self):
+        self.calls = []
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self):
+        return _RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _client(**kwargs):
+    client = DatabaseClient(**kwargs)
+    client._conn = _RecordingConnection()
+    return client
+
+
+def _entry(index):
+    return GameLogEntry(match_id="db-match", actor="referee", action="draw", payload={"n": index})
+
+
+def test_logs_are_buffered_until_batch_size():
+    client = _client(log_batch_size=3, log_flush_interval=3600)
+    conn = client._conn
+
+    client.append_log(_entry(1))
+    client.append_log(_entry(2))
+    assert conn.calls == [] and conn.commits == 0
+
+    client.append_log(_entry(3))
+    assert [call[0] for call in conn.calls] == ["executemany"]
+    assert len(conn.calls[0][2]) == 3
+    assert conn.commits == 1
+
+
+def test_close_flushes_pending_logs():
+    client = _client(log_batch_size=100, log_flush_interval=3600)
+    conn = client._conn
+    client.append_log(_entry(1))
+
+    client.close()
+
+    assert conn.calls[0][0] == "executemany"
+    assert conn.commits == 1
+    assert conn.closed
+
+
+def test_keyset_pages_and_stream_cover_every_entry_once():
+    client = DatabaseClient()
+    for index in range(7):
+        client.append_log(_entry(index))
+
+    cursor, seen = 0, []
+    while True:
+        rows, cursor = client.get_logs_page("db-match", after_id=cursor, limit=3)
+        seen.extend(log_id for log_id, _ in rows)
+        if cursor is None:
+            break
+
+    assert seen == list(range(1, 8))
+    assert [entry.payload["n"] for _, entry in client.iter_logs("db-match", after_id=5)] == [5, 6]
+
+
+def test_async_client_copies_a_locally_recorded_match_once():
+    import asyncio
+
+    from ptcg_ai.async_database import AsyncDatabaseClient
+    from ptcg_ai.models import GameState
+
+    async def scenario():
+        db = AsyncDatabaseClient()
+        async with db:
+            local = DatabaseClient()
+            local.append_log(_entry(0))
+            local.persist_state(GameState(match_id="db-match", players={}))
+            assert await db.persist_local(local, "db-match") == 0
+
+            local.append_log(_entry(1))
+            await db.persist_local(local, "db-match")
+            page, cursor = await db.get_logs_page("db-match", limit=10)
+            streamed = [log_id async for log_id, _ in db.iter_logs("db-match", after_id=1)]
+            return [entry.payload["n"] for _, entry in page], cursor, streamed
+
+    payloads, cursor, streamed = asyncio.run(scenario())
+    assert payloads == [0, 1]
+    assert cursor is None
+    assert streamed == [2]
+
+
+class _FakeAsyncCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, sql, params=None):
+        if "INSERT INTO matches" in sql:
+            self.pool.matches.add(params[0])
+        elif "INSERT INTO match_state_versions" in sql:
+            if params[0] not in self.pool.matches:
+                raise RuntimeError("match_state_versions_match_id_fkey")
+            self.pool.versions.append(params)
+        elif "FROM match_state_versions" in sql:
+            self.rows = [row[1:] for row in self.pool.versions if row[0] == params["match_id"]]
+
+    async def executemany(self, sql, rows):
+        for row in rows:
+            if row[0] not in self.pool.matches:
+                raise RuntimeError("match_logs_match_id_fkey")
+            self.pool.logs.append(row)
+
+    async def fetchall(self):
+        return self.rows
+
+
+class _FakeAsyncPool:
+    def __init__(self):
+        self.matches = set()
+        self.versions = []
+        self.logs = []
+
+    def connection(self):
+        pool = self
+
+        class _Connection:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            def cursor(self):
+                return _FakeAsyncCursor(pool)
+
+        return _Connection()
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def test_pooled_persist_local_writes_the_match_before_its_logs(make_decks):
+    import asyncio
+
+    from ptcg_ai.async_database import AsyncDatabaseClient
+    from ptcg_ai.referee import RefereeAgent
+    from ptcg_ai.rulebook import RuleKnowledgeBase
+
+    async def scenario():
+        db = AsyncDatabaseClient(log_flush_interval=0)
+        db._pool = pool = _FakeAsyncPool()
+        local = DatabaseClient()
+        referee = RefereeAgent.create("pooled-match", make_decks(), RuleKnowledgeBase(), database=local)
+        first = await db.persist_local(local, "pooled-match")
+
+        mark = referee.tools.begin()
+        referee.tools.draw("playerA", 1)
+        referee.tools.commit(mark)
+        local.persist_state(referee.state)
+        second = await db.persist_local(local, "pooled-match")
+        return pool, first, second, len(local.get_logs("pooled-match"))
+
+    pool, first, second, log_count = asyncio.run(scenario())
+    assert (first, second) == (0, 1)
+    assert [row[1] for row in pool.versions] == [0, 1]
+    assert len(pool.logs) == log_count
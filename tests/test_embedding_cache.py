@@ -0,0 +1,107 @@
+import asyncio
+from array import array
+
+import pytest
+
+from ptcg_ai.embedding_cache import (
+    CachedEmbeddingProvider,
+    EmbeddingStore,
+    PostgresEmbeddingStore,
+    SQLiteEmbeddingStore,
+    text_key,
+)
+from ptcg_ai.embeddings import FakeEmbeddingProvider
+
+
+def test_lru_serves_repeats_and_evicts_oldest() -> None:
+    fake = FakeEmbeddingProvider(dimensions=4)
+    cache = CachedEmbeddingProvider(fake, capacity=2)
+
+    first = cache.embed(["attack", "retreat", "attack"])
+    assert fake.calls == [["attack", "retreat"]]
+    assert first[0] == first[2]
+    assert cache.embed(["attack"]) == [first[0]]
+    cache.embed(["draw"])  # evicts "retreat", the least recently used
+    cache.embed(["retreat"])
+
+    assert fake.calls[1:] == [["draw"], ["retreat"]]
+    assert cache.stats() == {"memory_hits": 1, "store_hits": 0, "misses": 4, "entries": 2}
+
+
+def test_store_is_shared_between_caches_and_keyed_by_model(tmp_path) -> None:
+    store = SQLiteEmbeddingStore(tmp_path / "embeddings.sqlite3")
+    warm = CachedEmbeddingProvider(FakeEmbeddingProvider(dimensions=4), store=store)
+    vectors = asyncio.run(warm.aembed(["attack with active pokemon", "retreat"]))
+
+    fake = FakeEmbeddingProvider(dimensions=4)
+    cold = CachedEmbeddingProvider(fake, store=store)
+    assert asyncio.run(cold.aembed(["retreat", "attack with active pokemon"])) == vectors[::-1]
+    assert fake.calls == [] and cold.stats()["store_hits"] == 2
+
+    other = FakeEmbeddingProvider(dimensions=4, model="other")
+    asyncio.run(CachedEmbeddingProvider(other, store=store).aembed(["retreat"]))
+    assert other.calls == [["retreat"]]
+    store.close()
+
+
+def test_unpersisted_texts_skip_the_store(tmp_path) -> None:
+    store = SQLiteEmbeddingStore(tmp_path / "embeddings.sqlite3")
+    cache = CachedEmbeddingProvider(FakeEmbeddingProvider(dimensions=4), store=store)
+    memory, query = "memory of a knocked out pokemon", "which rule covers retreat"
+    asyncio.run(cache.aembed([memory], persist=False))
+    asyncio.run(cache.aembed([query]))
+
+    stored = asyncio.run(store.get_many("fake", [text_key(memory), text_key(query)]))
+    assert list(stored) == [text_key(query)]
+    store.close()
+
+
+class _RecordingPool:
+    def __init__(self) -> None:
+        self.statements = []
+
+    def acquire(self):
+        pool = self
+
+        class _Connection:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def fetch(self, sql, *params):
+                pool.statements.append(sql)
+                return []
+
+            async def execute(self, sql, *params):
+                pool.statements.append(sql)
+
+            async def executemany(self, sql, rows):
+                pool.statements.append(sql)
+
+        return _Connection()
+
+
+def test_postgres_store_expires_rows_without_creating_tables() -> None:
+    pool = _RecordingPool()
+    store = PostgresEmbeddingStore(pool, max_age_days=1)
+
+    async def scenario():
+        assert await store.get_many("fake", ["a"]) == {}
+        for _ in range(2):
+            await store.put_many("fake", {"a": array("f", [1.0])})
+
+    asyncio.run(scenario())
+    assert not any("CREATE" in sql for sql in pool.statements)
+    assert "created_at >" in pool.statements[0]
+    assert sum(sql.startswith("DELETE") for sql in pool.statements) == 1
+
+
+def test_store_must_implement_reads_and_writes() -> None:
+    class ReadOnly(EmbeddingStore):
+        async def get_many(self, model, keys):
+            return {}
+
+    with pytest.raises(TypeError):
+        ReadOnly()
@@ -0,0 +1,87 @@
+import asyncio
+import math
+
+import pytest
+
+from ptcg_ai.embeddings import (
+    EmbeddingProvider,
+    FakeEmbeddingProvider,
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    default_embedding_provider,
+)
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_hashing_provider_is_deterministic_and_lexical() -> None:
+    provider = HashingEmbeddingProvider(dimensions=256)
+    query, close, far = provider.embed(
+        ["retreat your active pokemon", "Your Active Pokémon may retreat once per turn.", "Draw a card."]
+    )
+
+    assert len(query) == 256 and math.isclose(_cosine(query, query), 1.0)
+    assert provider.embed(["retreat your active pokemon"])[0] == query
+    assert _cosine(query, close) > 0.5 > _cosine(query, far)
+    assert provider.embed([""])[0] == [0.0] * 256
+
+
+def test_fake_provider_records_calls_and_supports_async() -> None:
+    provider = FakeEmbeddingProvider(dimensions=4)
+    first = provider.embed(["a", "b"])
+    again = asyncio.run(provider.aembed(["a"]))
+
+    assert again[0] == first[0] != first[1]
+    assert provider.calls == [["a", "b"], ["a"]]
+
+
+def test_openai_provider_batches_and_runs_off_the_event_loop() -> None:
+    class _Item:
+        def __init__(self, index, text):
+            self.index = index
+            self.embedding = [float(len(text))]
+
+    class _Client:
+        def __init__(self):
+            self.requests = []
+            self.embeddings = self
+
+        def create(self, model, input):
+            self.requests.append((model, input))
+            return type("Response", (), {"data": [_Item(i, t) for i, t in reversed(list(enumerate(input)))]})
+
+    client = _Client()
+    provider = default_embedding_provider(client, model="m")
+
+    assert isinstance(provider, OpenAIEmbeddingProvider)
+    assert asyncio.run(provider.aembed(["ab", "abc"])) == [[2.0], [3.0]]
+    assert client.requests == [("m", ["ab", "abc"])]
+
+
+def test_default_provider_kinds(monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("PTCG_EMBEDDINGS", raising=False)
+    assert isinstance(default_embedding_provider(), HashingEmbeddingProvider)
+    monkeypatch.setenv("PTCG_EMBEDDINGS", "fake")
+    assert isinstance(default_embedding_provider(), FakeEmbeddingProvider)
+    with pytest.raises(ValueError):
+        default_embedding_provider(kind="onnx")
+
+
+def test_default_provider_logs_its_choice(monkeypatch, caplog) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("PTCG_EMBEDDINGS", raising=False)
+    with caplog.at_level("INFO", logger="ptcg_ai.embeddings"):
+        provider = default_embedding_provider()
+
+    assert f"local (model {provider.model}, PTCG_EMBEDDINGS=auto)" in caplog.text
+
+
+def test_provider_without_embed_cannot_be_instantiated() -> None:
+    class Incomplete(EmbeddingProvider):
+        model = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
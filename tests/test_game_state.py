@@ -0,0 +1,25 @@
+from ptcg_ai.models import Zone
+
+
+def test_fork_copies_on_write(make_tools, assert_index_consistent) -> None:
+    tools = make_tools()
+    tools.draw("playerA", 7)
+    pokemon = next(c for c in tools.state.players["playerA"].zone(Zone.HAND).cards if c.definition.card_type == "Pokemon")
+    tools.move_card("playerA", Zone.HAND, Zone.ACTIVE, pokemon)
+
+    branch = tools.fork()
+    shared = branch.state.find_card(pokemon.uid)
+    assert shared is pokemon
+
+    branch.update_damage(pokemon.uid, 30)
+    branch.draw("playerA", 2)
+    assert branch.state.find_card(pokemon.uid).damage == 30
+    assert pokemon.damage == 0
+    assert len(tools.state.players["playerA"].zone(Zone.HAND).cards) == 6
+    assert branch.state.find_card(pokemon.uid).definition is pokemon.definition
+
+    tools.set_special_condition(pokemon.uid, "Asleep")
+    assert branch.state.find_card(pokemon.uid).special_conditions == []
+    assert tools.context.db.get_logs("index-match") != branch.context.db.get_logs("index-match")
+    assert_index_consistent(branch.state)
+    assert_index_consistent(tools.state)
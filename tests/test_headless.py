@@ -0,0 +1,144 @@
+import random
+from pathlib import Path
+
+from ptcg_ai.card_cache import open_card_cache
+from ptcg_ai.headless import (
+    HeadlessMatch,
+    RandomPlayerAgent,
+    ScriptedPlayerAgent,
+    build_observation,
+    candidate_requests,
+    clone_deck,
+    run_match,
+    run_matches,
+)
+from ptcg_ai.referee import OperationRequest, RefereeAgent
+from ptcg_ai.rng import MatchRng
+from ptcg_ai.rulebook import RuleKnowledgeBase
+from ptcg_ai.simulation import build_deck
+from ptcg_ai.snapshot import state_to_dict
+
+DECK1 = Path(__file__).resolve().parents[1] / "doc" / "deck" / "deck1.txt"
+
+
+def test_random_matches_finish_and_are_reproducible(make_decks):
+    decks = make_decks()
+    first = run_match("headless-1", decks, seed=7)
+    second = run_match("headless-1", decks, seed=7)
+
+    assert first.winner in decks
+    assert first.reason == "win"
+    assert (first.winner, first.turns, first.actions) == (second.winner, second.turns, second.actions)
+    # Template decks are cloned, never mutated by a match.
+    assert all(card.damage == 0 for deck in decks.values() for card in deck.cards)
+
+
+def test_run_matches_reports_throughput(make_decks):
+    summary = run_matches(make_decks(), 3, seed=1)
+
+    assert len(summary.results) == 3
+    assert sum(summary.wins.values()) == 3
+    assert summary.matches_per_second > 0
+
+
+def test_scripted_players_drive_referee(make_decks):
+    decks = make_decks()
+    # Player A passes every turn; player B attaches energy then attacks.
+    players = {"playerA": ScriptedPlayerAgent("playerA")}
+
+    class AttackingAgent(ScriptedPlayerAgent):
+        def decide(self, observation):
+            active = observation["my_active_pokemon"][0]
+            target = observation["opponent_active_pokemon"][0]
+            if active["attached_energy_count"] == 0:
+                energy = next(c for c in observation["my_hand_cards"] if c["type"] == "Energy")
+                return OperationRequest(
+                    self.player_id, "attach_energy", {"energy_card_id": energy["uid"], "pokemon_id": active["uid"]}
+                )
+            return OperationRequest(
+                self.player_id,
+                "use_attack",
+                {"card_id": active["uid"], "attack_name": "Tackle", "target_pokemon_id": target["uid"]},
+            )
+
+    players["playerB"] = AttackingAgent("playerB")
+    result = run_match("scripted", decks, players=players, seed=3)
+
+    assert result.winner == "playerB"
+    assert result.failed_actions == 0
+    assert clone_deck(decks["playerA"]).cards[0] is not decks["playerA"].cards[0]
+
+
+def _request_key(request):
+    return request.action, tuple(sorted(request.payload.items()))
+
+
+def test_legal_actions_match_referee_verdicts(make_decks):
+    decks = make_decks()
+    referee = RefereeAgent.create(
+        match_id="legal",
+        player_decks={player_id: clone_deck(deck) for player_id, deck in decks.items()},
+        knowledge_base=RuleKnowledgeBase(),
+        rng=MatchRng(5),
+    )
+    players = {player_id: RandomPlayerAgent(player_id, rng=random.Random(5)) for player_id in decks}
+    match = HeadlessMatch(referee=referee, players=players)
+    assert match.setup() is None
+
+    checked = 0
+    for _ in range(8):
+        player_id = referee.state.turn_player
+        opponent_id = next(pid for pid in decks if pid != player_id)
+        referee.start_turn(player_id)
+        for _ in range(4):
+            before = state_to_dict(referee.state)
+            legal = referee.legal_actions(player_id)
+            assert state_to_dict(referee.state) == before
+            assert referee.legal_actions(opponent_id) == []
+
+            legal_keys = {_request_key(request) for request in legal}
+            observation = build_observation(referee, player_id)
+            for request in legal + candidate_requests(player_id, observation):
+                verdict = referee.fork().handle_request(request).success
+                assert verdict == (_request_key(request) in legal_keys), request
+                checked += 1
+            non_attacks = [request for request in legal if request.action != "use_attack"]
+            if not non_attacks:
+                break
+            referee.handle_request(non_attacks[0])
+        if referee.state.turn_player == player_id:
+            referee.end_turn(player_id)
+    assert checked > 20
+
+
+def test_every_listed_action_succeeds_in_deck1_matches(tmp_path):
+    # deck1 has activated abilities limited per turn, per game and to the Active Spot.
+    cache = open_card_cache(tmp_path / "cards.sqlite3", source="json")
+    decks = {player_id: build_deck(player_id, DECK1, card_cache=cache) for player_id in ("playerA", "playerB")}
+    cache.close()
+
+    class CheckingAgent(RandomPlayerAgent):
+        referee = None
+        checked = 0
+
+        def decide(self, observation):
+            for item in observation["legal_actions"]:
+                request = OperationRequest(self.player_id, item["action"], dict(item["payload"]))
+                result = self.referee.fork().handle_request(request)
+                assert result.success, (request, result.message)
+                CheckingAgent.checked += 1
+            return super().decide(observation)
+
+    for seed in range(3):
+        players = {player_id: CheckingAgent(player_id, rng=random.Random(seed)) for player_id in decks}
+        referee = RefereeAgent.create(
+            match_id=f"deck1-{seed}",
+            player_decks={player_id: clone_deck(deck) for player_id, deck in decks.items()},
+            knowledge_base=RuleKnowledgeBase(),
+            rng=MatchRng(seed),
+        )
+        for agent in players.values():
+            agent.referee = referee
+        result = HeadlessMatch(referee=referee, players=players).play()
+        assert result.failed_actions == 0
+    assert CheckingAgent.checked > 100
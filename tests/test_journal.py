@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from ptcg_ai.headless import HeadlessMatch, ScriptedPlayerAgent, clone_deck
+from ptcg_ai.journal import JournalError
+from ptcg_ai.models import Zone
+from ptcg_ai.referee import OperationRequest, RefereeAgent
+from ptcg_ai.rng import MatchRng
+from ptcg_ai.rulebook import RuleKnowledgeBase
+from ptcg_ai.snapshot import state_to_dict
+
+
+def _play_some(tools) -> None:
+    state = tools.state
+    tools.draw("playerA", 7)
+    hand = state.players["playerA"].zone(Zone.HAND).cards
+    pokemon = next(c for c in hand if c.definition.card_type == "Pokemon")
+    energy = next(c for c in hand if c.definition.card_type == "Energy")
+    tools.move_card("playerA", Zone.HAND, Zone.ACTIVE, pokemon)
+    tools.attach_energy(energy.uid, pokemon.uid)
+    tools.set_special_condition(pokemon.uid, "Poisoned")
+    tools.track_usage("playerA", "energy_attachment", "attach_energy")
+    tools.place_prizes("playerB", 6)
+    tools.take_prize("playerB", 2)
+    tools.update_damage(pokemon.uid, 60)
+    assert tools.check_ko(pokemon.uid)
+    tools.shuffle("playerA", Zone.DECK)
+
+
+def test_rollback_restores_state_index_logs_and_rng(make_tools, assert_index_consistent) -> None:
+    tools = make_tools()
+    tools._rng = MatchRng(9)
+    tools.shuffle("playerA", Zone.DECK)
+    before = state_to_dict(tools.state)
+    logs_before = len(tools.context.db.get_logs("index-match"))
+
+    mark = tools.begin()
+    _play_some(tools)
+    assert len(tools.context.db.get_logs("index-match")) == logs_before
+    tools.rollback(mark)
+
+    assert state_to_dict(tools.state) == before
+    assert_index_consistent(tools.state)
+    assert len(tools.context.db.get_logs("index-match")) == logs_before
+    assert len(tools.journal) == 0
+
+    # Random draws were rewound too, so replaying the same moves is identical.
+    with tools.transaction():
+        _play_some(tools)
+    after_commit = state_to_dict(tools.state)
+    replay = make_tools()
+    replay._rng = MatchRng(9)
+    replay.shuffle("playerA", Zone.DECK)
+    _play_some(replay)
+    assert after_commit == state_to_dict(replay.state)
+    assert len(tools.context.db.get_logs("index-match")) > logs_before
+
+
+def test_nested_frames_undo_one_ply_at_a_time(make_tools) -> None:
+    tools = make_tools()
+    state = tools.state
+    outer = tools.begin()
+    tools.draw("playerA", 3)
+    after_draw = state_to_dict(state)
+
+    inner = tools.begin()
+    tools.draw("playerA", 2)
+    tools.place_prizes("playerA", 6)
+    tools.rollback(inner)
+    assert state_to_dict(state) == after_draw
+    with pytest.raises(JournalError):
+        tools.rollback(inner)
+
+    tools.commit(outer)
+    assert len(state.players["playerA"].zone(Zone.HAND).cards) == 3
+    assert [entry.action for entry in tools.context.db.get_logs("index-match")] == ["draw"]
+
+
+def test_rollback_on_fork_keeps_copy_on_write_intact(make_tools) -> None:
+    tools = make_tools()
+    tools.draw("playerA", 7)
+    pokemon = next(c for c in tools.state.players["playerA"].zone(Zone.HAND).cards if c.definition.card_type == "Pokemon")
+    tools.move_card("playerA", Zone.HAND, Zone.ACTIVE, pokemon)
+    branch = tools.fork()
+
+    mark = branch.begin()
+    branch.update_damage(pokemon.uid, 30)
+    branch.rollback(mark)
+    assert branch.state.players["playerA"].zone(Zone.ACTIVE).cards[0] is pokemon
+
+    branch.update_damage(pokemon.uid, 10)
+    assert pokemon.damage == 0
+    assert branch.state.find_card(pokemon.uid).damage == 10
+
+
+def test_failed_request_leaves_no_trace(make_decks) -> None:
+    referee = RefereeAgent.create(
+        match_id="journal",
+        player_decks={player_id: clone_deck(deck) for player_id, deck in make_decks().items()},
+        knowledge_base=RuleKnowledgeBase(),
+        rng=MatchRng(2),
+    )
+    players = {player_id: ScriptedPlayerAgent(player_id) for player_id in referee.state.players}
+    HeadlessMatch(referee=referee, players=players).setup()
+    referee.start_turn("playerA")
+    before = state_to_dict(referee.state)
+    logs_before = len(referee.database.get_logs("journal"))
+
+    def half_done(actor_id):
+        referee.tools.draw(actor_id, 2)
+        referee.tools.track_usage(actor_id, "supporter", "play_trainer")
+        return {"success": False, "message": "step 2 failed"}
+
+    referee._handle_half_done = half_done
+    result = referee.handle_request(OperationRequest("playerA", "half_done", {}))
+
+    assert not result.success and result.message == "step 2 failed"
+    assert state_to_dict(referee.state) == before
+    assert len(referee.database.get_logs("journal")) == logs_before
@@ -0,0 +1,24 @@
+from math import comb
+
+from ptcg_ai.opening import analyze_opening
+
+
+def test_mulligan_rate_matches_hypergeometric_odds(thin_deck_loader):
+    report = analyze_opening("thin.txt", 4000, seed=3, workers=1, chunk_size=1500, deck_loader=thin_deck_loader)
+
+    # Four Basics in 60 cards: a hand of 7 misses them all with C(56, 7) / C(60, 7).
+    expected = comb(56, 7) / comb(60, 7)
+    assert report.games == 4000 and report.aborted == 0
+    assert abs(report.mulligan_rate - expected) < 0.03
+    assert report.opener_probability("Test Mon") == 1.0
+    distribution = report.prize_distribution("Test Mon")
+    assert abs(sum(distribution.values()) - 1) < 1e-9
+    assert set(distribution) <= {0, 1, 2, 3}
+
+
+def test_report_is_reproducible_across_worker_counts(thin_deck_loader):
+    kwargs = dict(seed=5, chunk_size=250, deck_loader=thin_deck_loader, opponent_deck_file="thin.txt")
+    serial = analyze_opening("thin.txt", 1000, workers=1, **kwargs)
+    pooled = analyze_opening("thin.txt", 1000, workers=2, **kwargs)
+
+    assert (serial.mulligans, serial.openers, serial.prizes) == (pooled.mulligans, pooled.openers, pooled.prizes)
@@ -0,0 +1,160 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ptcg_ai import referee as referee_module
+from ptcg_ai.models import CardDefinition
+from ptcg_ai.plan_cache import PlanCache, PlanStoreUnavailable, card_plan_id, latest_plans, plan_lookups
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.rulebook import RuleKnowledgeBase
+
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl_and_cache_missing_plans() -> None:
+    clock = _Clock()
+    cache = PlanCache(ttl=10, clock=clock)
+    loads = []
+
+    def load():
+        loads.append(clock.now)
+        return None
+
+    key = ("SV1-1", "Tackle", None, "approved")
+    assert cache.get(key, load) is None
+    clock.now = 9.5
+    assert cache.get(key, load) is None
+    assert loads == [0.0] and (cache.hits, cache.misses) == (1, 1)
+
+    clock.now = 10
+    assert not cache.fresh(key)
+    cache.get(key, load)
+    assert loads == [0.0, 10]
+
+
+def test_invalidate_drops_only_that_card() -> None:
+    cache = PlanCache()
+    cache.put(("SV1-1", None, None, "approved"), "trainer plan")
+    cache.put(("SV1-1", "Tackle", None, "approved"), "attack plan")
+    cache.put(("SV1-2", None, None, "approved"), "other plan")
+
+    cache.invalidate("SV1-1")
+    assert len(cache) == 1 and cache.fresh(("SV1-2", None, None, "approved"))
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_plan_lookups_cover_trainers_abilities_and_attacks() -> None:
+    mon = CardDefinition(
+        set_code="SV1",
+        number="7",
+        name="Test Mon",
+        card_type="Pokemon",
+        abilities=({"name": "Boost"},),
+        attacks=({"name": "Tackle"}, {"name": "Tackle"}),
+    )
+    ball = CardDefinition(set_code="SV1", number="9", name="Ball", card_type="Trainer")
+
+    assert card_plan_id(mon) == "SV1-7"
+    assert plan_lookups([mon, ball, mon]) == [
+        ("SV1-7", None),
+        ("SV1-7", "Boost"),
+        ("SV1-7", "Tackle"),
+        ("SV1-9", None),
+    ]
+
+
+def _plan(card_id, effect_name, version):
+    return SimpleNamespace(card_id=card_id, effect_name=effect_name, version=version)
+
+
+def test_latest_plans_maps_lookups_to_the_newest_plan() -> None:
+    newest_first = [
+        _plan("SV1-7", "Tackle", 3),
+        _plan("SV1-7", "Boost", 2),
+        _plan("SV1-7", "Tackle", 1),
+        _plan("SV1-9", None, 1),
+    ]
+    lookups = [("SV1-7", None), ("SV1-7", "Boost"), ("SV1-7", "Tackle"), ("SV1-9", None), ("SV1-8", None)]
+
+    plans = latest_plans(newest_first, lookups)
+    assert {lookup: plan and plan.version for lookup, plan in plans.items()} == {
+        ("SV1-7", None): 3,
+        ("SV1-7", "Boost"): 2,
+        ("SV1-7", "Tackle"): 3,
+        ("SV1-9", None): 1,
+        ("SV1-8", None): None,
+    }
+
+
+def test_preload_loads_only_missing_keys_and_caches_absent_plans() -> None:
+    cache = PlanCache()
+    cache.put(("SV1-7", None, None, "approved"), "cached plan")
+    requested = []
+
+    def load_many(missing):
+        requested.append(missing)
+        return latest_plans([_plan("SV1-7", "Tackle", 1)], missing)
+
+    stored = cache.preload([("SV1-7", None), ("SV1-7", "Tackle"), ("SV1-9", None)], "approved", load_many)
+
+    assert requested == [[("SV1-7", "Tackle"), ("SV1-9", None)]]
+    assert stored == 2
+    assert cache.get(("SV1-7", "Tackle", None, "approved"), lambda: "loaded").version == 1
+    assert cache.get(("SV1-9", None, None, "approved"), lambda: "loaded") is None
+    assert cache.preload([("SV1-9", None)], "approved", load_many) == 0
+
+
+def test_failed_loads_are_not_cached_and_back_off() -> None:
+    clock = _Clock()
+    cache = PlanCache(clock=clock, backoff=30)
+    calls = []
+
+    def unreachable():
+        calls.append(clock.now)
+        raise ConnectionError("connection refused")
+
+    key = ("SV1-1", None, None, "approved")
+    with pytest.raises(ConnectionError):
+        cache.get(key, lambda: cache.attempt(unreachable))
+    assert not cache.fresh(key)
+
+    clock.now = 29
+    with pytest.raises(PlanStoreUnavailable):
+        cache.get(key, lambda: cache.attempt(unreachable))
+    assert calls == [0.0]
+
+    clock.now = 30
+    assert cache.get(key, lambda: cache.attempt(lambda: "plan")) == "plan"
+
+
+def test_referee_preloads_deck_plans_and_loads_through_the_cache(monkeypatch, make_decks) -> None:
+    preloaded, loaded = [], []
+
+    def load_plan_cached(card_id, effect_name=None, status=None):
+        loaded.append((card_id, effect_name, status))
+        if effect_name == "Broken":
+            raise ConnectionError("connection refused")
+        return f"plan for {card_id}"
+
+    access = SimpleNamespace(
+        preload_plans=lambda definitions: preloaded.append(set(definitions)),
+        load_plan_cached=load_plan_cached,
+    )
+    monkeypatch.setattr(referee_module, "_plan_access", lambda: access)
+
+    decks = make_decks()
+    referee = RefereeAgent.create("plan-wiring", decks, RuleKnowledgeBase())
+    card = decks["playerA"].cards[0]
+
+    assert preloaded == [{card.definition for deck in decks.values() for card in deck.cards}]
+    assert referee._load_plan(card, "Tackle") == "plan for TST-1"
+    assert referee._load_plan(card, "Broken") is None
+    assert loaded == [("TST-1", "Tackle", "approved"), ("TST-1", "Broken", "approved")]
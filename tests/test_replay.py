@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from ptcg_ai.database import DatabaseClient
+from ptcg_ai.headless import HeadlessMatch, RandomPlayerAgent, clone_deck
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.replay import ReplayEngine, ReplayError, replay_match
+from ptcg_ai.rng import MatchRng
+from ptcg_ai.rulebook import RuleKnowledgeBase
+from ptcg_ai.snapshot import encode_state
+
+
+def _played_match(decks, rng=None, max_turns=100):
+    database = DatabaseClient()
+    referee = RefereeAgent.create(
+        "replay-match",
+        {player_id: clone_deck(deck) for player_id, deck in decks.items()},
+        RuleKnowledgeBase(),
+        database=database,
+        rng=rng,
+    )
+    players = {player_id: RandomPlayerAgent(player_id, rng=random.Random(4)) for player_id in decks}
+    HeadlessMatch(referee=referee, players=players, max_turns=max_turns).play()
+    return referee, database.get_logs("replay-match")
+
+
+@pytest.mark.parametrize("rng", [None, MatchRng(99)], ids=["hex-seeds", "counter-seeds"])
+def test_replay_rebuilds_final_state(make_decks, rng):
+    referee, logs = _played_match(make_decks(), rng)
+
+    _, state = replay_match(logs)
+
+    assert state == referee.state
+
+
+def test_seek_turn_uses_checkpoints_and_matches_forward_replay(make_decks):
+    _, logs = _played_match(make_decks(), MatchRng(5))
+    engine = ReplayEngine(logs, checkpoint_interval=25)
+    engine.seek(len(logs) - 1)
+
+    rewound = encode_state(engine.seek_turn(4, "playerB"))
+    fresh = encode_state(ReplayEngine(logs).seek_turn(4, "playerB"))
+
+    assert rewound == fresh
+    assert engine.state.turn_number == 4 and engine.state.turn_player == "playerB"
+    headers = [(frame.state.turn_number, frame.state.turn_player) for frame in engine.iter_turns(2, 3)]
+    assert headers == [
+        (2, "playerA"), (2, "playerB"), (3, "playerA"), (3, "playerB")
+    ]
+
+
+def test_divergent_log_is_rejected(make_decks):
+    _, logs = _played_match(make_decks(), MatchRng(5), max_turns=3)
+    draw = next(index for index, entry in enumerate(logs) if entry.action == "draw")
+    logs[draw].payload = dict(logs[draw].payload, cards=["not-a-card"])
+
+    with pytest.raises(ReplayError):
+        replay_match(logs)
@@ -0,0 +1,53 @@
+from ptcg_ai.database import DatabaseClient
+from ptcg_ai.headless import clone_deck
+from ptcg_ai.models import Zone
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.rng import MatchRng
+from ptcg_ai.rulebook import RuleKnowledgeBase
+
+
+def _create(decks, master_seed):
+    database = DatabaseClient()
+    referee = RefereeAgent.create(
+        "rng-match",
+        {player_id: clone_deck(deck) for player_id, deck in decks.items()},
+        RuleKnowledgeBase(),
+        database=database,
+        rng=MatchRng(master_seed),
+    )
+    return referee, database
+
+
+def test_master_seed_reproduces_shuffles_and_logs_counters(make_decks):
+    decks = make_decks()
+    first, first_db = _create(decks, 42)
+    second, _ = _create(decks, 42)
+    other, _ = _create(decks, 43)
+
+    assert first.state.snapshot() == second.state.snapshot()
+    assert first.state.snapshot() != other.state.snapshot()
+
+    logs = first_db.get_logs("rng-match")
+    assert logs[0].action == "rng_init" and logs[0].payload["master_seed"] == 42
+    assert [log.random_seed for log in logs if log.action == "shuffle"] == ["#0", "#1"]
+
+
+def test_draws_are_addressable_by_counter():
+    rng = MatchRng(7)
+    draws = [rng() for _ in range(5)]
+
+    assert MatchRng(7, counter=3)() == draws[3]
+    assert rng.resolve("#2") == int(draws[2], 16)
+    assert rng.resolve(draws[4]) == int(draws[4], 16)
+
+
+def test_fork_does_not_advance_parent_stream(make_decks):
+    referee, _ = _create(make_decks(), 9)
+    counter = referee.tools._rng.counter
+
+    branch = referee.fork()
+    branch.tools.shuffle("playerA", Zone.DECK)
+
+    assert referee.tools._rng.counter == counter
+    referee.tools.shuffle("playerB", Zone.DECK)
+    assert referee.tools._rng.counter == counter + 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from ptcg_ai import rule_index
+from ptcg_ai.rule_index import (
+    RuleIndexError,
+    default_rule_index,
+    open_rule_index,
+    read_rule_index,
+    rule_source_hash,
+)
+
+RULES = "1 Draw a card at the start of your turn.\n2 You may retreat your Active Pokémon once per turn.\n"
+
+
+def test_artifact_is_reused_until_the_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "rules.txt"
+    source.write_text(RULES, encoding="utf-8")
+    artifact = tmp_path / "rules.idx"
+
+    built = open_rule_index(source, artifact)
+    loaded = read_rule_index(artifact, rule_source_hash(RULES))
+    assert loaded is not None and loaded.rules == built.rules
+    assert [entry.section for entry in loaded.find("retreat")] == ["2"]
+
+    # A fresh artifact is loaded without parsing the rulebook again.
+    monkeypatch.setattr("ptcg_ai.rule_index.RuleKnowledgeBase.from_text", None)
+    assert open_rule_index(source, artifact).rules == built.rules
+    monkeypatch.undo()
+
+    source.write_text(RULES + "3 Attacking ends your turn.\n", encoding="utf-8")
+    assert read_rule_index(artifact, rule_source_hash(source.read_text(encoding="utf-8"))) is None
+    assert [entry.section for entry in open_rule_index(source, artifact).find("attacking")] == ["3"]
+
+
+def test_artifact_is_plain_data_tied_to_the_index_code(tmp_path, monkeypatch):
+    source = tmp_path / "rules.txt"
+    source.write_text(RULES, encoding="utf-8")
+    artifact = tmp_path / "rules.idx"
+    open_rule_index(source, artifact)
+
+    payload = json.loads(artifact.read_bytes()[rule_index._HEADER_SIZE :])
+    assert payload["rules"][1] == ["2", "You may retreat your Active Pokémon once per turn."]
+    assert payload["index"]["postings"]["retreat"] == [[1, [2]]]
+
+    monkeypatch.setattr(rule_index, "index_build_hash", lambda: "0" * 64)
+    assert read_rule_index(artifact, rule_source_hash(RULES)) is None
+
+
+def test_corrupt_artifact_is_rebuilt(tmp_path):
+    source = tmp_path / "rules.txt"
+    source.write_text(RULES, encoding="utf-8")
+    artifact = tmp_path / "rules.idx"
+    artifact.write_bytes(b"garbage")
+
+    with pytest.raises(RuleIndexError):
+        read_rule_index(artifact)
+    assert len(open_rule_index(source, artifact).rules) == 2
+    assert read_rule_index(artifact) is not None
+
+
+def test_default_index_is_shared_per_process(tmp_path, monkeypatch):
+    monkeypatch.setenv("PTCG_RULE_INDEX_DIR", str(tmp_path / "cache"))
+    source = tmp_path / "rules.txt"
+    source.write_text(RULES, encoding="utf-8")
+
+    assert default_rule_index(source) is default_rule_index(str(source))
+    assert len(list((tmp_path / "cache").glob("rules-*.rules"))) == 1
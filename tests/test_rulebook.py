@@ -0,0 +1,35 @@
+from ptcg_ai.rulebook import RuleEntry, RuleKnowledgeBase
+from ptcg_ai.search import tokenize
+
+RULES = """
+1 Each player shuffles their deck and draws 7 cards.
+2 Once per turn you may retreat your Active Pokémon by discarding Energy equal to its Retreat Cost.
+3 Your Active Pokémon may attack; attacking ends your turn.
+4 Pokémon on your Bench cannot attack.
+5 每回合只能撤退一次宝可梦。
+"""
+
+
+def test_find_ranks_multi_word_queries() -> None:
+    kb = RuleKnowledgeBase.from_text(RULES)
+
+    # Rule 2 is the only one with "retreat"; among the rest the shortest mention of Pokémon wins.
+    assert [entry.section for entry in kb.find("retreat pokemon", limit=2)] == ["2", "4"]
+    assert [entry.section for entry in kb.find("撤退")] == ["5"]
+    assert kb.find("mega evolution") == []
+
+
+def test_find_phrases_and_substring_fallback() -> None:
+    kb = RuleKnowledgeBase.from_text(RULES)
+
+    assert [entry.section for entry in kb.find('"active pokemon" attack')] == ["3", "2"]
+    assert [entry.section for entry in kb.find('"pokemon active"')] == []
+    assert [entry.section for entry in kb.find("retrea")] == ["2"]
+
+
+def test_index_follows_rule_changes() -> None:
+    kb = RuleKnowledgeBase()
+    assert kb.find("prize") == []
+    kb.rules["6"] = RuleEntry(section="6", text="Take a Prize card for each Knocked Out Pokémon.")
+    assert [entry.section for entry in kb.find("prize")] == ["6"]
+    assert tokenize("Pokémon 撤退规则") == ["pokemon", "撤退", "退规", "规则"]
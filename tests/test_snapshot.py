@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from ptcg_ai.headless import HeadlessMatch, RandomPlayerAgent, clone_deck
+from ptcg_ai.models import Zone
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.rulebook import RuleKnowledgeBase
+from ptcg_ai.snapshot import SnapshotError, decode_state, encode_state
+
+
+def _mid_game_state(decks):
+    referee = RefereeAgent.create(
+        "snapshot-match",
+        {player_id: clone_deck(deck) for player_id, deck in decks.items()},
+        RuleKnowledgeBase(),
+    )
+    players = {player_id: RandomPlayerAgent(player_id, rng=random.Random(2)) for player_id in decks}
+    HeadlessMatch(referee=referee, players=players, max_turns=6).play()
+    state = referee.state
+    active = state.players["playerA"].zone(Zone.ACTIVE).cards[0]
+    state.writable_card(active.uid).special_conditions.append("Poisoned")
+    state.players["playerA"].memory.append("note")
+    state.players["playerA"].track_usage("ability-1", "use", scope="game")
+    return state
+
+
+def test_snapshot_round_trips_full_state(make_decks):
+    state = _mid_game_state(make_decks())
+
+    restored = decode_state(encode_state(state))
+
+    assert restored == state
+    assert restored.card_index.keys() == state.card_index.keys()
+
+    def definitions(game_state):
+        return [c.definition for p in game_state.players.values() for z in p.zones.values() for c in z.cards]
+
+    # Equal definitions are restored as one interned, shared instance.
+    assert len({id(d) for d in definitions(restored)}) == len(set(definitions(state)))
+
+
+def test_snapshot_rejects_foreign_or_future_payloads(make_decks):
+    payload = encode_state(_mid_game_state(make_decks()))
+
+    with pytest.raises(SnapshotError):
+        decode_state(b"not a snapshot")
+    with pytest.raises(SnapshotError):
+        decode_state(payload[:5] + bytes((99,)) + payload[6:])
@@ -0,0 +1,87 @@
+import random
+
+from ptcg_ai.database import DatabaseClient
+from ptcg_ai.headless import HeadlessMatch, RandomPlayerAgent, clone_deck
+from ptcg_ai.models import Zone
+from ptcg_ai.referee import RefereeAgent
+from ptcg_ai.rulebook import RuleKnowledgeBase
+from ptcg_ai.state_delta import capture_checkpoint
+
+
+def _play(decks, checkpoint_interval):
+    database = DatabaseClient(checkpoint_interval=checkpoint_interval)
+    referee = RefereeAgent.create(
+        match_id="delta-match",
+        player_decks={player_id: clone_deck(deck) for player_id, deck in decks.items()},
+        knowledge_base=RuleKnowledgeBase(),
+        database=database,
+        rng=iter(f"{n:032x}" for n in range(1, 10_000)).__next__,
+    )
+    players = {player_id: RandomPlayerAgent(player_id, rng=random.Random(5)) for player_id in decks}
+    HeadlessMatch(referee=referee, players=players).play()
+    return database
+
+
+def test_deltas_rebuild_every_version(make_decks):
+    full = _play(make_decks(), checkpoint_interval=1)
+    sparse = _play(make_decks(), checkpoint_interval=7)
+
+    rows = list(sparse._memory.iter_versions("delta-match"))
+    latest = rows[-1][0]
+    assert latest > 20
+    assert sum(1 for _, is_checkpoint, _ in rows if is_checkpoint) == latest // 7 + 1
+    for version in range(latest + 1):
+        assert sparse.load_state_version("delta-match", version) == full.load_state_version("delta-match", version)
+
+
+def test_unchanged_state_is_not_versioned(make_decks):
+    database = DatabaseClient()
+    referee = RefereeAgent.create("delta-idle", make_decks(), RuleKnowledgeBase(), database=database)
+
+    assert database.persist_state(referee.state) is None
+    version, checkpoint = database.load_state_version("delta-idle")
+    assert checkpoint["players"]["playerA"]["prizes_remaining"] == 6
+
+
+def _committed(referee, action):
+    mark = referee.tools.begin()
+    action(referee.tools)
+    referee.tools.commit(mark)
+    return referee.database.persist_state(referee.state)
+
+
+def test_delta_lists_only_the_parts_the_action_touched(make_decks):
+    database = DatabaseClient()
+    referee = RefereeAgent.create("delta-touched", make_decks(), RuleKnowledgeBase(), database=database)
+
+    version = _committed(referee, lambda tools: tools.draw("playerA", 1))
+    _, _, delta = list(database._memory.iter_versions("delta-touched"))[version]
+    assert delta == {
+        "players": {
+            "playerA": {
+                "zones": {
+                    "deck": [card.uid for card in referee.state.players["playerA"].zone(Zone.DECK).cards],
+                    "hand": [card.uid for card in referee.state.players["playerA"].zone(Zone.HAND).cards],
+                }
+            }
+        }
+    }
+
+    version = _committed(referee, lambda tools: tools.track_usage("playerB", "retreat", "switch_pokemon"))
+    _, checkpoint = database.load_state_version("delta-touched", version)
+    assert checkpoint["players"]["playerB"]["usage_trackers"] == {"retreat": {"turn:switch_pokemon": 1}}
+    assert checkpoint == capture_checkpoint(referee.state)
+
+
+def test_new_client_continues_from_the_stored_version(make_decks):
+    first = DatabaseClient()
+    referee = RefereeAgent.create("delta-resume", make_decks(), RuleKnowledgeBase(), database=first)
+    latest, _ = first.load_state_version("delta-resume")
+
+    second = DatabaseClient(memory_store=first._memory)
+    referee.database = second
+    assert second.persist_state(referee.state) is None
+
+    version = _committed(referee, lambda tools: tools.draw("playerB", 2))
+    assert version == latest + 1
+    assert second.load_state_version("delta-resume") == (version, capture_checkpoint(referee.state))
@@ -0,0 +1,29 @@
+import csv
+import json
+
+from ptcg_ai.tournament import run_tournament
+
+
+def _read_jsonl(path):
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    return {row["match_id"]: (row["winner"], row["turns"], row["actions"]) for row in rows}
+
+
+def test_tournament_is_reproducible_across_worker_counts(tmp_path, deck_loader):
+    decks = {"playerA": "a.txt", "playerB": "b.txt"}
+    serial = run_tournament(decks, 4, tmp_path / "serial.jsonl", seed=11, workers=1, deck_loader=deck_loader)
+    pooled = run_tournament(decks, 4, tmp_path / "pooled.jsonl", seed=11, workers=2, deck_loader=deck_loader)
+
+    assert serial.matches == pooled.matches == 4
+    assert serial.wins == pooled.wins
+    assert _read_jsonl(tmp_path / "serial.jsonl") == _read_jsonl(tmp_path / "pooled.jsonl")
+
+
+def test_tournament_writes_csv(tmp_path, deck_loader):
+    output = tmp_path / "results.csv"
+    summary = run_tournament({"playerA": "a", "playerB": "b"}, 2, output, workers=1, deck_loader=deck_loader)
+
+    with output.open() as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == summary.matches == 2
+    assert {row["match_id"] for row in rows} == {"tournament-1", "tournament-2"}